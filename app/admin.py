@@ -1,5 +1,9 @@
 from django.contrib import admin
+from django.utils import timezone
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
 from rangefilter.filters import DateRangeFilter, DateTimeRangeFilter
 from django.contrib import messages
 from .utils import send_push_to_driver
@@ -9,17 +13,60 @@ from .models import (
     Booking, Review, Load, DriverNotification
 )
 
+# =========================
+# Пагинация без COUNT(*)
+# =========================
+def estimate_table_rows(model):
+    """Примерное число строк таблицы из статистики СУБД (None — если оценки нет)."""
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+        elif connection.vendor == 'sqlite':
+            # rowid растёт монотонно: MAX(rowid) — это O(log n), а не проход по таблице
+            cursor.execute(f'SELECT MAX(rowid) FROM "{table}"')
+        else:
+            return None
+        row = cursor.fetchone()
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Без фильтров берём оценку из статистики, с фильтрами считаем не дальше
+    count_cap строк. Маленькие таблицы по-прежнему считаются точно.
+    """
+    count_cap = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimate_table_rows(queryset.model)
+            if estimate is not None and estimate > self.count_cap:
+                return estimate
+        return queryset.order_by()[:self.count_cap + 1].count()
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+
 # =========================
 # Действия (Actions)
 # =========================
 @admin.action(description="Сделать выбранные маршруты неактивными")
 def deactivate_routes(modeladmin, request, queryset):
-    updated = queryset.update(is_active=False)
+    updated = queryset.update(is_active=False, updated_at=timezone.now())
     messages.success(request, f"{updated} маршрутов стало неактивными")
 
 @admin.action(description="Отметить выбранные грузы как 'В пути'")
 def mark_in_transit(modeladmin, request, queryset):
-    updated = queryset.update(status="in_transit")
+    updated = queryset.update(status="in_transit", updated=timezone.now())
     messages.success(request, f"{updated} грузов отмечены как 'В пути'")
 
 @admin.action(description="Отправить push-уведомления водителям")
@@ -41,6 +88,9 @@ def send_driver_notifications(modeladmin, request, queryset):
 # =========================
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
     list_display = ("phone", "first_name", "last_name", "is_driver", "is_passenger", "is_staff")
     search_fields = ("phone", "first_name", "last_name")
     list_filter = ("is_driver", "is_passenger", "is_staff", "is_superuser")
@@ -66,8 +116,10 @@ class UserAdmin(BaseUserAdmin):
 # 2. Профиль водителя
 # =========================
 @admin.register(DriverProfile)
-class DriverProfileAdmin(admin.ModelAdmin):
+class DriverProfileAdmin(LargeTableAdmin):
     list_display = ("user", "car_number", "marka", "model", "rating", "is_verified", "is_active")
+    list_select_related = ("user",)
+    autocomplete_fields = ("user",)
     search_fields = ("user__phone", "car_number", "marka", "model")
     list_filter = ("is_verified", "is_active", "color", "car_year")
     ordering = ("user__phone",)
@@ -77,8 +129,10 @@ class DriverProfileAdmin(admin.ModelAdmin):
 # 3. Профиль пассажира
 # =========================
 @admin.register(PassengerProfile)
-class PassengerProfileAdmin(admin.ModelAdmin):
+class PassengerProfileAdmin(LargeTableAdmin):
     list_display = ("user", "rating", "total_rides")
+    list_select_related = ("user",)
+    autocomplete_fields = ("user",)
     search_fields = ("user__phone",)
     ordering = ("user__phone",)
 
@@ -100,15 +154,18 @@ class UgurRouteInline(admin.StackedInline):
     model = UgurRoute
     extra = 1
     fields = ("from_place", "to_place", "departure_date", "departure_time", "available_seats", "price_per_seat")
+    autocomplete_fields = ("from_place", "to_place")
 
 
 # =========================
 # 6. Маршрут (Ugur)
 # =========================
 @admin.register(Ugur)
-class UgurAdmin(admin.ModelAdmin):
+class UgurAdmin(LargeTableAdmin):
     actions = [deactivate_routes]
     list_display = ("id", "owner", "driver", "type", "title", "is_active", "is_completed", "created_at")
+    list_select_related = ("owner", "driver")
+    autocomplete_fields = ("owner", "driver")
     list_filter = (
         "type",
         "is_active",
@@ -123,8 +180,10 @@ class UgurAdmin(admin.ModelAdmin):
 # 7. UgurRoute
 # =========================
 @admin.register(UgurRoute)
-class UgurRouteAdmin(admin.ModelAdmin):
-    list_display = ("ugur", "from_place", "to_place", "departure_date", "departure_time", "available_seats", "price_per_seat")
+class UgurRouteAdmin(LargeTableAdmin):
+    list_display = ("ugur_title", "from_place", "to_place", "departure_date", "departure_time", "available_seats", "price_per_seat")
+    list_select_related = ("ugur", "from_place", "to_place")
+    autocomplete_fields = ("ugur", "from_place", "to_place")
     list_filter = (
         ("departure_date", DateRangeFilter),
         "from_place",
@@ -132,13 +191,20 @@ class UgurRouteAdmin(admin.ModelAdmin):
     )
     search_fields = ("ugur__title",)
 
+    @admin.display(description="Ugur", ordering="ugur__title")
+    def ugur_title(self, obj):
+        # Ugur.__str__ делает routes.first(); заголовок уже посчитан при сохранении
+        return obj.ugur.title or f"Ugur #{obj.ugur_id}"
+
 
 # =========================
 # 8. Бронирование
 # =========================
 @admin.register(Booking)
-class BookingAdmin(admin.ModelAdmin):
+class BookingAdmin(LargeTableAdmin):
     list_display = ("route", "passenger", "status", "seats_booked", "created_at")
+    list_select_related = ("route__from_place", "route__to_place", "passenger")
+    autocomplete_fields = ("route", "passenger")
     list_filter = ("status", "created_at")
     search_fields = ("route__ugur__title", "passenger__phone")
 
@@ -147,8 +213,10 @@ class BookingAdmin(admin.ModelAdmin):
 # 9. Отзывы
 # =========================
 @admin.register(Review)
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(LargeTableAdmin):
     list_display = ("from_user", "to_user", "rating", "created")
+    list_select_related = ("from_user", "to_user")
+    autocomplete_fields = ("from_user", "to_user")
     list_filter = ("rating", "created")
     search_fields = ("from_user__phone", "to_user__phone")
 
@@ -157,19 +225,23 @@ class ReviewAdmin(admin.ModelAdmin):
 # 10. Грузы
 # =========================
 @admin.register(Load)
-class LoadAdmin(admin.ModelAdmin):
+class LoadAdmin(LargeTableAdmin):
     actions = [mark_in_transit]
     list_display = ("id", "sender", "status", "from_place", "to_place", "price", "created")
     list_filter = ("status", "created")
     search_fields = ("sender__phone", "receiver_name", "receiver_phone")
+    list_select_related = ("sender", "from_place", "to_place")
+    autocomplete_fields = ("sender", "ugur", "route", "from_place", "to_place")
 
 
 # =========================
 # 11. Уведомления водителей
 # =========================
 @admin.register(DriverNotification)
-class DriverNotificationAdmin(admin.ModelAdmin):
+class DriverNotificationAdmin(LargeTableAdmin):
     list_display = ("driver", "from_place", "to_place", "price", "is_seen", "created")
+    list_select_related = ("driver", "from_place", "to_place")
+    autocomplete_fields = ("driver", "from_place", "to_place")
     list_filter = ("is_seen", "created")
     search_fields = ("driver__phone", "message")
     actions = [send_driver_notifications]
@@ -179,8 +251,10 @@ class DriverNotificationAdmin(admin.ModelAdmin):
 # 12. Текущее местоположение
 # =========================
 @admin.register(CurrentPlace)
-class CurrentPlaceAdmin(admin.ModelAdmin):
+class CurrentPlaceAdmin(LargeTableAdmin):
     list_display = ("id", "user", "title", "latitude", "longitude")
     search_fields = ("title", "description", "user__phone")
-    list_filter = ("user",)
+    # фильтр по user рендерил всех пользователей — ищем по телефону через search
+    list_select_related = ("user",)
+    autocomplete_fields = ("user",)
     ordering = ("-id",)
@@ -0,0 +1,152 @@
+"""
+Geçen syýahatlary arhiwe geçirmek.
+
+Soňky ugraýyş senesi `cutoff`-dan öň bolan (ýa-da tamamlanan) Ugur-lar
+ugurlary, bronlary we ýükleri bilen bilelikde Archived* tablisalaryna
+göçürilýär we esasy tablisalardan pozulýar. Her bölek (chunk) aýratyn
+tranzaksiýada işleýär, şonuň üçin iş islendik ýerde kesilse-de maglumat ýitmeýär.
+
+Pozmak signalsyz, baglanyşyk tertibinde (çagalar birinji) göni DELETE bilen
+edilýär: kaskad signallarynyň hemmesi arhiw üçin hiç zat etmeýär (statistika
+saklanýar, tablo setirleri bile pozulýar), diňe /api/sync/ yzlary gerek — olar
+bir bulk_create bilen ýazylýar.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from . import sync
+from .models import (
+    ArchivedBooking, ArchivedLoad, ArchivedRouteStop, ArchivedUgur, ArchivedUgurRoute,
+    Booking, DepartureBoardRow, DriverNotification, Load, Match, RouteStop, SyncTombstone, Ugur, UgurRoute,
+)
+
+UGUR_FIELDS = ['id', 'owner_id', 'driver_id', 'type', 'title', 'created_at', 'updated_at', 'is_completed']
+ROUTE_FIELDS = [
+    'id', 'ugur_id', 'from_place_id', 'to_place_id',
+    'departure_date', 'departure_time', 'available_seats', 'price_per_seat',
+]
+ROUTE_STOP_FIELDS = ['id', 'route_id', 'place_id', 'position']
+BOOKING_FIELDS = ['id', 'route_id', 'passenger_id', 'seats_booked', 'from_stop', 'to_stop', 'status', 'created_at']
+LOAD_FIELDS = [
+    'id', 'sender_id', 'ugur_id', 'route_id', 'from_place_id', 'to_place_id',
+    'description', 'weight_kg', 'size',
+    'receiver_name', 'receiver_phone', 'price', 'price_negotiable', 'status', 'created', 'updated', 'delivered_at',
+]
+
+
+def get_cutoff(keep_days):
+    return timezone.localdate() - timedelta(days=keep_days)
+
+
+def _start_of(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def archivable_ugurs(cutoff):
+    """Soňky ugraýşy cutoff-dan öň bolan ýa-da tamamlanan syýahatlar."""
+    cutoff_dt = _start_of(cutoff)
+    return (
+        Ugur.objects.order_by()
+        .annotate(last_departure=Max('routes__departure_date'))
+        .filter(
+            Q(last_departure__lt=cutoff)
+            | Q(last_departure__isnull=True, created_at__lt=cutoff_dt)
+            | Q(is_completed=True, updated_at__lt=cutoff_dt)
+        )
+    )
+
+
+@transaction.atomic
+def archive_chunk(ugur_ids, cutoff=None):
+    """Bir bölek syýahaty arhiwe geçirýär. Gaýtarýar: {model: san}."""
+    ugurs = Ugur.objects.filter(pk__in=ugur_ids)
+    if cutoff is not None:
+        # список кандидатов собран заранее: ugur мог с тех пор получить новый маршрут
+        ugurs = archivable_ugurs(cutoff).filter(pk__in=ugur_ids)
+    ugurs = list(ugurs.values(*UGUR_FIELDS))
+    ugur_ids = [row['id'] for row in ugurs]
+    routes = list(UgurRoute.objects.filter(ugur_id__in=ugur_ids).values(*ROUTE_FIELDS))
+    route_ids = [row['id'] for row in routes]
+    stops = list(RouteStop.objects.filter(route_id__in=route_ids).values(*ROUTE_STOP_FIELDS))
+    bookings = list(Booking.objects.filter(route_id__in=route_ids).values(*BOOKING_FIELDS))
+    loads_qs = Load.objects.filter(Q(ugur_id__in=ugur_ids) | Q(route_id__in=route_ids))
+    loads = list(loads_qs.values(*LOAD_FIELDS))
+
+    # ignore_conflicts — повторный запуск после сбоя не падает на уже скопированных строках
+    ArchivedUgur.objects.bulk_create([ArchivedUgur(**row) for row in ugurs], ignore_conflicts=True)
+    ArchivedUgurRoute.objects.bulk_create([ArchivedUgurRoute(**row) for row in routes], ignore_conflicts=True)
+    ArchivedRouteStop.objects.bulk_create([ArchivedRouteStop(**row) for row in stops], ignore_conflicts=True)
+    ArchivedBooking.objects.bulk_create([ArchivedBooking(**row) for row in bookings], ignore_conflicts=True)
+    ArchivedLoad.objects.bulk_create([ArchivedLoad(**row) for row in loads], ignore_conflicts=True)
+
+    # без Collector и сигналов: сначала всё, что ссылается на маршруты и ugur-ы
+    for queryset in (
+        Match.objects.filter(Q(offer_id__in=route_ids) | Q(request_id__in=route_ids)),
+        DepartureBoardRow.objects.filter(route_id__in=route_ids),
+        RouteStop.objects.filter(route_id__in=route_ids),
+        Booking.objects.filter(route_id__in=route_ids),
+        loads_qs,
+        UgurRoute.objects.filter(pk__in=route_ids),
+        Ugur.objects.filter(pk__in=ugur_ids),
+    ):
+        queryset._raw_delete(queryset.db)
+    SyncTombstone.objects.bulk_create(_tombstones(ugurs, routes, bookings, loads))
+
+    return {
+        'ugurs': len(ugurs), 'routes': len(routes), 'stops': len(stops),
+        'bookings': len(bookings), 'loads': len(loads),
+    }
+
+
+def _tombstones(ugurs, routes, bookings, loads):
+    """Pozulanlaryň /api/sync/ yzlary — sync.record_deletion bilen deň, ýöne soragsyz."""
+    ugur_driver = {row['id']: row['driver_id'] for row in ugurs}
+    route_driver = {row['id']: ugur_driver.get(row['ugur_id']) for row in routes}
+    found = []
+    for row in ugurs:
+        found += sync.tombstones('ugurs', row['id'])
+    for row in routes:
+        found += sync.tombstones('routes', row['id'])
+    for row in bookings:
+        found += sync.tombstones('bookings', row['id'], {row['passenger_id'], route_driver.get(row['route_id'])})
+    for row in loads:
+        found += sync.tombstones('loads', row['id'], {row['sender_id'], ugur_driver.get(row['ugur_id'])})
+    return found
+
+
+def purge_seen_notifications(cutoff, chunk_size=1000):
+    """Okalan köne bildirişler arhiwe däl, gönüden-göni pozulýar (okalan — sanawa täsiri ýok)."""
+    queryset = DriverNotification.objects.filter(is_seen=True, created__lt=_start_of(cutoff))
+    total = 0
+    while True:
+        rows = list(queryset.values_list('pk', 'driver_id')[:chunk_size])
+        if not rows:
+            return total
+        with transaction.atomic():
+            doomed = DriverNotification.objects.filter(pk__in=[pk for pk, _ in rows])
+            total += doomed._raw_delete(doomed.db)
+            SyncTombstone.objects.bulk_create([
+                tombstone for pk, driver_id in rows for tombstone in sync.tombstones('notifications', pk, {driver_id})
+            ])
+
+
+def archive_trips(keep_days=14, chunk_size=200, dry_run=False):
+    cutoff = get_cutoff(keep_days)
+    # агрегат Max по маршрутам считается один раз, а не на каждый chunk
+    candidates = list(archivable_ugurs(cutoff).order_by('pk').values_list('pk', flat=True))
+    totals = {'ugurs': 0, 'routes': 0, 'stops': 0, 'bookings': 0, 'loads': 0, 'notifications': 0, 'tombstones': 0}
+
+    if dry_run:
+        totals['ugurs'] = len(candidates)
+        return totals
+
+    for start in range(0, len(candidates), chunk_size):
+        for key, value in archive_chunk(candidates[start:start + chunk_size], cutoff).items():
+            totals[key] += value
+
+    totals['notifications'] = purge_seen_notifications(cutoff)
+    totals['tombstones'] = sync.purge_tombstones(timezone.now() - timedelta(days=sync.tombstone_days()))
+    return totals
@@ -0,0 +1,146 @@
+"""
+JWT-de rol talaplary (claims) we bazasyz tanamak.
+
+Tokenlere ROLE_CLAIMS goşulýar: is_driver, is_passenger, is_staff we
+profilleriň id-leri. ClaimsJWTAuthentication okaýan (GET/HEAD/OPTIONS)
+soraglarda ulanyjyny bazadan okamaýar — request.user ClaimsUser bolýar;
+ýazýan soraglar öňküsi ýaly hakyky User alýar.
+
+Rol ýa-da profil üýtgände ulanyjynyň şondan öň berlen access tokenleri
+ret edilýär (keşdäki wagt belgisi `iat` bilen deňeşdirilýär). Refresh
+token bilen täze access alnanda talaplar bazadan täzeden okalýar, şonuň
+üçin müşderi gaýtadan girmeli däl.
+"""
+import time
+
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from . import replicas
+from .models import User
+
+ROLE_CLAIMS = ('is_driver', 'is_passenger', 'is_staff', 'driver_profile_id', 'passenger_profile_id')
+REVOKED_KEY = 'auth:revoked:{}'
+
+
+# ===================================================================
+# Talaplar
+# ===================================================================
+def role_claims(user, driver_profile_id=None, passenger_profile_id=None):
+    return {
+        'is_driver': user.is_driver,
+        'is_passenger': user.is_passenger,
+        'is_staff': user.is_staff,
+        'driver_profile_id': driver_profile_id,
+        'passenger_profile_id': passenger_profile_id,
+    }
+
+
+def load_claims(user_id):
+    """Talaplary bir sorag bilen bazadan okaýar; ulanyjy ýok bolsa None."""
+    row = (
+        User.objects.filter(pk=user_id, is_active=True)
+        .values('is_driver', 'is_passenger', 'is_staff', 'driver_profile__id', 'passenger_profile__id')
+        .first()
+    )
+    if row is None:
+        return None
+    return {
+        'is_driver': row['is_driver'],
+        'is_passenger': row['is_passenger'],
+        'is_staff': row['is_staff'],
+        'driver_profile_id': row['driver_profile__id'],
+        'passenger_profile_id': row['passenger_profile__id'],
+    }
+
+
+def _set_claims(token, claims):
+    for name, value in claims.items():
+        token[name] = value
+    return token
+
+
+def tokens_for(user, claims=None):
+    """(refresh, access) jübüti talaplar bilen. claims berilmese — bazadan."""
+    refresh = _set_claims(RefreshToken.for_user(user), claims or load_claims(user.pk))
+    # access копирует claims из refresh
+    return refresh, refresh.access_token
+
+
+def access_token_for(user, claims):
+    return _set_claims(AccessToken.for_user(user), claims)
+
+
+class RoleRefreshToken(RefreshToken):
+    """Refresh bilen täze access alnanda rol talaplary bazadan täzeden okalýar."""
+
+    @property
+    def access_token(self):
+        claims = load_claims(self[api_settings.USER_ID_CLAIM])
+        if claims is None:
+            raise InvalidToken("Ulanyjy tapylmady.")
+        _set_claims(self, claims)
+        access = super().access_token
+        # iat копируется из refresh; новый access не должен попасть под отзыв
+        access.set_iat()
+        return access
+
+
+# ===================================================================
+# Ýatyrmak
+# ===================================================================
+def on_user_saved(user, created):
+    # tracked_fields — поля claims; прежние значения неизвестны (объект не из базы) — отзываем
+    if not created and user.has_changed(*user.tracked_fields):
+        revoke_tokens(user.pk)
+
+
+def revoke_tokens(user_id):
+    """Ulanyjynyň şu wagta çenli berlen access tokenlerini ýatyrýar."""
+    lifetime = api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+    # дольше жизни access-токена хранить метку незачем: старые токены уже истекли
+    cache.set(REVOKED_KEY.format(user_id), int(time.time()), timeout=int(lifetime) + 1)
+
+
+def is_revoked(token):
+    revoked_at = cache.get(REVOKED_KEY.format(token[api_settings.USER_ID_CLAIM]))
+    # iat в секундах: токен, выданный в ту же секунду, что и смена роли, — уже новый
+    return revoked_at is not None and token.get('iat', 0) < revoked_at
+
+
+# ===================================================================
+# Tanamak
+# ===================================================================
+class ClaimsUser(TokenUser):
+    """Tokendäki talaplardan gurulýan ulanyjy (bazasyz)."""
+
+    def __eq__(self, other):
+        # сравнение и с TokenUser, и с моделью User (obj.owner == request.user)
+        return self.pk == getattr(other, 'pk', None)
+
+    __hash__ = TokenUser.__hash__
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        token = self.get_validated_token(raw_token)
+        if is_revoked(token):
+            raise InvalidToken("Rol üýtgedildi, tokeni täzeläň.")
+        # только что писал — читает свои данные с основной базы
+        replicas.check_recent_write(token[api_settings.USER_ID_CLAIM])
+        if request.method in SAFE_METHODS and all(name in token for name in ROLE_CLAIMS):
+            return ClaimsUser(token), token
+        # запись или старый токен без claims — полноценный пользователь из БД
+        return self.get_user(token), token
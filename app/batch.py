@@ -0,0 +1,141 @@
+"""
+/api/batch/: birnäçe API soragyny bir HTTP soragynda ýerine ýetirmek.
+
+Ulanyjy daşky soragda bir gezek tanalýar (JWT), içki soraglara bolsa
+DRF-iň `_force_auth_user` mehanizmi arkaly geçirilýär — JWT täzeden
+açylmaýar we ulanyjy bazadan täzeden okalmaýar. Yzygiderli GET soraglary
+bilelikde (ThreadPool) işleýär; ýazýan soraglar tertip boýunça, biri-birinden
+soň ýerine ýetirilýär.
+
+Içki soragyň salgysy (REMOTE_ADDR, X-Forwarded-For we ş.m.) daşky soragdan
+alynýar: elementiň headers-i olary çalşyp bilmeýär, ýogsa IP çäklerini
+aýlanyp geçmek bolardy. Içki sorag ýykylsa, diňe şol element 500 alýar.
+"""
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.urls import Resolver404, resolve
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+ALLOWED_METHODS = SAFE_METHODS + ('POST', 'PUT', 'PATCH', 'DELETE')
+# пакет внутри пакета и бесконечный SSE-поток не диспатчим
+FORBIDDEN_PATHS = ('/api/batch/', '/api/departures/stream/')
+# служебные заголовки внешнего запроса, которые не должны попасть во вложенный
+DROPPED_META = ('CONTENT_TYPE', 'CONTENT_LENGTH', 'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE', 'QUERY_STRING')
+# заголовки, которые элемент пакета задать не может: hop-by-hop, адрес клиента, хост, учётные данные
+PROTECTED_META = {
+    'HTTP_CONNECTION', 'HTTP_KEEP_ALIVE', 'HTTP_PROXY_AUTHORIZATION', 'HTTP_PROXY_AUTHENTICATE',
+    'HTTP_TE', 'HTTP_TRAILER', 'HTTP_TRANSFER_ENCODING', 'HTTP_UPGRADE',
+    'HTTP_FORWARDED', 'HTTP_X_FORWARDED_FOR', 'HTTP_X_FORWARDED_HOST', 'HTTP_X_FORWARDED_PROTO',
+    'HTTP_X_FORWARDED_PORT', 'HTTP_X_REAL_IP', 'HTTP_HOST', 'HTTP_AUTHORIZATION', 'HTTP_COOKIE',
+    'HTTP_CONTENT_LENGTH', 'HTTP_CONTENT_TYPE',
+}
+
+logger = logging.getLogger(__name__)
+
+
+def max_workers():
+    return getattr(settings, 'UGUR_BATCH_WORKERS', 4)
+
+
+def build_request(parent, item):
+    """Daşky soragdan içki WSGIRequest gurýar."""
+    url = urlsplit(item['path'])
+    body = b'' if item.get('body') is None else json.dumps(item['body']).encode()
+
+    environ = {key: value for key, value in parent.META.items() if key not in DROPPED_META}
+    environ.update({
+        'REQUEST_METHOD': item['method'],
+        'PATH_INFO': url.path,
+        'QUERY_STRING': url.query,
+        'wsgi.input': BytesIO(body),
+        'CONTENT_LENGTH': str(len(body)),
+    })
+    if body:
+        environ['CONTENT_TYPE'] = 'application/json'
+    for name, value in (item.get('headers') or {}).items():
+        key = 'HTTP_' + name.upper().replace('-', '_')
+        if key not in PROTECTED_META:
+            environ[key] = value
+
+    request = WSGIRequest(environ)
+    # DRF берёт пользователя отсюда и не запускает аутентификацию заново
+    request._force_auth_user = parent.user
+    request._force_auth_token = parent.auth
+    return request
+
+
+def render(response, item):
+    result = {'id': item.get('id'), 'status': response.status_code}
+    for header in ('ETag', 'Last-Modified', 'Retry-After'):
+        if response.has_header(header):
+            result.setdefault('headers', {})[header] = response[header]
+
+    if getattr(response, 'data', None) is not None:
+        # DRF Response: отдаём данные как есть, без повторного JSON-кодирования
+        result['body'] = response.data
+    elif getattr(response, 'streaming', False):
+        result['body'] = None
+    else:
+        content = response.content.decode() if response.content else None
+        try:
+            result['body'] = json.loads(content) if content else None
+        except ValueError:
+            result['body'] = content
+    return result
+
+
+def dispatch(parent, item):
+    path = urlsplit(item['path']).path
+    if path in FORBIDDEN_PATHS:
+        return {'id': item.get('id'), 'status': 400, 'body': {'detail': "Bu ýol paketde rugsat berilmeýär."}}
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return {'id': item.get('id'), 'status': 404, 'body': {'detail': "Tapylmady."}}
+
+    try:
+        response = match.func(build_request(parent, item), *match.args, **match.kwargs)
+        return render(response, item)
+    except Exception:
+        # DRF сам превращает свои исключения в ответы; остальное не должно ронять весь пакет
+        logger.exception("Paketdäki sorag ýykyldy: %s %s", item['method'], path)
+        return {'id': item.get('id'), 'status': 500, 'body': {'detail': "Içki ýalňyşlyk."}}
+
+
+def _dispatch_in_thread(parent, item):
+    try:
+        return dispatch(parent, item)
+    finally:
+        # у каждого потока своё соединение с БД
+        connections.close_all()
+
+
+def run(parent, items):
+    """Soraglary ýerine ýetirýär; jogaplar gelen tertipde gaýtarylýar."""
+    results = []
+    reads = []
+
+    def flush_reads():
+        if len(reads) > 1 and max_workers() > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers(), len(reads))) as pool:
+                results.extend(pool.map(lambda item: _dispatch_in_thread(parent, item), reads))
+        else:
+            results.extend(dispatch(parent, item) for item in reads)
+        reads.clear()
+
+    for item in items:
+        if item['method'] in SAFE_METHODS:
+            reads.append(item)
+            continue
+        # запись — граница: всё, что до неё, уже прочитано, всё, что после, увидит её
+        flush_reads()
+        results.append(dispatch(parent, item))
+    flush_reads()
+    return results
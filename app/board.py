@@ -0,0 +1,126 @@
+"""
+Ugraýyş tablosy: (from_place, to_place, departure_date) boýunça okamak üçin taýýar setirler.
+
+Setirler Ugur / UgurRoute / Booking / DriverProfile üýtgände signals.py arkaly
+täzelenýär, rebuild() bolsa ähli tablony gaýtadan gurýar.
+"""
+from . import events, seats
+from .models import DepartureBoardRow, DriverProfile, Ugur, UgurRoute, User
+
+BOARD_FIELDS = [
+    'ugur', 'driver', 'from_place', 'to_place', 'departure_date', 'departure_time',
+    'seats_left', 'price_per_seat', 'driver_name', 'car',
+]
+
+
+def driver_display(user):
+    if user is None:
+        return ''
+    return user.get_full_name() or user.phone
+
+
+def car_display(profile):
+    if profile is None:
+        return ''
+    car = f"{profile.marka} {profile.model}".strip()
+    if profile.color:
+        car = f"{car}, {profile.color}"
+    return f"{car} ({profile.car_number})"
+
+
+def _source_routes():
+    return (
+        UgurRoute.objects
+        .select_related('ugur__driver__driver_profile')
+        .filter(
+            ugur__is_active=True,
+            ugur__is_completed=False,
+            ugur__type=Ugur.Type.DRIVER,
+        )
+    )
+
+
+def _build_row(route):
+    driver = route.ugur.driver
+    try:
+        profile = driver.driver_profile if driver else None
+    except DriverProfile.DoesNotExist:
+        profile = None
+    return DepartureBoardRow(
+        route_id=route.pk,
+        ugur_id=route.ugur_id,
+        driver=driver,
+        from_place_id=route.from_place_id,
+        to_place_id=route.to_place_id,
+        departure_date=route.departure_date,
+        departure_time=route.departure_time,
+        # на табло — места на весь маршрут: свободные на самой загруженной секции
+        seats_left=max(route.available_seats - seats.max_booked(route), 0),
+        price_per_seat=route.price_per_seat,
+        driver_name=driver_display(driver),
+        car=car_display(profile),
+    )
+
+
+def _upsert(rows):
+    if rows:
+        DepartureBoardRow.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=['route'], update_fields=BOARD_FIELDS,
+        )
+
+
+def refresh_routes(route_ids):
+    """Tabladaky setirleri görkezilen ugurlar üçin täzeden hasaplaýar."""
+    route_ids = list(route_ids)
+    if not route_ids:
+        return
+    # прежние значения строк: события только для того, что действительно изменилось
+    existing = {
+        data['route_id']: events.row_payload(data)
+        for data in DepartureBoardRow.objects.filter(route_id__in=route_ids).values('route_id', *events.EVENT_FIELDS)
+    }
+    rows = [_build_row(route) for route in _source_routes().filter(pk__in=route_ids)]
+    _upsert(rows)
+    # неактивные / завершённые / удалённые маршруты убираем с табло
+    kept = {row.route_id for row in rows}
+    removed = [pk for pk in existing if pk not in kept]
+    if removed:
+        DepartureBoardRow.objects.filter(route_id__in=removed).delete()
+    events.board_changed(rows, existing, removed)
+
+
+def refresh_ugur(ugur_id):
+    refresh_routes(UgurRoute.objects.filter(ugur_id=ugur_id).values_list('pk', flat=True))
+
+
+def refresh_driver(user_id, profile=None):
+    """Sürüjiniň ady ýa-da ulagy üýtgände diňe iki sütün täzelenýär."""
+    if profile is not None:
+        # профиль уже в памяти (post_save) — пользователя берём из него
+        user = profile.user
+    else:
+        user = User.objects.filter(pk=user_id).select_related('driver_profile').first()
+        if user is None:
+            return
+        try:
+            profile = user.driver_profile
+        except DriverProfile.DoesNotExist:
+            profile = None
+    DepartureBoardRow.objects.filter(driver_id=user_id).update(
+        driver_name=driver_display(user), car=car_display(profile),
+    )
+
+
+def rebuild(chunk_size=1000):
+    """Tablony doly gaýtadan gurýar. Gaýtarýar: ýazylan setirleriň sany."""
+    DepartureBoardRow.objects.all().delete()
+    total = 0
+    last_pk = 0
+    while True:
+        routes = list(_source_routes().filter(pk__gt=last_pk).order_by('pk')[:chunk_size])
+        if not routes:
+            break
+        _upsert([_build_row(route) for route in routes])
+        total += len(routes)
+        last_pk = routes[-1].pk
+    return total
@@ -0,0 +1,77 @@
+"""
+Ulgam barlaglary (`manage.py check`, migrate, runserver).
+
+Tokenleri ýatyrmak (auth.py), giriş çäkleri (throttling.py, 'cache' çelekleri),
+okalmadyk bildirişleriň sanawy (counters.py) we replikalaryň read-your-writes
+belgisi (replicas.py) ähli prosesleriň umumy keşine daýanýar. Prosesiň öz
+ýadyndaky keş bilen olar her işçide aýratyn bolýar: ýatyrylan token başga
+işçide kabul edilýär, çäkler işçileriň sanyna köpelýär. Şonuň üçin
+settings.UGUR_REQUIRE_SHARED_CACHE (adatça `not DEBUG`) bolsa şeýle keş bilen
+işe başlamaga rugsat berilmeýär.
+
+Wakalaryň brokeri (settings.UGUR_EVENTS_BROKER) işe başlanda barlanýar:
+ýalňyş ýol ýa-da doly ýazylmadyk BaseBroker mirasy ilkinji wakada däl,
+`check` / runserver wagtynda görünýär.
+
+API shemasy (docs.py) gurluşda faýla ýazylmaly: `check --deploy` faýl
+ýok bolsa duýdurýar, ýogsam her işçi ony ilkinji soragda özi gurýar.
+"""
+import inspect
+
+from django.conf import settings
+from django.core.checks import Error, Warning, register
+from django.utils.module_loading import import_string
+
+# кэши, которые живут внутри одного процесса (или ничего не хранят)
+PROCESS_LOCAL_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+@register('caches')
+def shared_cache_check(app_configs, **kwargs):
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if not getattr(settings, 'UGUR_REQUIRE_SHARED_CACHE', True) or backend not in PROCESS_LOCAL_BACKENDS:
+        return []
+    return [Error(
+        f"CACHES['default'] ({backend}) diňe bir prosesiň içinde işleýär.",
+        hint="Redis ýa-da Memcached ýaly umumy keş goýuň (settings.CACHES): tokenleri ýatyrmak, "
+             "giriş çäkleri, okalmadyk bildirişler we replikalaryň belgisi ähli işçiler üçin bir bolmaly.",
+        id='app.E001',
+    )]
+
+
+@register('api_docs', deploy=True)
+def openapi_schema_check(app_configs, **kwargs):
+    path = settings.UGUR_OPENAPI_SCHEMA
+    if path.exists():
+        return []
+    return [Warning(
+        f"API shemasy {path} ýok: her işçi ony ilkinji /swagger.json soragynda ýatda gurar.",
+        hint="Gurluşda `python manage.py build_api_schema` işlediň.",
+        id='app.W001',
+    )]
+
+
+@register('events')
+def events_broker_check(app_configs, **kwargs):
+    from .events import BaseBroker
+
+    path = getattr(settings, 'UGUR_EVENTS_BROKER', 'app.events.LocalBroker')
+    try:
+        broker = import_string(path)
+    except ImportError as exc:
+        problem = f"ýüklenmedi: {exc}"
+    else:
+        if not (inspect.isclass(broker) and issubclass(broker, BaseBroker)):
+            problem = "BaseBroker-den miras alynmady"
+        elif inspect.isabstract(broker):
+            problem = f"doly ýazylmadyk: {', '.join(sorted(broker.__abstractmethods__))}"
+        else:
+            return []
+    return [Error(
+        f"UGUR_EVENTS_BROKER ({path}) {problem}.",
+        hint="publish / subscribe / unsubscribe ýazylan BaseBroker mirasyny görkeziň.",
+        id='app.E002',
+    )]
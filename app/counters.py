@@ -0,0 +1,59 @@
+"""
+Sürüjiniň okalmadyk bildirişleriniň sany keşde saklanýar.
+
+Ключ создаётся лениво одним COUNT по частичному индексу notif_unseen_idx,
+дальше только incr/decr при создании и отметке. Если ключа нет (истёк,
+сброшен), изменение уже записано в базу — ключ заполняется тем же COUNT.
+
+Кэш меняется только после COMMIT (transaction.on_commit): откаченная запись
+не должна оставлять завышенный или заниженный счётчик до истечения ключа.
+"""
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import DriverNotification
+
+UNREAD_TIMEOUT = 60 * 60 * 24
+
+
+def unread_key(driver_id):
+    return f'driver-notifications:unread:{driver_id}'
+
+
+def _count(driver_id):
+    return DriverNotification.objects.filter(driver_id=driver_id, is_seen=False).count()
+
+
+def unread_count(driver_id):
+    count = cache.get(unread_key(driver_id))
+    if count is None:
+        count = _count(driver_id)
+        cache.set(unread_key(driver_id), count, UNREAD_TIMEOUT)
+    return max(count, 0)
+
+
+def adjust_unread(driver_id, delta):
+    if delta:
+        transaction.on_commit(lambda: _adjust(driver_id, delta))
+
+
+def _adjust(driver_id, delta):
+    try:
+        if delta > 0:
+            cache.incr(unread_key(driver_id), delta)
+        else:
+            cache.decr(unread_key(driver_id), -delta)
+    except ValueError:
+        # ключа нет: изменение уже в базе, поэтому COUNT его учитывает
+        cache.add(unread_key(driver_id), _count(driver_id), UNREAD_TIMEOUT)
+
+
+def add_unread(counts):
+    """{driver_id: san} — bulk_create bilen döredilen okalmadyk bildirişler üçin (signal ýok)."""
+    for driver_id, count in counts.items():
+        adjust_unread(driver_id, count)
+
+
+def reset_unread(driver_id):
+    """Açar pozulýar: indiki unread_count() bazadan täzeden sanaýar."""
+    transaction.on_commit(lambda: cache.delete(unread_key(driver_id)))
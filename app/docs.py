@@ -0,0 +1,173 @@
+"""
+API resminamalary: /swagger.json, /swagger/, /redoc/.
+
+Shema gurluşda bir gezek `manage.py build_api_schema` bilen faýla
+(settings.UGUR_OPENAPI_SCHEMA) ýazylýar we şol faýldan berilýär; faýl ýok
+bolsa, proses ony ilkinji soragda bir gezek ýatda gurýar we duýduryş ýazýar
+(deploy barlagy app.W001 hem muny görkezýär).
+
+drf_yasg / drf_spectacular işçi prosesiň başlangyjynda ýüklenmeýär:
+view-lardaky `extend_schema` / `swagger_auto_schema` bellikleri şu ýerde
+ýatda saklanýar we diňe shema gurlanda hakyky dekoratorlar bilen goýulýar.
+Swagger UI / ReDoc sahypalary ilkinji açylanda ýüklenýär.
+"""
+import hashlib
+import importlib
+import logging
+from functools import lru_cache
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+INFO = {
+    'title': "100 ugra API",
+    'default_version': 'v1',
+    'description': "Документация API",
+}
+SCHEMA_MAX_AGE = 60 * 60
+
+logger = logging.getLogger(__name__)
+
+_deferred = []
+_applied = set()
+
+
+# ===================================================================
+# Gijikdirilen dekoratorlar
+# ===================================================================
+def _load(module, name):
+    return getattr(importlib.import_module(module), name)
+
+
+class _Deferred:
+    """Kitaphana ýüklenende gurulýan obýekt (meselem, OpenApiParameter)."""
+
+    def __init__(self, module, name, args, kwargs):
+        self.module, self.name, self.args, self.kwargs = module, name, args, kwargs
+
+    def resolve(self):
+        return _load(self.module, self.name)(*_resolve(self.args), **_resolve(self.kwargs))
+
+
+def _resolve(value):
+    if isinstance(value, _Deferred):
+        return value.resolve()
+    if isinstance(value, (list, tuple)):
+        return type(value)(_resolve(item) for item in value)
+    if isinstance(value, dict):
+        return {key: _resolve(item) for key, item in value.items()}
+    return value
+
+
+def _deferred_decorator(module, name):
+    def factory(*args, **kwargs):
+        def decorator(target):
+            # обе библиотеки меняют объект на месте, поэтому цель возвращается как есть
+            _deferred.append((module, name, args, kwargs, target))
+            return target
+        return decorator
+    factory.__name__ = name
+    return factory
+
+
+def _deferred_class(module, name):
+    def factory(*args, **kwargs):
+        return _Deferred(module, name, args, kwargs)
+    factory.__name__ = name
+    return factory
+
+
+extend_schema = _deferred_decorator('drf_spectacular.utils', 'extend_schema')
+OpenApiParameter = _deferred_class('drf_spectacular.utils', 'OpenApiParameter')
+swagger_auto_schema = _deferred_decorator('drf_yasg.utils', 'swagger_auto_schema')
+
+
+def apply(library):
+    """Kitaphananyň (meselem, 'drf_yasg') ýatda saklanan belliklerini goýýar."""
+    if library in _applied:
+        return
+    # пометки записываются при импорте view-модулей — подтягиваем их через urlconf
+    importlib.import_module(settings.ROOT_URLCONF)
+    for module, name, args, kwargs, target in _deferred:
+        # порядок записи = порядок применения декораторов (снизу вверх)
+        if module.split('.')[0] == library:
+            _load(module, name)(*_resolve(args), **_resolve(kwargs))(target)
+    _applied.add(library)
+
+
+# ===================================================================
+# Shema
+# ===================================================================
+def schema_path():
+    return settings.UGUR_OPENAPI_SCHEMA
+
+
+def build_schema():
+    """Shemany drf_yasg bilen gurýar. Gaýtarýar: JSON baýtlary."""
+    apply('drf_yasg')
+    from drf_yasg import openapi
+    from drf_yasg.codecs import OpenAPICodecJson
+    from drf_yasg.generators import OpenAPISchemaGenerator
+
+    schema = OpenAPISchemaGenerator(openapi.Info(**INFO)).get_schema(request=None, public=True)
+    return OpenAPICodecJson(validators=[]).encode(schema)
+
+
+def write_schema():
+    path = schema_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(build_schema())
+    return path
+
+
+@lru_cache(maxsize=1)
+def schema_bytes():
+    try:
+        return schema_path().read_bytes()
+    except FileNotFoundError:
+        # артефакт не собран — строим один раз на процесс, но не молча
+        logger.warning(
+            "%s ýok: shema ýatda gurulýar. Gurluşda `manage.py build_api_schema` işlediň.", schema_path(),
+        )
+        return build_schema()
+
+
+@lru_cache(maxsize=1)
+def schema_etag():
+    return hashlib.md5(schema_bytes()).hexdigest()
+
+
+@condition(etag_func=lambda request: schema_etag())
+def schema_json(request):
+    response = HttpResponse(schema_bytes(), content_type='application/json')
+    patch_cache_control(response, public=True, max_age=SCHEMA_MAX_AGE)
+    return response
+
+
+# ===================================================================
+# Swagger UI / ReDoc
+# ===================================================================
+@lru_cache(maxsize=None)
+def _page_view(renderer):
+    from drf_yasg import openapi
+
+    class DocsPageView(APIView):
+        # страница берёт спецификацию по SPEC_URL (/swagger.json), сама схему не строит
+        permission_classes = [AllowAny]
+        renderer_classes = [_load('drf_yasg.renderers', renderer)]
+
+        def get(self, request):
+            return Response(openapi.Swagger(info=openapi.Info(**INFO), _prefix='/', paths=openapi.Paths({})))
+
+    return DocsPageView.as_view()
+
+
+def page(renderer):
+    def view(request, *args, **kwargs):
+        return _page_view(renderer)(request, *args, **kwargs)
+    return view
@@ -0,0 +1,240 @@
+"""
+Sürüjiniň günlik jemleri (DriverDailyStats): syýahatlar, satylan orunlar,
+girdeji we gowşurylan ýükler.
+
+Bron ýa-da ýük üýtgände diňe degişli (sürüji, gün) setiri çeşmeden (arhiw
+bilen bilelikde) gaýtadan hasaplanýar; dashboard bolsa diňe şu tablisany okaýar.
+
+ * orun satyldy — Booking.status CONFIRMED ýa-da COMPLETED, ugraýan güni boýunça;
+ * syýahat — şol gün iň bolmanda bir orny satylan ugur (UgurRoute);
+ * girdeji — seats_booked × price_per_seat;
+ * ýük — gowşurylan güni (Load.delivered_at) boýunça.
+
+DriverProfile.total_trips bu ýerde däl-de, ugur tamamlananda (lifecycle.py)
+artdyrylýar: öňdäki tassyklanan syýahatlar ýerine ýetirilen däl.
+"""
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import (
+    ArchivedBooking, ArchivedLoad, ArchivedUgurRoute, Booking, DriverDailyStats, DriverProfile, Load, Ugur,
+    UgurRoute, loaded_values,
+)
+
+SOLD_STATUSES = (Booking.Status.CONFIRMED, Booking.Status.COMPLETED)
+
+STAT_FIELDS = ['trips', 'seats_sold', 'revenue', 'loads_delivered']
+
+
+def _booking_totals(model, **lookup):
+    return (
+        model.objects.filter(status__in=SOLD_STATUSES, **lookup)
+        .values(driver_id=F('route__ugur__driver_id'), day=F('route__departure_date'))
+        .annotate(
+            seats_sold=Sum('seats_booked'),
+            revenue=Coalesce(
+                Sum(F('seats_booked') * F('route__price_per_seat')),
+                Decimal(0), output_field=DecimalField(max_digits=12, decimal_places=2),
+            ),
+            trips=Count('route', distinct=True),
+        )
+        .order_by()
+    )
+
+
+def _load_totals(model, **lookup):
+    return (
+        model.objects.filter(status=Load.Status.DELIVERED, **lookup)
+        .values(driver_id=F('ugur__driver_id'), day=TruncDate('delivered_at'))
+        .annotate(loads_delivered=Count('pk'))
+        .order_by()
+    )
+
+
+def _merge(rows, totals):
+    for row in totals:
+        if row['driver_id'] is None:
+            continue
+        stats = rows[row['driver_id'], row['day']]
+        for field, value in row.items():
+            if field not in ('driver_id', 'day'):
+                setattr(stats, field, getattr(stats, field) + value)
+
+
+def _empty():
+    return DriverDailyStats(trips=0, seats_sold=0, revenue=Decimal(0), loads_delivered=0)
+
+
+def day_bounds(day):
+    """Ýerli günüň [başy, soňy) — `__date` lookup-dan tapawutlylykda indeksi ulanýar."""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+
+
+def add_trips(trips):
+    """{driver_id: san} — DriverProfile.total_trips-e; bir UPDATE her dürli san üçin."""
+    by_count = defaultdict(list)
+    for driver_id, count in trips.items():
+        by_count[count].append(driver_id)
+    for count, driver_ids in by_count.items():
+        DriverProfile.objects.filter(user_id__in=driver_ids).update(total_trips=F('total_trips') + count)
+
+
+@transaction.atomic
+def recompute(driver_id, day):
+    """Bir (sürüji, gün) setirini çeşmeden gaýtadan hasaplaýar: iki UNION sorag we bir upsert."""
+    rows = defaultdict(_empty)
+    bookings = {'route__ugur__driver_id': driver_id, 'route__departure_date': day}
+    _merge(rows, _booking_totals(Booking, **bookings).union(_booking_totals(ArchivedBooking, **bookings), all=True))
+    start, end = day_bounds(day)
+    loads = {'ugur__driver_id': driver_id, 'delivered_at__gte': start, 'delivered_at__lt': end}
+    _merge(rows, _load_totals(Load, **loads).union(_load_totals(ArchivedLoad, **loads), all=True))
+
+    stats = rows.get((driver_id, day))
+    if stats is None:
+        DriverDailyStats.objects.filter(driver_id=driver_id, day=day).delete()
+        return
+    stats.driver_id, stats.day = driver_id, day
+    DriverDailyStats.objects.bulk_create(
+        [stats], update_conflicts=True, unique_fields=['driver', 'day'],
+        update_fields=STAT_FIELDS + ['updated_at'],
+    )
+
+
+def completed_trips():
+    """{driver_id: san}: tamamlanan (lifecycle.py) we arhiwe geçen ugurlar."""
+    trips = Counter()
+    for queryset in (UgurRoute.objects.filter(completed_at__isnull=False), ArchivedUgurRoute.objects.all()):
+        trips.update(dict(
+            queryset.filter(ugur__driver__isnull=False)
+            .values_list('ugur__driver_id').annotate(count=Count('pk')).order_by()
+        ))
+    return trips
+
+
+def rebuild(batch_size=1000):
+    """Ähli jemleri bir gezekde GROUP BY bilen gurýar. Gaýtarýar: setirleriň sany."""
+    rows = defaultdict(_empty)
+    for model in (Booking, ArchivedBooking):
+        _merge(rows, _booking_totals(model))
+    for model in (Load, ArchivedLoad):
+        _merge(rows, _load_totals(model))
+
+    objs = []
+    for (driver_id, day), stats in rows.items():
+        stats.driver_id, stats.day = driver_id, day
+        objs.append(stats)
+    with transaction.atomic():
+        DriverDailyStats.objects.all().delete()
+        DriverDailyStats.objects.bulk_create(objs, batch_size=batch_size)
+        DriverProfile.objects.update(total_trips=0)
+        add_trips(completed_trips())
+    return len(objs)
+
+
+# ===================================================================
+# Signallar üçin: öňki ýagdaý we täzelenmeli (sürüji, gün) jübütleri
+# ===================================================================
+# data — __dict__ или loaded_values: отложенные поля не вызывают запрос
+def booking_key(data):
+    return data.get('route_id'), data.get('status'), data.get('seats_booked')
+
+
+def load_key(data):
+    return data.get('ugur_id'), data.get('status'), data.get('delivered_at')
+
+
+def route_key(data):
+    return data.get('departure_date'), data.get('price_per_seat')
+
+
+KEY_FUNCTIONS = {Booking: booking_key, Load: load_key, UgurRoute: route_key}
+
+
+def _booking_days(old, new):
+    (old_route, old_status, _), (new_route, new_status, _) = old, new
+    route_ids = {old_route} if old_status in SOLD_STATUSES else set()
+    if new_status in SOLD_STATUSES:
+        route_ids.add(new_route)
+    route_ids.discard(None)
+    if not route_ids:
+        return set()
+    return set(
+        UgurRoute.objects.filter(pk__in=route_ids, ugur__driver__isnull=False)
+        .values_list('ugur__driver_id', 'departure_date')
+    )
+
+
+def _load_days(old, new):
+    pairs = {(ugur_id, delivered_at) for ugur_id, _, delivered_at in (old, new) if ugur_id and delivered_at}
+    drivers = dict(
+        Ugur.objects.filter(pk__in={ugur_id for ugur_id, _ in pairs}, driver__isnull=False)
+        .values_list('pk', 'driver_id')
+    ) if pairs else {}
+    return {
+        (drivers[ugur_id], timezone.localdate(delivered_at))
+        for ugur_id, delivered_at in pairs if ugur_id in drivers
+    }
+
+
+def _route_days(route, old, new):
+    driver_id = Ugur.objects.filter(pk=route.ugur_id).values_list('driver_id', flat=True).first()
+    if driver_id is None:
+        return set()
+    return {(driver_id, day) for day, _ in (old, new) if day is not None}
+
+
+def remember_driver(ugur):
+    """pre_save: bazadan okalmadyk ugur üçin öňki sürüji — ýazylmazdan öňki setirden."""
+    if ugur.pk is not None and loaded_values(ugur) is None:
+        ugur._loaded_values = Ugur.objects.filter(pk=ugur.pk).values(*Ugur.tracked_fields).first() or {}
+
+
+def on_ugur_changed(ugur, created=False):
+    """
+    post_save Ugur: sürüji çalşylanda satylan orunlar we ýükler täze sürüjä geçýär —
+    iki sürüjiniň hem syýahatyň ugraýyş we gowşuryş günlerini gaýtadan hasaplaýar.
+    """
+    if created or not ugur.has_changed('driver_id'):
+        return
+    drivers = {ugur.driver_id, (loaded_values(ugur) or {}).get('driver_id')} - {None}
+    days = set(UgurRoute.objects.filter(ugur=ugur).values_list('departure_date', flat=True))
+    days |= {
+        timezone.localdate(delivered_at)
+        for delivered_at in Load.objects.filter(ugur=ugur, delivered_at__isnull=False)
+        .values_list('delivered_at', flat=True)
+    }
+    for driver_id in drivers:
+        for day in days:
+            recompute(driver_id, day)
+
+
+def on_changed(instance, created=False, deleted=False):
+    """post_save / post_delete: üýtgän (sürüji, gün) setirlerini täzeden hasaplaýar."""
+    key = KEY_FUNCTIONS[type(instance)]
+    new = key(instance.__dict__)
+    if created:
+        if isinstance(instance, UgurRoute):
+            return  # у нового маршрута ещё нет броней
+        old = None
+    else:
+        loaded = loaded_values(instance)
+        old = None if loaded is None else key(loaded)
+        if old == new and not deleted:
+            return
+
+    old = old or (None,) * len(new)
+    if isinstance(instance, Booking):
+        days = _booking_days(old, new)
+    elif isinstance(instance, Load):
+        days = _load_days(old, new)
+    else:
+        days = _route_days(instance, old, new)
+    for driver_id, day in days:
+        recompute(driver_id, day)
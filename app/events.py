@@ -0,0 +1,209 @@
+"""
+Ugraýyşlar boýunça hakyky wagtdaky wakalar (Server-Sent Events).
+
+Ugraýyş tablosy (board.py) üýtgände her ugur (from_place → to_place) üçin
+kiçi waka çap edilýär: `created`, `updated` (boş orunlar, baha, wagt) ýa-da
+`cancelled`. Üýtgemedik setir üçin waka ýok; ugry (from/to) üýtgän setir köne
+kanala `cancelled`, täzesine `created` bolup gidýär. Wakalar diňe tranzaksiýa
+tamamlanandan soň iberilýär.
+
+Wakanyň id-si prosesiň tötänleýin belgisinden we sanawdan ybarat: birnäçe
+işçide-de gaýtalanmaýar. Köne wakalar saklanmaýar (Last-Event-ID bilen
+gaýtadan ibermek ýok) — täzeden birikýän müşderi tablony okamaly.
+
+Broker settings.UGUR_EVENTS_BROKER arkaly saýlanýar. LocalBroker diňe bir
+prosesiň içinde işleýär; birnäçe prosesli işde BaseBroker-den miras alyp,
+publish-i umumy kanala (Redis pub/sub we ş.m.) ugradýan, gelen wakalary
+bolsa deliver() bilen ýerli ýazylanlara paýlaýan broker goýmaly.
+"""
+import abc
+import asyncio
+import itertools
+import json
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+EVENT_FIELDS = [
+    'ugur_id', 'from_place_id', 'to_place_id', 'departure_date', 'departure_time',
+    'seats_left', 'price_per_seat',
+]
+
+# сколько событий может накопиться у медленного клиента, прежде чем его отключим
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def channel_name(from_place_id, to_place_id):
+    return f'{from_place_id}:{to_place_id}'
+
+
+class Subscription:
+    """Bir müşderiniň ýazylmasy: öz event loop-ynda asyncio.Queue."""
+
+    def __init__(self, channels):
+        self.channels = frozenset(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def _put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # клиент не успевает читать — пусть переподключится и перечитает табло
+            self.overflowed = True
+
+    def push(self, message):
+        # publish вызывается из синхронного потока, очередь живёт в event loop-е
+        self.loop.call_soon_threadsafe(self._put, message)
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class BaseBroker(abc.ABC):
+    """
+    Wakalary kanallar boýunça paýlaýar. publish() sinhron koddan çagyrylýar.
+    Doly ýazylmadyk miras get_broker()-de (we app.E002 barlagynda) ýykylýar.
+    """
+
+    @abc.abstractmethod
+    def publish(self, channel, message):
+        """Wakany kanala iberýär."""
+
+    @abc.abstractmethod
+    def subscribe(self, channels):
+        """Gaýtarýar: Subscription."""
+
+    @abc.abstractmethod
+    def unsubscribe(self, subscription):
+        """subscribe()-iň gaýtaran ýazylmasyny aýyrýar."""
+
+
+class LocalBroker(BaseBroker):
+    """Bir prosesiň içindäki pub/sub: kanal → ýazylmalar."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._channels = {}
+
+    def publish(self, channel, message):
+        self.deliver(channel, message)
+
+    def deliver(self, channel, message):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            subscription.push(message)
+
+    def subscribe(self, channels):
+        subscription = Subscription(channels)
+        with self._lock:
+            for channel in subscription.channels:
+                self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._channels.get(channel)
+                if subscribers is None:
+                    continue
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[channel]
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(set().union(*self._channels.values())) if self._channels else 0
+
+
+_broker = None
+_broker_lock = threading.Lock()
+# id событий: префикс процесса + счётчик, чтобы воркеры не выдавали одинаковые id
+_process_id = uuid.uuid4().hex[:12]
+_event_ids = itertools.count(1)
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                path = getattr(settings, 'UGUR_EVENTS_BROKER', 'app.events.LocalBroker')
+                _broker = import_string(path)()
+    return _broker
+
+
+def format_event(kind, payload):
+    """SSE formatyndaky bir waka."""
+    data = json.dumps(payload, cls=DjangoJSONEncoder, separators=(',', ':'))
+    return f'id: {_process_id}-{next(_event_ids)}\nevent: {kind}\ndata: {data}\n\n'
+
+
+def _publish_on_commit(events):
+    if not events:
+        return
+
+    def send():
+        broker = get_broker()
+        for channel, message in events:
+            broker.publish(channel, message)
+
+    transaction.on_commit(send)
+
+
+def row_payload(data):
+    """{'route_id', *EVENT_FIELDS} sözlüginden wakanyň maglumaty."""
+    payload = {'route': data['route_id']}
+    for field in EVENT_FIELDS:
+        payload[field.removesuffix('_id')] = data[field]
+    return payload
+
+
+def board_changed(rows, existing, removed):
+    """
+    board.refresh_routes-den çagyrylýar.
+
+    rows — täze/täzelenen DepartureBoardRow-lar, existing — öň tablada bar
+    bolan setirleriň maglumaty {route_id: row_payload}, removed — tablodan
+    aýrylan route id-ler.
+    """
+    events = []
+    for row in rows:
+        payload = row_payload(row.__dict__)
+        channel = channel_name(row.from_place_id, row.to_place_id)
+        old = existing.get(row.route_id)
+        if old == payload:
+            continue
+        if old is None:
+            kind = 'created'
+        elif (old['from_place'], old['to_place']) != (payload['from_place'], payload['to_place']):
+            # подписчики старого направления должны убрать строку
+            events.append((
+                channel_name(old['from_place'], old['to_place']),
+                format_event('cancelled', {'route': row.route_id}),
+            ))
+            kind = 'created'
+        else:
+            kind = 'updated'
+        events.append((channel, format_event(kind, payload)))
+    for route_id in removed:
+        old = existing[route_id]
+        events.append((
+            channel_name(old['from_place'], old['to_place']),
+            format_event('cancelled', {'route': route_id}),
+        ))
+    _publish_on_commit(events)
+
+
+def route_deleted(route):
+    """Ugur pozulanda tablonyň setiri kaskad bilen aýrylýar — signal arkaly habar berilýär."""
+    _publish_on_commit([(
+        channel_name(route.from_place_id, route.to_place_id),
+        format_event('cancelled', {'route': route.pk}),
+    )])
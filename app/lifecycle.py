@@ -0,0 +1,117 @@
+"""
+Ugraýyş wagty geçen syýahatlary tamamlamak (`manage.py complete_trips`, cron bilen).
+
+Entek tamamlanmadyk we ugraýyş wagty geçen UgurRoute-lar
+route_pending_completion_idx indeksi boýunça bölek-bölek alynýar. Her bölek
+bir tranzaksiýada we diňe set-based UPDATE bilen:
+
+ * ugurlar completed_at belgisi bilen eýelenýär — şol belgili setirler diňe
+   şu işçiniňki, şonuň üçin birwagtda işledilen iş olary iki gezek sanamaýar;
+ * tassyklanan bronlar → COMPLETED, berkidilen ýükler → DELIVERED;
+ * ähli ugurlary tamamlanan Ugur → is_completed;
+ * PassengerProfile.total_rides we DriverProfile.total_trips (sürüjili her
+   tamamlanan ugur — bir syýahat) birmeňzeş artdyrma boýunça toparlanyp F()
+   bilen artdyrylýar.
+
+UPDATE signallary ibermeýär: tablo, jübütler we sürüjiniň günlik jemleri şu
+ýerde täzelenýär.
+"""
+from collections import Counter, defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from . import board, driver_stats
+from .models import Booking, Load, Match, PassengerProfile, Ugur, UgurRoute
+
+# грузы, которые едут с водителем и считаются доставленными по прибытии
+CARRIED_STATUSES = (Load.Status.ASSIGNED, Load.Status.IN_TRANSIT)
+
+
+def departed(now):
+    """Ugraýyş wagty geçen, entek tamamlanmadyk ugurlar. Wagty bellenmedik ugur — gün gutaranda."""
+    local = timezone.localtime(now)
+    return (
+        UgurRoute.objects.filter(completed_at__isnull=True)
+        .filter(Q(departure_date__lt=local.date()) | Q(departure_date=local.date(), departure_time__lte=local.time()))
+        .order_by('departure_date', 'departure_time')
+    )
+
+
+def claim(now, chunk_size):
+    """Bir bölek ugry eýeleýär. Gaýtarýar: (tapylan id-ler, [(route_id, ugur_id)] eýelenenler, belgi)."""
+    candidates = departed(now)
+    if connection.features.has_select_for_update_skip_locked:
+        # PostgreSQL: параллельные запуски берут разные строки, не дожидаясь друг друга
+        candidates = candidates.select_for_update(skip_locked=True)
+    ids = list(candidates.values_list('pk', flat=True)[:chunk_size])
+    if not ids:
+        return ids, [], None
+    stamp = timezone.now()
+    UgurRoute.objects.filter(pk__in=ids, completed_at__isnull=True).update(completed_at=stamp, updated_at=stamp)
+    # только строки с нашей меткой: остальные уже забрал другой запуск
+    claimed = list(UgurRoute.objects.filter(pk__in=ids, completed_at=stamp).values_list('pk', 'ugur_id'))
+    return ids, claimed, stamp
+
+
+def add_rides(rides):
+    """{passenger_id: san} — bir UPDATE her dürli san üçin, ýolagçy üçin däl."""
+    by_count = defaultdict(list)
+    for passenger_id, count in rides.items():
+        by_count[count].append(passenger_id)
+    for count, passenger_ids in by_count.items():
+        PassengerProfile.objects.filter(user_id__in=passenger_ids).update(total_rides=F('total_rides') + count)
+
+
+def complete_chunk(claimed, stamp):
+    route_ids = [route_id for route_id, _ in claimed]
+    ugur_ids = {ugur_id for _, ugur_id in claimed}
+
+    trips = Counter(dict(
+        UgurRoute.objects.filter(pk__in=route_ids, ugur__driver__isnull=False)
+        .values_list('ugur__driver_id').annotate(count=Count('pk')).order_by()
+    ))
+    driver_stats.add_trips(trips)
+
+    bookings = Booking.objects.filter(route_id__in=route_ids, status=Booking.Status.CONFIRMED)
+    rides = Counter(dict(bookings.values_list('passenger_id').annotate(count=Count('pk')).order_by()))
+    completed_bookings = bookings.update(status=Booking.Status.COMPLETED, updated_at=stamp)
+    add_rides(rides)
+
+    # Ugur tamamlanýar, haçan-da onuň hiç bir ugry garaşmaýan bolsa
+    completed_ugurs = list(
+        Ugur.objects.filter(pk__in=ugur_ids, is_completed=False)
+        .exclude(routes__completed_at__isnull=True)
+        .values_list('pk', flat=True)
+    )
+    Ugur.objects.filter(pk__in=completed_ugurs).update(is_completed=True, updated_at=stamp)
+
+    loads = Load.objects.filter(status__in=CARRIED_STATUSES).filter(
+        Q(route_id__in=route_ids) | Q(route__isnull=True, ugur_id__in=completed_ugurs)
+    )
+    drivers = set(loads.filter(ugur__driver__isnull=False).values_list('ugur__driver_id', flat=True))
+    delivered = loads.update(status=Load.Status.DELIVERED, delivered_at=stamp, updated=stamp)
+
+    # производные данные, которые обычно ведут сигналы
+    Match.objects.filter(Q(offer_id__in=route_ids) | Q(request_id__in=route_ids)).delete()
+    board.refresh_routes(UgurRoute.objects.filter(ugur_id__in=completed_ugurs).values_list('pk', flat=True))
+    day = timezone.localdate(stamp)
+    for driver_id in drivers:
+        driver_stats.recompute(driver_id, day)
+
+    return {'routes': len(route_ids), 'ugurs': len(completed_ugurs), 'bookings': completed_bookings, 'loads': delivered}
+
+
+def complete_departed(now=None, chunk_size=500):
+    """Gidenleriň ählisini tamamlaýar. Gaýtarýar: {model: san}."""
+    now = now or timezone.now()
+    totals = Counter(routes=0, ugurs=0, bookings=0, loads=0)
+    while True:
+        with transaction.atomic():
+            ids, claimed, stamp = claim(now, chunk_size)
+            if not ids:
+                break
+            if claimed:
+                totals.update(complete_chunk(claimed, stamp))
+    return dict(totals)
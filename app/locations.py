@@ -0,0 +1,166 @@
+"""
+Sürüjileriň GPS nokatlaryny ýygnamak.
+
+Gelen nokatlar bazada däl, prosesiň ýadynda saklanýar: her ulanyjy üçin diňe
+iň täze nokat. Her UGUR_LOCATION_FLUSH_INTERVAL sekuntda ýygnalan ýerler LastKnownPosition
+tablisasyna bir upsert bilen ýazylýar, ýoluň yzy (LocationTrailPoint) bolsa
+her UGUR_LOCATION_TRAIL_SECONDS üçin iň köp bir nokat bilen seýrekleşdirilýär. Şeýlelikde
+ýazgylaryň sany nokatlaryň ýygylygyna däl, diňe sürüjileriň sanyna bagly.
+
+Howpsuzlyk penjiresi: proses duýdansyz öldürilse (SIGKILL, OOM), soňky
+UGUR_LOCATION_FLUSH_INTERVAL sekundyň nokatlary ýitýär. Adaty çykyşda
+atexit galanlary ýazýar; ýazyp bolmadyk nokatlar ýatda galýar we indiki
+gezek gaýtadan synanyşylýar.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from .models import LastKnownPosition, LocationTrailPoint
+
+logger = logging.getLogger(__name__)
+
+POSITION_FIELDS = ['latitude', 'longitude', 'speed', 'heading', 'recorded_at']
+# auto_now при upsert не обновляется сам: поле должно быть в update_fields
+UPSERT_FIELDS = POSITION_FIELDS + ['updated_at']
+
+
+def flush_interval():
+    return getattr(settings, 'UGUR_LOCATION_FLUSH_INTERVAL', 5)
+
+
+def trail_seconds():
+    # 0 — история маршрута не пишется
+    return getattr(settings, 'UGUR_LOCATION_TRAIL_SECONDS', 60)
+
+
+class PositionBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latest = {}          # user_id -> точка
+        self._trail = {}           # (user_id, корзина) -> точка
+        self._trail_written = {}   # user_id -> последняя записанная корзина
+        self._last_flush = time.monotonic()
+        self._flusher = None
+
+    def add(self, user_id, points):
+        """points — recorded_at, latitude, longitude, ... açarly sözlükler."""
+        step = trail_seconds()
+        with self._lock:
+            latest = self._latest.get(user_id)
+            for point in points:
+                if latest is None or point['recorded_at'] >= latest['recorded_at']:
+                    latest = point
+                if step:
+                    bucket = int(point['recorded_at'].timestamp() // step)
+                    if bucket > self._trail_written.get(user_id, -1):
+                        # в корзине остаётся первая точка интервала
+                        self._trail.setdefault((user_id, bucket), point)
+            self._latest[user_id] = latest
+        self._ensure_flusher()
+
+    def get(self, user_id):
+        with self._lock:
+            return self._latest.get(user_id)
+
+    def flush(self):
+        """Ýygnalan nokatlary bazada ýazýar. Gaýtarýar: (ýerler, yzyň nokatlary)."""
+        with self._lock:
+            latest, self._latest = self._latest, {}
+            trail, self._trail = self._trail, {}
+            for user_id, bucket in trail:
+                if bucket > self._trail_written.get(user_id, -1):
+                    self._trail_written[user_id] = bucket
+            self._last_flush = time.monotonic()
+
+        try:
+            self._write(latest, trail)
+        except Exception:
+            self._restore(latest, trail)
+            raise
+        return len(latest), len(trail)
+
+    def _write(self, latest, trail):
+        if latest:
+            LastKnownPosition.objects.bulk_create(
+                [
+                    LastKnownPosition(user_id=user_id, **{f: point.get(f) for f in POSITION_FIELDS})
+                    for user_id, point in latest.items()
+                ],
+                update_conflicts=True,
+                unique_fields=['user'],
+                update_fields=UPSERT_FIELDS,
+            )
+        if trail:
+            LocationTrailPoint.objects.bulk_create([
+                LocationTrailPoint(
+                    user_id=user_id, latitude=point['latitude'], longitude=point['longitude'],
+                    recorded_at=point['recorded_at'],
+                )
+                for (user_id, _), point in sorted(trail.items())
+            ])
+
+    def _restore(self, latest, trail):
+        # пачка не записана — возвращаем, если за это время не пришли точки новее
+        with self._lock:
+            for user_id, point in latest.items():
+                current = self._latest.get(user_id)
+                if current is None or current['recorded_at'] < point['recorded_at']:
+                    self._latest[user_id] = point
+            for key, point in trail.items():
+                self._trail.setdefault(key, point)
+
+    def close(self):
+        """Prosesden çykanda: ýatdaky nokatlary ýazýar."""
+        with self._lock:
+            if not self._latest and not self._trail:
+                return
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Çykyşda GPS nokatlaryny ýazyp bolmady")
+
+    def _ensure_flusher(self):
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(
+                    target=self._run, name='location-flusher', daemon=True,
+                )
+                self._flusher.start()
+
+    def _run(self):
+        # поток живёт, пока есть что писать; следующий add() запустит его снова
+        while True:
+            time.sleep(max(0.0, self._last_flush + flush_interval() - time.monotonic()))
+            with self._lock:
+                if not self._latest:
+                    self._flusher = None
+                    return
+            try:
+                self.flush()
+            except Exception:
+                # потерянная пачка точек не должна останавливать поток
+                logger.exception("GPS nokatlaryny ýazyp bolmady")
+            finally:
+                connection.close()
+
+
+buffer = PositionBuffer()
+# daemon-поток при выходе просто останавливается — дописываем буфер сами
+atexit.register(buffer.close)
+
+
+def ingest(user_id, points):
+    buffer.add(user_id, points)
+
+
+def last_position(user_id):
+    """Ilki ýatdaky (entek ýazylmadyk) nokat, ýok bolsa bazadaky."""
+    point = buffer.get(user_id)
+    if point is not None:
+        return point
+    return LastKnownPosition.objects.filter(user_id=user_id).values(*POSITION_FIELDS).first()
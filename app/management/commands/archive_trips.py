@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from app import archive
+
+
+class Command(BaseCommand):
+    help = "Geçen syýahatlary (ugurlar, bronlar, ýükler) arhiw tablisalaryna geçirýär"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-days', type=int, default=14,
+                            help="Şu günden näçe gün öňki syýahatlar esasy tablisada galýar")
+        parser.add_argument('--chunk-size', type=int, default=200,
+                            help="Bir tranzaksiýadaky syýahatlaryň sany")
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        totals = archive.archive_trips(
+            keep_days=options['keep_days'],
+            chunk_size=options['chunk_size'],
+            dry_run=options['dry_run'],
+        )
+        summary = ", ".join(f"{key}: {value}" for key, value in totals.items())
+        self.stdout.write(self.style.SUCCESS(summary))
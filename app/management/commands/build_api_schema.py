@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from app import docs
+
+
+class Command(BaseCommand):
+    help = "OpenAPI shemasyny gurup, settings.UGUR_OPENAPI_SCHEMA faýlyna ýazýar (/swagger.json)"
+
+    def handle(self, *args, **options):
+        path = docs.write_schema()
+        self.stdout.write(self.style.SUCCESS(f"Shema ýazyldy: {path}"))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from app import lifecycle
+
+
+class Command(BaseCommand):
+    help = "Ugraýyş wagty geçen syýahatlary tamamlaýar: bronlar, ýükler we ýolagçylaryň sanawlary"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help="Bir tranzaksiýadaky ugurlaryň sany")
+
+    def handle(self, *args, **options):
+        totals = lifecycle.complete_departed(chunk_size=options['chunk_size'])
+        summary = ", ".join(f"{key}: {value}" for key, value in totals.items())
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from app import board
+
+
+class Command(BaseCommand):
+    help = "Ugraýyş tablosyny (DepartureBoardRow) Ugur/UgurRoute/Booking maglumatlaryndan täzeden gurýar"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = board.rebuild(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"{total} setir ýazyldy"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from app import driver_stats
+
+
+class Command(BaseCommand):
+    help = "Sürüjileriň günlik jemlerini (DriverDailyStats) we DriverProfile.total_trips-i täzeden gurýar"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = driver_stats.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{total} setir ýazyldy"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from app import price_stats
+
+
+class Command(BaseCommand):
+    help = "Ugurlar boýunça bahalaryň hepdelik statistikasyny (CorridorPriceStats) täzeden gurýar"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = price_stats.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{total} setir ýazyldy"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from app import search
+
+
+class Command(BaseCommand):
+    help = "Doly tekstli gözleg indekslerini (SQLite FTS5) esasy tablisalardan täzeden gurýar"
+
+    def handle(self, *args, **options):
+        search.rebuild()
+        self.stdout.write(self.style.SUCCESS("Gözleg indeksi täzelendi"))
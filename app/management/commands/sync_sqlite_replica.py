@@ -0,0 +1,24 @@
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = "Ýerli synag üçin: esasy SQLite bazasyny replika faýlyna göçürýär (sqlite3 backup)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='replica', help="Replikanyň aliasy")
+
+    def handle(self, *args, **options):
+        source, target = connections[DEFAULT_DB_ALIAS], connections[options['database']]
+        if source.vendor != 'sqlite' or target.vendor != 'sqlite':
+            raise CommandError("Diňe SQLite bazalary üçin.")
+        # backup копирует страницы согласованно, даже если основная база в это время пишется
+        src, dst = sqlite3.connect(source.settings_dict['NAME']), sqlite3.connect(target.settings_dict['NAME'])
+        try:
+            src.backup(dst)
+        finally:
+            src.close()
+            dst.close()
+        self.stdout.write(self.style.SUCCESS(f"Göçürildi: {target.settings_dict['NAME']}"))
@@ -0,0 +1,220 @@
+"""
+Ýolagçy islegleri (Ugur.Type.PASSENGER) bilen sürüji hödürlerini (DRIVER) jübütlemek.
+
+Täze ýa-da üýtgedilen bildiriş diňe garşy tarapyň şol ugurdaky (from_place,
+to_place) we ugraýyş wagty ±settings.UGUR_MATCH_WINDOW_HOURS aralygyndaky
+bildirişleri bilen deňeşdirilýär:
+
+ * islege — hödürler ugraýyş tablosyndan (board_pair_date_idx), boş orun
+   we baha çägi SQL-de süzülýär;
+ * hödüre — garaşýan islegler UgurRoute-dan (route_pair_departure_idx).
+
+Islegiň available_seats-i — gerek orunlar, price_per_seat — tölemäge razy
+bolan iň ýokary baha. Iň laýyk settings.UGUR_MATCH_MAX_RESULTS jübüt Match
+tablisasynda saklanýar; täze jübütler barada sürüjä DriverNotification we
+iki tarapa hem push iberilýär. Ähli bildirişler gaýtadan gözden geçirilmeýär.
+"""
+from collections import Counter
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from . import counters, seats
+from .models import DepartureBoardRow, DriverNotification, Match, Ugur, UgurRoute, User
+from .utils import send_push
+
+# доли в оценке: близость по времени важнее цены
+TIME_WEIGHT = 0.7
+PRICE_WEIGHT = 0.3
+
+
+def window():
+    return timedelta(hours=getattr(settings, 'UGUR_MATCH_WINDOW_HOURS', 3))
+
+
+def max_results():
+    return getattr(settings, 'UGUR_MATCH_MAX_RESULTS', 20)
+
+
+def day_range(day):
+    days = window().days + 1
+    return day - timedelta(days=days), day + timedelta(days=days)
+
+
+def gap(day, time, other_day, other_time):
+    """Iki ugraýşyň arasy; wagty bellenmedik bolsa diňe günleriň tapawudy."""
+    if time is None or other_time is None:
+        return timedelta(days=abs((day - other_day).days))
+    return abs(datetime.combine(day, time) - datetime.combine(other_day, other_time))
+
+
+def score(delay, price, limit):
+    """0–100: wagty ýakyn we arzan hödür ýokarda."""
+    closeness = 1 - delay / window()
+    cheapness = 1 - float(price) / float(limit) if price is not None and limit else 0.5
+    return round(100 * (TIME_WEIGHT * closeness + PRICE_WEIGHT * cheapness), 2)
+
+
+# поля маршрута, от которых зависят кандидаты и оценка
+MATCH_FIELDS = (
+    'from_place_id', 'to_place_id', 'departure_date', 'departure_time', 'available_seats', 'price_per_seat',
+)
+# поля Match, которые пересчёт может изменить у существующей пары
+STORED_FIELDS = ('score', 'driver_id', 'passenger_id')
+
+
+# ===================================================================
+# Kandidatlar
+# ===================================================================
+def offers_for(request, passenger_id):
+    """Isleg üçin hödürler: [(offer_id, driver_id, score)], iň laýygy birinji."""
+    lo, hi = day_range(request.departure_date)
+    rows = DepartureBoardRow.objects.filter(
+        from_place_id=request.from_place_id,
+        to_place_id=request.to_place_id,
+        departure_date__range=(lo, hi),
+        seats_left__gte=request.available_seats,
+    ).exclude(driver_id=passenger_id)
+    if request.price_per_seat is not None:
+        rows = rows.filter(Q(price_per_seat__isnull=True) | Q(price_per_seat__lte=request.price_per_seat))
+
+    found = []
+    for offer_id, driver_id, day, time, price in rows.values_list(
+        'route_id', 'driver_id', 'departure_date', 'departure_time', 'price_per_seat',
+    ):
+        delay = gap(request.departure_date, request.departure_time, day, time)
+        if driver_id is not None and delay <= window():
+            found.append((offer_id, driver_id, score(delay, price, request.price_per_seat)))
+    return sorted(found, key=lambda item: -item[2])[:max_results()]
+
+
+def requests_for(offer, driver_id):
+    """Hödür üçin garaşýan islegler: [(request_id, passenger_id, score)], iň laýygy birinji."""
+    seats_left = offer.available_seats - seats.max_booked(offer)
+    if seats_left <= 0:
+        return []
+    lo, hi = day_range(offer.departure_date)
+    routes = UgurRoute.objects.filter(
+        from_place_id=offer.from_place_id,
+        to_place_id=offer.to_place_id,
+        departure_date__range=(lo, hi),
+        available_seats__lte=seats_left,
+        ugur__type=Ugur.Type.PASSENGER,
+        ugur__is_active=True,
+        ugur__is_completed=False,
+    ).exclude(ugur__owner_id=driver_id)
+    if offer.price_per_seat is not None:
+        routes = routes.filter(Q(price_per_seat__isnull=True) | Q(price_per_seat__gte=offer.price_per_seat))
+
+    found = []
+    for request_id, passenger_id, day, time, limit in routes.values_list(
+        'pk', 'ugur__owner_id', 'departure_date', 'departure_time', 'price_per_seat',
+    ):
+        delay = gap(offer.departure_date, offer.departure_time, day, time)
+        if delay <= window():
+            found.append((request_id, passenger_id, score(delay, offer.price_per_seat, limit)))
+    return sorted(found, key=lambda item: -item[2])[:max_results()]
+
+
+# ===================================================================
+# Jübütlemek
+# ===================================================================
+def candidates(route):
+    """Ugruň täze jübütleri (entek saklanmadyk Match obýektleri) we olaryň tarapy ('offer' / 'request')."""
+    ugur = route.ugur
+    if not ugur.is_active or ugur.is_completed:
+        return [], None
+    if ugur.type == Ugur.Type.PASSENGER:
+        return [
+            Match(offer_id=offer_id, request_id=route.pk, driver_id=driver_id, passenger_id=ugur.owner_id, score=value)
+            for offer_id, driver_id, value in offers_for(route, ugur.owner_id)
+        ], 'request'
+    if ugur.driver_id is None:
+        return [], None
+    return [
+        Match(offer_id=route.pk, request_id=request_id, driver_id=ugur.driver_id, passenger_id=passenger_id, score=value)
+        for request_id, passenger_id, value in requests_for(route, ugur.driver_id)
+    ], 'offer'
+
+
+@transaction.atomic
+def match_route(route):
+    """
+    Ugruň jübütlerini täzeden hasaplaýar we diňe tapawudy ýazýar: ýiten jübütler
+    pozulýar, bahasy üýtgänler täzelenýär, täzeler goşulýar. Gaýtarýar: täze jübütler.
+    """
+    matches, side = candidates(route)
+    if side is None:
+        Match.objects.filter(Q(offer=route) | Q(request=route)).delete()
+        return []
+    stored = {
+        (match.offer_id, match.request_id): match
+        for match in Match.objects.filter(**{side: route}).only('pk', 'offer_id', 'request_id', *STORED_FIELDS)
+    }
+    wanted = {(match.offer_id, match.request_id): match for match in matches}
+
+    gone = [match.pk for pair, match in stored.items() if pair not in wanted]
+    if gone:
+        Match.objects.filter(pk__in=gone).delete()
+    changed = []
+    for pair, match in wanted.items():
+        old = stored.get(pair)
+        if old is not None and any(getattr(old, name) != getattr(match, name) for name in STORED_FIELDS):
+            for name in STORED_FIELDS:
+                setattr(old, name, getattr(match, name))
+            changed.append(old)
+    if changed:
+        Match.objects.bulk_update(changed, ['score', 'driver', 'passenger'])
+    # created_at существующих пар сохраняется, уведомляем только о новых
+    fresh = [match for pair, match in wanted.items() if pair not in stored]
+    Match.objects.bulk_create(fresh)
+    notify(route, fresh)
+    return fresh
+
+
+def match_routes(routes):
+    """bulk_create-den soň: her ugur üçin aýratyn."""
+    for route in routes:
+        match_route(route)
+
+
+def on_route_saved(route, created):
+    # сохранение, не тронувшее MATCH_FIELDS (например, updated_at), пары не меняет
+    if created or route.has_changed(*MATCH_FIELDS):
+        match_route(route)
+
+
+def on_ugur_saved(ugur):
+    # закрытая / завершённая поездка больше не предлагается
+    if not ugur.is_active or ugur.is_completed:
+        Match.objects.filter(Q(offer__ugur=ugur) | Q(request__ugur=ugur)).delete()
+
+
+# ===================================================================
+# Habar bermek
+# ===================================================================
+def notify(route, matches):
+    if not matches:
+        return
+    DriverNotification.objects.bulk_create([
+        DriverNotification(
+            driver_id=match.driver_id,
+            from_place_id=route.from_place_id,
+            to_place_id=route.to_place_id,
+            price=route.price_per_seat,
+            message=f"Ýolagçy tapyldy: {route.departure_date:%d.%m.%Y}",
+        )
+        for match in matches
+    ])
+    # bulk_create сигналов не шлёт — счётчик непрочитанных правим сами
+    counters.add_unread(Counter(match.driver_id for match in matches))
+
+    user_ids = {match.driver_id for match in matches} | {match.passenger_id for match in matches}
+    transaction.on_commit(lambda: _push(user_ids))
+
+
+def _push(user_ids):
+    for user in User.objects.filter(pk__in=user_ids).only('phone'):
+        send_push(user, "Täze jübüt", "Ugruňyza laýyk bildiriş tapyldy.")
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.9 on 2026-10-19 16:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0002_remove_booking_comment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ugurroute',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Täzelendi'),
+        ),
+        migrations.AlterField(
+            model_name='load',
+            name='updated',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Täzelendi'),
+        ),
+        migrations.AlterField(
+            model_name='ugur',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Täzelendi'),
+        ),
+    ]
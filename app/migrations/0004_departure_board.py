@@ -0,0 +1,37 @@
+# Generated by Django 4.2.9 on 2026-10-19 16:39
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0003_conditional_get_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DepartureBoardRow',
+            fields=[
+                ('route', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='board_row', serialize=False, to='app.ugurroute')),
+                ('departure_date', models.DateField(verbose_name='Ugraýan sene')),
+                ('departure_time', models.TimeField(blank=True, null=True, verbose_name='Ugraýan wagty')),
+                ('seats_left', models.SmallIntegerField(default=0, verbose_name='Galan orun')),
+                ('price_per_seat', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True, verbose_name='Ýer üçin baha (TMT)')),
+                ('driver_name', models.CharField(blank=True, max_length=300, verbose_name='Sürüji')),
+                ('car', models.CharField(blank=True, max_length=300, verbose_name='Ulag')),
+                ('driver', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('from_place', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app.place')),
+                ('to_place', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app.place')),
+                ('ugur', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app.ugur')),
+            ],
+            options={
+                'verbose_name': 'Ugraýyş tablosy',
+                'verbose_name_plural': 'Ugraýyş tablosy',
+                'ordering': ['departure_date', 'departure_time'],
+                'indexes': [models.Index(fields=['from_place', 'to_place', 'departure_date', 'departure_time'], name='board_pair_date_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 4.2.9 on 2026-10-19 16:40
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_departure_board'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedUgur',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('type', models.CharField(choices=[('driver', 'Sürüji orun hödürleýär'), ('passenger', 'Ýolagçy orun gözleýär')], max_length=20, verbose_name='Görnüşi')),
+                ('title', models.CharField(blank=True, max_length=200, verbose_name='Maglumat')),
+                ('created_at', models.DateTimeField(verbose_name='Döredildi')),
+                ('updated_at', models.DateTimeField(verbose_name='Täzelendi')),
+                ('is_completed', models.BooleanField(default=False, verbose_name='Tamamlandy')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Arhiwe geçirildi')),
+                ('driver', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Arhiw syýahat',
+                'verbose_name_plural': 'Arhiw syýahatlar',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedUgurRoute',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('departure_date', models.DateField(verbose_name='Ugraýan sene')),
+                ('departure_time', models.TimeField(blank=True, null=True, verbose_name='Ugraýan wagty')),
+                ('available_seats', models.PositiveSmallIntegerField(default=4, verbose_name='Boş orun')),
+                ('price_per_seat', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True, verbose_name='Ýer üçin baha (TMT)')),
+                ('from_place', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app.place')),
+                ('to_place', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app.place')),
+                ('ugur', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='routes', to='app.archivedugur')),
+            ],
+            options={
+                'verbose_name': 'Arhiw ugur',
+                'verbose_name_plural': 'Arhiw ugurlar',
+                'ordering': ['departure_date', 'departure_time'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedLoad',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('description', models.TextField(verbose_name='Näme alyp gitmeli')),
+                ('weight_kg', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Agyrlygy (kg)')),
+                ('size', models.CharField(blank=True, max_length=100, verbose_name='Ölçegi')),
+                ('receiver_name', models.CharField(max_length=200, verbose_name='Kabul edýäniň ady')),
+                ('receiver_phone', models.CharField(max_length=17, verbose_name='Kabul edýäniň telefon belgisi')),
+                ('price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Baha (TMT)')),
+                ('price_negotiable', models.BooleanField(default=True, verbose_name='Baha gepleşiler')),
+                ('status', models.CharField(choices=[('searching', 'Sürüji gözlenýär'), ('assigned', 'Sürüji tapylgy'), ('in_transit', 'Ýolda'), ('delivered', 'Gowşuryldy'), ('cancelled', 'Ýatyryldy')], max_length=20, verbose_name='Ýagdaýy')),
+                ('created', models.DateTimeField(verbose_name='Döredildi')),
+                ('updated', models.DateTimeField(verbose_name='Täzelendi')),
+                ('route', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='loads', to='app.archivedugurroute')),
+                ('sender', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('ugur', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='loads', to='app.archivedugur')),
+            ],
+            options={
+                'verbose_name': 'Arhiw ýük',
+                'verbose_name_plural': 'Arhiw ýükler',
+                'ordering': ['-created'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedBooking',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('seats_booked', models.PositiveSmallIntegerField(default=1, verbose_name='Orun')),
+                ('status', models.CharField(choices=[('pending', 'Garaşylýar'), ('confirmed', 'Tassyklanan'), ('cancelled', 'Inkär edilen'), ('completed', 'Tamamlandy')], max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('passenger', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('route', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bookings', to='app.archivedugurroute')),
+            ],
+            options={
+                'verbose_name': 'Arhiw bron',
+                'verbose_name_plural': 'Arhiw bronlar',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedugur',
+            index=models.Index(fields=['owner', 'created_at'], name='arch_ugur_owner_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedugur',
+            index=models.Index(fields=['driver', 'created_at'], name='arch_ugur_driver_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedload',
+            index=models.Index(fields=['sender', 'created'], name='arch_load_sender_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedbooking',
+            index=models.Index(fields=['passenger', 'created_at'], name='arch_booking_passenger_idx'),
+        ),
+    ]
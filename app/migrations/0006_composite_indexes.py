@@ -0,0 +1,49 @@
+# Generated by Django 4.2.9 on 2026-10-19 16:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_archive'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['route', 'status'], name='booking_route_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['passenger', 'created_at'], name='booking_passenger_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='drivernotification',
+            index=models.Index(fields=['driver', '-created'], name='notif_driver_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='drivernotification',
+            index=models.Index(condition=models.Q(('is_seen', False)), fields=['driver', '-created'], name='notif_unseen_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='load',
+            index=models.Index(fields=['status', '-created'], name='load_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='load',
+            index=models.Index(condition=models.Q(('status', 'searching')), fields=['-created'], name='load_searching_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['to_user', 'created'], name='review_to_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ugur',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='ugur_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ugurroute',
+            index=models.Index(fields=['from_place', 'to_place', 'departure_date', 'departure_time'], name='route_pair_departure_idx'),
+        ),
+    ]
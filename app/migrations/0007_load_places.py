@@ -0,0 +1,80 @@
+# Generated by Django 4.2.9 on 2026-10-19 16:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+BACKFILL_CHUNK = 1000
+
+
+def backfill_load_places(apps, schema_editor):
+    """Bar bolan ýükleriň from/to-syny bölek-bölek (her bölege 3 sorag) doldurýar."""
+    Load = apps.get_model('app', 'Load')
+    UgurRoute = apps.get_model('app', 'UgurRoute')
+
+    last_pk = 0
+    while True:
+        loads = list(
+            Load.objects.filter(pk__gt=last_pk).order_by('pk')
+            .only('pk', 'route_id', 'ugur_id')[:BACKFILL_CHUNK]
+        )
+        if not loads:
+            return
+        last_pk = loads[-1].pk
+
+        route_ids = {load.route_id for load in loads if load.route_id}
+        ugur_ids = {load.ugur_id for load in loads if not load.route_id and load.ugur_id}
+        by_route = {
+            pk: (from_id, to_id)
+            for pk, from_id, to_id in UgurRoute.objects.filter(pk__in=route_ids)
+            .values_list('pk', 'from_place_id', 'to_place_id')
+        }
+        first_by_ugur = {}
+        for ugur_id, from_id, to_id in (
+            UgurRoute.objects.filter(ugur_id__in=ugur_ids)
+            .order_by('ugur_id', 'departure_date', 'departure_time')
+            .values_list('ugur_id', 'from_place_id', 'to_place_id')
+        ):
+            first_by_ugur.setdefault(ugur_id, (from_id, to_id))
+
+        changed = []
+        for load in loads:
+            places = by_route.get(load.route_id) if load.route_id else first_by_ugur.get(load.ugur_id)
+            if places:
+                load.from_place_id, load.to_place_id = places
+                changed.append(load)
+        Load.objects.bulk_update(changed, ['from_place', 'to_place'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0006_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedload',
+            name='from_place',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='app.place'),
+        ),
+        migrations.AddField(
+            model_name='archivedload',
+            name='to_place',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='app.place'),
+        ),
+        migrations.AddField(
+            model_name='load',
+            name='from_place',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='loads_from', to='app.place', verbose_name='Nireden'),
+        ),
+        migrations.AddField(
+            model_name='load',
+            name='to_place',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='loads_to', to='app.place', verbose_name='Nirä'),
+        ),
+        migrations.AddIndex(
+            model_name='load',
+            index=models.Index(fields=['from_place', 'to_place', '-created'], name='load_pair_created_idx'),
+        ),
+        migrations.RunPython(backfill_load_places, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 4.2.9 on 2026-10-19 16:47
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0007_load_places'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UgurSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('departure_time', models.TimeField(verbose_name='Ugraýan wagty')),
+                ('seats', models.PositiveSmallIntegerField(default=4, verbose_name='Orun sany')),
+                ('price_per_seat', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True, verbose_name='Ýer üçin baha (TMT)')),
+                ('freq', models.CharField(choices=[('daily', 'Her gün'), ('weekly', 'Her hepde')], default='daily', max_length=10, verbose_name='Gaýtalanyşy')),
+                ('interval', models.PositiveSmallIntegerField(default=1, validators=[django.core.validators.MinValueValidator(1)], verbose_name='Aralyk')),
+                ('weekdays', models.CharField(blank=True, max_length=20, verbose_name='Hepdäniň günleri')),
+                ('start_date', models.DateField(verbose_name='Başlaýan sene')),
+                ('end_date', models.DateField(blank=True, null=True, verbose_name='Gutarýan sene')),
+                ('exdates', models.JSONField(blank=True, default=list, verbose_name='Aýrylan seneler')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Işjeň')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Döredildi')),
+            ],
+            options={
+                'verbose_name': 'Yzygiderli syýahat',
+                'verbose_name_plural': 'Yzygiderli syýahatlar',
+                'ordering': ['departure_time'],
+            },
+        ),
+        migrations.AddField(
+            model_name='ugurschedule',
+            name='from_place',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app.place'),
+        ),
+        migrations.AddField(
+            model_name='ugurschedule',
+            name='owner',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedules', to=settings.AUTH_USER_MODEL, verbose_name='Sürüji'),
+        ),
+        migrations.AddField(
+            model_name='ugurschedule',
+            name='to_place',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app.place'),
+        ),
+        migrations.AddField(
+            model_name='ugurroute',
+            name='schedule',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='routes', to='app.ugurschedule', verbose_name='Tertip'),
+        ),
+        migrations.AddIndex(
+            model_name='ugurschedule',
+            index=models.Index(fields=['from_place', 'to_place', 'is_active'], name='schedule_pair_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='ugurroute',
+            constraint=models.UniqueConstraint(condition=models.Q(('schedule__isnull', False)), fields=('schedule', 'departure_date'), name='route_schedule_date_uniq'),
+        ),
+    ]
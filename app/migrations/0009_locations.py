@@ -0,0 +1,47 @@
+# Generated by Django 4.2.9 on 2026-10-19 16:52
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_schedules'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LastKnownPosition',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='last_position', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('latitude', models.FloatField(verbose_name='Latitude')),
+                ('longitude', models.FloatField(verbose_name='Longitude')),
+                ('speed', models.FloatField(blank=True, null=True, verbose_name='Tizlik (km/sag)')),
+                ('heading', models.FloatField(blank=True, null=True, verbose_name='Ugry (gradus)')),
+                ('recorded_at', models.DateTimeField(verbose_name='Ölçelen wagty')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Soňky ýeri',
+                'verbose_name_plural': 'Soňky ýerleri',
+            },
+        ),
+        migrations.CreateModel(
+            name='LocationTrailPoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('latitude', models.FloatField(verbose_name='Latitude')),
+                ('longitude', models.FloatField(verbose_name='Longitude')),
+                ('recorded_at', models.DateTimeField(verbose_name='Ölçelen wagty')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trail_points', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Ýoluň nokady',
+                'verbose_name_plural': 'Ýoluň yzy',
+                'ordering': ['user', 'recorded_at'],
+                'indexes': [models.Index(fields=['user', 'recorded_at'], name='trail_user_recorded_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.9 on 2026-10-19 16:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_locations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CorridorPriceStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('route', 'Ýolagçy ýeri'), ('load', 'Ýük')], max_length=10, verbose_name='Görnüşi')),
+                ('week', models.DateField(verbose_name='Hepde (duşenbe)')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Sany')),
+                ('min_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Iň arzan')),
+                ('max_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Iň gymmat')),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Jemi')),
+                ('histogram', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('from_place', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app.place')),
+                ('to_place', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app.place')),
+            ],
+            options={
+                'verbose_name': 'Bahalaryň statistikasy',
+                'verbose_name_plural': 'Bahalaryň statistikasy',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='corridorpricestats',
+            constraint=models.UniqueConstraint(fields=('from_place', 'to_place', 'kind', 'week'), name='price_stats_key_uniq'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.9 on 2026-10-19 16:59
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import F
+
+
+def backfill_delivered_at(apps, schema_editor):
+    """Öň gowşurylan ýükler üçin iň ýakyn baha — soňky täzelenen wagty."""
+    for name in ('Load', 'ArchivedLoad'):
+        apps.get_model('app', name).objects.filter(status='delivered').update(delivered_at=F('updated'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0010_price_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedload',
+            name='delivered_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Gowşuryldy'),
+        ),
+        migrations.AddField(
+            model_name='load',
+            name='delivered_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Gowşuryldy'),
+        ),
+        migrations.CreateModel(
+            name='DriverDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Gün')),
+                ('trips', models.PositiveIntegerField(default=0, verbose_name='Syýahatlar')),
+                ('seats_sold', models.PositiveIntegerField(default=0, verbose_name='Satylan orunlar')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Girdeji (TMT)')),
+                ('loads_delivered', models.PositiveIntegerField(default=0, verbose_name='Gowşurylan ýükler')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('driver', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Sürüjiniň günlik jemi',
+                'verbose_name_plural': 'Sürüjileriň günlik jemleri',
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='driverdailystats',
+            constraint=models.UniqueConstraint(fields=('driver', 'day'), name='driver_stats_day_uniq'),
+        ),
+        migrations.RunPython(backfill_delivered_at, migrations.RunPython.noop),
+    ]
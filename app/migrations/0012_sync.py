@@ -0,0 +1,45 @@
+# Generated by Django 4.2.9 on 2026-10-19 17:02
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    """Täze sütün migrasiýanyň wagty bilen doldy — ýazgynyň öz döredilen wagty has dogry."""
+    apps.get_model('app', 'Booking').objects.update(updated_at=F('created_at'))
+    apps.get_model('app', 'DriverNotification').objects.update(updated_at=F('created'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0011_driver_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='drivernotification',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.CreateModel(
+            name='SyncTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=30, verbose_name='Model')),
+                ('object_id', models.BigIntegerField(verbose_name='ID')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, verbose_name='Pozuldy')),
+            ],
+            options={
+                'verbose_name': 'Pozulan ýazgy',
+                'verbose_name_plural': 'Pozulan ýazgylar',
+                'indexes': [models.Index(fields=['model', 'deleted_at'], name='tombstone_model_deleted_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
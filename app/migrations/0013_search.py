@@ -0,0 +1,66 @@
+from django.db import migrations
+
+# SQLite: FTS5 external-content tablisalary, triggerler bilen täzelenýär.
+SQLITE_INDEXES = {
+    'app_load_fts': ('app_load', ('description', 'receiver_name')),
+    'app_ugur_fts': ('app_ugur', ('title',)),
+}
+
+# PostgreSQL: tsvector aňlatmasy boýunça GIN indeksi (app/search.py-daky aňlatma bilen birmeňzeş)
+POSTGRES_INDEXES = {
+    'load_search_gin': (
+        'app_load', "to_tsvector('simple', coalesce(description, '') || ' ' || coalesce(receiver_name, ''))",
+    ),
+    'ugur_search_gin': ('app_ugur', "to_tsvector('simple', coalesce(title, ''))"),
+}
+
+
+def sqlite_statements(fts, table, fields):
+    columns = ', '.join(fields)
+    new_values = ', '.join(f'new.{field}' for field in fields)
+    old_values = ', '.join(f'old.{field}' for field in fields)
+    # запись 'delete' для external-content таблицы убирает старые токены
+    delete = f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});"
+    insert = f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});"
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({columns}, content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN {delete} END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {columns} ON {table} BEGIN {delete} {insert} END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def create_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for fts, (table, fields) in SQLITE_INDEXES.items():
+            for statement in sqlite_statements(fts, table, fields):
+                schema_editor.execute(statement)
+    elif vendor == 'postgresql':
+        for name, (table, expression) in POSTGRES_INDEXES.items():
+            schema_editor.execute(f"CREATE INDEX {name} ON {table} USING GIN (({expression}))")
+
+
+def drop_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for fts in SQLITE_INDEXES:
+            for suffix in ('ai', 'ad', 'au'):
+                schema_editor.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+            schema_editor.execute(f"DROP TABLE IF EXISTS {fts}")
+    elif vendor == 'postgresql':
+        for name in POSTGRES_INDEXES:
+            schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0012_sync'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
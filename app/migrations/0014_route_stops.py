@@ -0,0 +1,63 @@
+# Generated by Django 4.2.9 on 2026-10-19 17:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+HOLDING_STATUSES = ('pending', 'confirmed')
+
+
+def fill_seat_trees(apps, schema_editor):
+    # у существующих маршрутов одна секция: дерево из одного листа с суммой броней
+    UgurRoute = apps.get_model('app', 'UgurRoute')
+    rows = (
+        UgurRoute.objects.filter(bookings__status__in=HOLDING_STATUSES)
+        .values_list('pk').annotate(booked=models.Sum('bookings__seats_booked')).order_by()
+    )
+    for pk, booked in rows:
+        UgurRoute.objects.filter(pk=pk).update(seat_tree={
+            'size': 1, 'top': [0, booked, 0, 0], 'lazy': [0, booked, 0, 0],
+        })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0013_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='from_stop',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Münýän duralga'),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='to_stop',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Düşýän duralga'),
+        ),
+        migrations.AddField(
+            model_name='ugurroute',
+            name='seat_tree',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Orunlaryň agajy'),
+        ),
+        migrations.CreateModel(
+            name='RouteStop',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField(verbose_name='Tertip belgisi')),
+                ('place', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='route_stops', to='app.place')),
+                ('route', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stops', to='app.ugurroute')),
+            ],
+            options={
+                'verbose_name': 'Duralga',
+                'verbose_name_plural': 'Duralgalar',
+                'ordering': ['route', 'position'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='routestop',
+            constraint=models.UniqueConstraint(fields=('route', 'position'), name='route_stop_position_uniq'),
+        ),
+        migrations.RunPython(fill_seat_trees, migrations.RunPython.noop),
+    ]
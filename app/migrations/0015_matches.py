@@ -0,0 +1,37 @@
+# Generated by Django 4.2.9 on 2026-10-19 17:23
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0014_route_stops'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Match',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='Laýyklyk')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Döredildi')),
+                ('driver', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='driver_matches', to=settings.AUTH_USER_MODEL)),
+                ('offer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='offer_matches', to='app.ugurroute')),
+                ('passenger', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='passenger_matches', to=settings.AUTH_USER_MODEL)),
+                ('request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='request_matches', to='app.ugurroute')),
+            ],
+            options={
+                'verbose_name': 'Jübüt',
+                'verbose_name_plural': 'Jübütler',
+                'ordering': ['-score'],
+                'indexes': [models.Index(fields=['driver', '-score'], name='match_driver_score_idx'), models.Index(fields=['passenger', '-score'], name='match_passenger_score_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='match',
+            constraint=models.UniqueConstraint(fields=('offer', 'request'), name='match_offer_request_uniq'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.9 on 2026-10-19 17:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0015_matches'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ugurroute',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Tamamlandy'),
+        ),
+        migrations.AddIndex(
+            model_name='ugurroute',
+            index=models.Index(condition=models.Q(('completed_at__isnull', True)), fields=['departure_date', 'departure_time'], name='route_pending_completion_idx'),
+        ),
+    ]
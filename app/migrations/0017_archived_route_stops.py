@@ -0,0 +1,38 @@
+# Generated by Django 4.2.9 on 2026-10-19 17:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0016_route_completed_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedbooking',
+            name='from_stop',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Münýän duralga'),
+        ),
+        migrations.AddField(
+            model_name='archivedbooking',
+            name='to_stop',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Düşýän duralga'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedRouteStop',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('position', models.PositiveSmallIntegerField(verbose_name='Tertip belgisi')),
+                ('place', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app.place')),
+                ('route', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stops', to='app.archivedugurroute')),
+            ],
+            options={
+                'verbose_name': 'Arhiw duralga',
+                'verbose_name_plural': 'Arhiw duralgalar',
+                'ordering': ['route', 'position'],
+            },
+        ),
+    ]
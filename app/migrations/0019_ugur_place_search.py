@@ -0,0 +1,79 @@
+from importlib import import_module
+
+from django.db import migrations
+
+search = import_module('app.migrations.0013_search')
+
+# SQLite: app_ugur_fts — обычная FTS5-таблица (title + города маршрутов), а не external-content:
+# столбца places в app_ugur нет, его поддерживают триггеры маршрутов и городов
+PLACES = (
+    "(SELECT group_concat(name, ' ') FROM app_place WHERE id IN ("
+    "SELECT from_place_id FROM app_ugurroute WHERE ugur_id = {ugur} "
+    "UNION SELECT to_place_id FROM app_ugurroute WHERE ugur_id = {ugur}))"
+)
+REFRESH = "UPDATE app_ugur_fts SET places = {places} WHERE rowid IN ({ugurs});".format(
+    places=PLACES.format(ugur='app_ugur_fts.rowid'), ugurs='{ugurs}',
+)
+TRIGGERS = {
+    'app_ugur_fts_ai': "AFTER INSERT ON app_ugur BEGIN "
+                       "INSERT INTO app_ugur_fts(rowid, title, places) "
+                       f"VALUES (new.id, new.title, {PLACES.format(ugur='new.id')}); END",
+    'app_ugur_fts_ad': "AFTER DELETE ON app_ugur BEGIN DELETE FROM app_ugur_fts WHERE rowid = old.id; END",
+    'app_ugur_fts_au': "AFTER UPDATE OF title ON app_ugur BEGIN "
+                       "UPDATE app_ugur_fts SET title = new.title WHERE rowid = new.id; END",
+    'app_ugur_fts_route_ai': f"AFTER INSERT ON app_ugurroute BEGIN {REFRESH.format(ugurs='new.ugur_id')} END",
+    'app_ugur_fts_route_ad': f"AFTER DELETE ON app_ugurroute BEGIN {REFRESH.format(ugurs='old.ugur_id')} END",
+    'app_ugur_fts_route_au': "AFTER UPDATE OF ugur_id, from_place_id, to_place_id ON app_ugurroute BEGIN "
+                             f"{REFRESH.format(ugurs='old.ugur_id, new.ugur_id')} END",
+    'app_ugur_fts_place_au': "AFTER UPDATE OF name ON app_place BEGIN " + REFRESH.format(
+        ugurs='SELECT ugur_id FROM app_ugurroute WHERE from_place_id = new.id OR to_place_id = new.id',
+    ) + " END",
+}
+
+# PostgreSQL: города ищутся по GIN-индексу app_place
+POSTGRES_INDEX = 'place_search_gin'
+POSTGRES_EXPRESSION = "to_tsvector('simple', coalesce(name, ''))"
+
+
+def drop_sqlite(schema_editor, triggers):
+    for name in triggers:
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {name}")
+    schema_editor.execute("DROP TABLE IF EXISTS app_ugur_fts")
+
+
+def forwards(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        drop_sqlite(schema_editor, ['app_ugur_fts_ai', 'app_ugur_fts_ad', 'app_ugur_fts_au'])
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE app_ugur_fts USING fts5(title, places, tokenize='unicode61 remove_diacritics 2')"
+        )
+        for name, body in TRIGGERS.items():
+            schema_editor.execute(f"CREATE TRIGGER {name} {body}")
+        schema_editor.execute(
+            "INSERT INTO app_ugur_fts(rowid, title, places) "
+            f"SELECT id, title, {PLACES.format(ugur='app_ugur.id')} FROM app_ugur"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(f"CREATE INDEX {POSTGRES_INDEX} ON app_place USING GIN (({POSTGRES_EXPRESSION}))")
+
+
+def backwards(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        drop_sqlite(schema_editor, TRIGGERS)
+        for statement in search.sqlite_statements('app_ugur_fts', 'app_ugur', ('title',)):
+            schema_editor.execute(statement)
+    elif vendor == 'postgresql':
+        schema_editor.execute(f"DROP INDEX IF EXISTS {POSTGRES_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0018_tombstone_user'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.9 on 2026-10-19 18:20
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0019_ugur_place_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ugurschedule',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Täzelendi'),
+            preserve_default=False,
+        ),
+    ]
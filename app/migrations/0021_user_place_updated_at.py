@@ -0,0 +1,46 @@
+# Generated by Django 4.2.9 on 2026-10-19 18:45
+
+from importlib import import_module
+
+from django.db import migrations, models
+import django.utils.timezone
+
+search = import_module('app.migrations.0019_ugur_place_search')
+
+
+# SQLite пересоздаёт app_place при AddField: триггеры app_ugur_fts, которые ссылаются
+# на app_place (или висят на ней), на время пересоздания снимаются и ставятся заново
+def drop_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for name in search.TRIGGERS:
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def create_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for name, body in search.TRIGGERS.items():
+            schema_editor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0020_schedule_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_triggers, create_triggers),
+        migrations.AddField(
+            model_name='place',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Täzelendi'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Täzelendi'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
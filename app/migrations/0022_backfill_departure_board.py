@@ -0,0 +1,88 @@
+# Generated by Django 4.2.9 on 2026-10-19 19:30
+
+from django.db import migrations
+from django.utils import timezone
+
+BACKFILL_CHUNK = 1000
+BOARD_FIELDS = [
+    'ugur', 'driver', 'from_place', 'to_place', 'departure_date', 'departure_time',
+    'seats_left', 'price_per_seat', 'driver_name', 'car',
+]
+
+
+def driver_display(user):
+    if user is None:
+        return ''
+    return f"{user.first_name} {user.last_name}".strip() or user.phone
+
+
+def car_display(profile):
+    if profile is None:
+        return ''
+    car = f"{profile.marka} {profile.model}".strip()
+    if profile.color:
+        car = f"{car}, {profile.color}"
+    return f"{car} ({profile.car_number})"
+
+
+def backfill_departure_board(apps, schema_editor):
+    """
+    Bar bolan geljekki ugraýyşlar üçin tablonyň setirlerini bölek-bölek (her bölege
+    3 sorag) doldurýar: setirleri diňe signallar ýazýar, tablo deploýdan soň boş bolmaly däl.
+    Geçen ugraýyşlar /api/departures/-de okalmaýar — olar `rebuild_departure_board` bilen.
+    """
+    UgurRoute = apps.get_model('app', 'UgurRoute')
+    DepartureBoardRow = apps.get_model('app', 'DepartureBoardRow')
+    DriverProfile = apps.get_model('app', 'DriverProfile')
+
+    routes = UgurRoute.objects.filter(
+        ugur__is_active=True,
+        ugur__is_completed=False,
+        ugur__type='driver',
+        departure_date__gte=timezone.localdate(),
+    ).select_related('ugur__driver').order_by('pk')
+
+    last_pk = 0
+    while True:
+        chunk = list(routes.filter(pk__gt=last_pk)[:BACKFILL_CHUNK])
+        if not chunk:
+            return
+        last_pk = chunk[-1].pk
+
+        profiles = {
+            profile.user_id: profile
+            for profile in DriverProfile.objects.filter(user_id__in={route.ugur.driver_id for route in chunk})
+        }
+        DepartureBoardRow.objects.bulk_create(
+            [
+                DepartureBoardRow(
+                    route_id=route.pk,
+                    ugur_id=route.ugur_id,
+                    driver_id=route.ugur.driver_id,
+                    from_place_id=route.from_place_id,
+                    to_place_id=route.to_place_id,
+                    departure_date=route.departure_date,
+                    departure_time=route.departure_time,
+                    # как board._build_row: свободные места на самой загруженной секции
+                    seats_left=max(route.available_seats - (route.seat_tree['top'][1] if route.seat_tree else 0), 0),
+                    price_per_seat=route.price_per_seat,
+                    driver_name=driver_display(route.ugur.driver),
+                    car=car_display(profiles.get(route.ugur.driver_id)),
+                )
+                for route in chunk
+            ],
+            update_conflicts=True,
+            unique_fields=['route'],
+            update_fields=BOARD_FIELDS,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0021_user_place_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_departure_board, migrations.RunPython.noop),
+    ]
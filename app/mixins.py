@@ -0,0 +1,94 @@
+import hashlib
+
+from django.db.models import Count, Max, Window, prefetch_related_objects
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified для list и retrieve.
+
+    Состояние (Max по полям времени + Count) считается оконными функциями в том
+    же запросе, который читает строки: один проход по таблице и для 200, и для
+    304. Сериализация и prefetch выполняются только если клиент не прислал
+    совпадающий If-None-Match / If-Modified-Since.
+
+    conditional_fields — поля времени самой строки и связанных по FK строк,
+    которые сериализатор встраивает (пользователи, места, ugur). Связи «ко
+    многим» в окно не входят: их изменения должны обновлять updated_at
+    родителя (см. signals.py: маршруты и брони трогают ugur).
+    """
+    conditional_fields = ('updated_at',)
+
+    def get_conditional_aggregates(self):
+        # дополнительные агрегаты, влияющие на ETag (например, число непрочитанных)
+        return {}
+
+    def get_conditional_state(self, state):
+        stamps = [state[f'last_{i}'] for i in range(len(self.conditional_fields))]
+        stamps = [stamp for stamp in stamps if stamp is not None]
+        last_modified = max(stamps) if stamps else None
+
+        user_id = getattr(self.request.user, 'pk', None)
+        raw = '|'.join(str(state[key]) for key in sorted(state)) + f'|{user_id}'
+        etag = quote_etag(hashlib.md5(raw.encode()).hexdigest())
+        return etag, last_modified
+
+    def _read(self, queryset):
+        """(setirler, ýagdaý). Setirler prefetch-siz: 304 bolsa olar gerek däl."""
+        aggregates = {f'last_{i}': Max(field) for i, field in enumerate(self.conditional_fields)}
+        aggregates.update(self.get_conditional_aggregates())
+        aggregates['count'] = Count('pk')
+        rows = queryset.prefetch_related(None)
+        if queryset.query.extra_select:
+            # bm25() (FTS5, app/search.py) нельзя вызывать рядом с оконными функциями: отдельный агрегат
+            return list(rows), queryset.order_by().aggregate(**aggregates)
+        # OVER () — одинаковое значение в каждой строке, читаем из первой
+        rows = list(rows.annotate(
+            **{f'_etag_{name}': Window(expression=aggregate) for name, aggregate in aggregates.items()}
+        ))
+        return rows, {name: getattr(rows[0], f'_etag_{name}') if rows else None for name in aggregates}
+
+    def _conditional(self, queryset, respond, request, check=None):
+        rows, state = self._read(queryset)
+        if check is not None:
+            check(rows)
+        etag, last_modified = self.get_conditional_state(state)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if not_modified is not None:
+            return not_modified
+
+        prefetch_related_objects(rows, *queryset._prefetch_related_lookups)
+        response = respond(rows)
+        if 200 <= response.status_code < 300:
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self._conditional(
+            queryset, lambda rows: Response(self.get_serializer(rows, many=True).data), request,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+
+        def check(rows):
+            # как get_object(): 404 и права объекта — до сравнения ETag
+            if not rows:
+                raise Http404
+            self.check_object_permissions(request, rows[0])
+
+        return self._conditional(
+            queryset, lambda rows: Response(self.get_serializer(rows[0]).data), request, check,
+        )
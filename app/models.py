@@ -6,6 +6,52 @@ from django.conf import settings
 from django.urls import reverse
 from django.utils import timezone
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import DEFERRED
+from datetime import timedelta
+
+
+class TrackedFieldsMixin:
+    """
+    Bazadan okalan ýa-da soňky gezek ýazylan tracked_fields bahalary (attname → baha).
+    Signallar öňki ýagdaýy şu ýerden alýar: post_init-den tapawutlylykda her
+    okalan obýekt üçin signal işlemeýär, diňe gerekli sütünler ýatda saklanýar.
+    """
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {
+            name: value for name, value in zip(field_names, values) if name in cls.tracked_fields
+        }
+        return instance
+
+    def has_changed(self, *fields):
+        """Ýazylan bahalar öňkülerden tapawutlymy; öňkiler belli däl bolsa — hawa."""
+        loaded = loaded_values(self)
+        if loaded is None:
+            return True
+        data = self.__dict__
+        return any(loaded.get(name, DEFERRED) != data.get(name, DEFERRED) for name in fields)
+
+    def remember_values(self):
+        data = self.__dict__
+        self._loaded_values = {name: data[name] for name in self.tracked_fields if name in data}
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # post_save уже отработал со старыми значениями — теперь «старые» это текущие
+        self.remember_values()
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.remember_values()
+
+
+def loaded_values(instance):
+    """Öňki bahalar; obýekt bazadan okalmadyk we ýazylmadyk bolsa — None."""
+    return getattr(instance, '_loaded_values', None)
 
 
 
@@ -30,8 +76,10 @@ class UserManager(BaseUserManager):
         extra_fields.setdefault('is_active', True)
         return self.create_user(phone, password, **extra_fields)
 
-class User(AbstractUser):
+class User(TrackedFieldsMixin, AbstractUser):
     email = None  # username ОСТАЁТСЯ
+    # прежние значения для сигналов (app/auth.py: роли в claims токена)
+    tracked_fields = ('is_driver', 'is_passenger', 'is_staff', 'is_active')
 
     phone = models.CharField(
         _("Telefon belgisi"),
@@ -43,6 +91,8 @@ class User(AbstractUser):
 
     is_driver = models.BooleanField(default=False)
     is_passenger = models.BooleanField(default=False)
+    # ulanyjy sanawlaryň içinde görkezilýär: olaryň ETag-i şu wagta bagly (app/mixins.py)
+    updated_at = models.DateTimeField(_("Täzelendi"), auto_now=True)
 
     USERNAME_FIELD = 'username'
     REQUIRED_FIELDS = ['phone']
@@ -52,18 +102,24 @@ class User(AbstractUser):
     def save(self, *args, **kwargs):
         # автозаполнение username и проверка уникальности
         if not self.username:
-            base_username = self.phone
-            username = base_username
-            counter = 1
-
-            while User.objects.filter(username=username).exists():
-                counter += 1
-                username = f"{base_username}_{counter}"
-
-            self.username = username
+            self.username = User.free_username(self.phone)
 
         super().save(*args, **kwargs)  # сохраняем пользователя
 
+    @classmethod
+    def free_username(cls, base):
+        """`base`, `base_2`, `base_3`, ... içinden ilkinji boşy — bir sorag bilen."""
+        taken = set(
+            cls.objects.filter(models.Q(username=base) | models.Q(username__startswith=f'{base}_'))
+            .values_list('username', flat=True)
+        )
+        if base not in taken:
+            return base
+        counter = 2
+        while f"{base}_{counter}" in taken:
+            counter += 1
+        return f"{base}_{counter}"
+
 
     def set_role(self, role):
         """Меняем роль пользователя: 'driver' или 'passenger'"""
@@ -150,6 +206,8 @@ class CurrentPlace(models.Model):
 class Place(models.Model):
     name = models.CharField(_("Ýeriň ady"), max_length=200, unique=True)
     created = models.DateTimeField(auto_now_add=True)
+    # ady ugurlaryň sanawynda görkezilýär: olaryň ETag-i şu wagta bagly (app/mixins.py)
+    updated_at = models.DateTimeField(_("Täzelendi"), auto_now=True)
 
     class Meta:
         verbose_name = _("Şäher / Ýer")
@@ -163,7 +221,10 @@ class Place(models.Model):
 # ===================================================================
 # 5. Syýahat (Ugur) — Bildiriş üçin esasy
 # ===================================================================
-class Ugur(models.Model):
+class Ugur(TrackedFieldsMixin, models.Model):
+    # прежний водитель для driver_stats: его дни пересчитываются при смене
+    tracked_fields = ('driver_id',)
+
     class Type(models.TextChoices):
         DRIVER = 'driver', _("Sürüji orun hödürleýär")
         PASSENGER = 'passenger', _("Ýolagçy orun gözleýär")
@@ -179,7 +240,7 @@ class Ugur(models.Model):
     title = models.CharField(_("Maglumat"), max_length=200, blank=True)
 
     created_at = models.DateTimeField(_("Döredildi"), auto_now_add=True, db_index=True)
-    updated_at = models.DateTimeField(_("Täzelendi"), auto_now=True)
+    updated_at = models.DateTimeField(_("Täzelendi"), auto_now=True, db_index=True)
     is_active = models.BooleanField(_("Işjeň"), default=True, db_index=True)
     is_completed = models.BooleanField(_("Tamamlandy"), default=False)
     # views = models.PositiveIntegerField(_("Görülen"), default=0)
@@ -188,6 +249,12 @@ class Ugur(models.Model):
         verbose_name = _("Syýahat (Ugur)")
         verbose_name_plural = _("Syýahatlar (Ugur)")
         ordering = ['-created_at']
+        indexes = [
+            # esasy sanaw: diňe işjeň syýahatlar, täzeleri ilki
+            models.Index(
+                fields=['-created_at'], condition=models.Q(is_active=True), name='ugur_active_created_idx',
+            ),
+        ]
 
     def __str__(self):
         if self.title:
@@ -201,16 +268,24 @@ class Ugur(models.Model):
         return reverse('ugur_detail', kwargs={'pk': self.pk})
 
     def save(self, *args, **kwargs):
-        if not self.title and self.routes.exists():
-            route = self.routes.first()
-            self.title = f"{route.from_place} → {route.to_place}"
+        # täze (pk-siz) ugur-yň ugurlary entek ýok; title create_trips-de hasaplanýar
+        if not self.title and self.pk:
+            route = self.routes.select_related('from_place', 'to_place').first()
+            if route:
+                self.title = f"{route.from_place} → {route.to_place}"
         super().save(*args, **kwargs)
 
 
 # ===================================================================
 # 6. Syaýahtyň ugry
 # ===================================================================
-class UgurRoute(models.Model):
+class UgurRoute(TrackedFieldsMixin, models.Model):
+    # прежние значения для сигналов (price_stats, driver_stats, matching, места грузов)
+    tracked_fields = (
+        'ugur_id', 'from_place_id', 'to_place_id', 'departure_date', 'departure_time', 'available_seats',
+        'price_per_seat',
+    )
+
     ugur = models.ForeignKey(Ugur, on_delete=models.CASCADE, related_name='routes')
     from_place = models.ForeignKey(Place, on_delete=models.CASCADE, related_name='departures')
     to_place = models.ForeignKey(Place, on_delete=models.CASCADE, related_name='arrivals')
@@ -222,13 +297,40 @@ class UgurRoute(models.Model):
     price_per_seat = models.DecimalField(
         _("Ýer üçin baha (TMT)"), max_digits=8, decimal_places=2, null=True, blank=True
     )
+    updated_at = models.DateTimeField(_("Täzelendi"), auto_now=True, db_index=True)
+    # Yzygiderli syýahatdan ilkinji bron gelende döredilen ugur
+    schedule = models.ForeignKey(
+        'UgurSchedule', on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='routes', verbose_name=_("Tertip")
+    )
     # comment = models.TextField(_("Teswirler"), blank=True)
-    # stops = models.JSONField(_("Aralyk duralgalar"), blank=True, default=list)
+    # Bölekler boýunça eýelenen orunlaryň segment agajy (app/seats.py), bronlar bilen täzelenýär
+    seat_tree = models.JSONField(_("Orunlaryň agajy"), default=dict, blank=True, editable=False)
+    # Ugur gidenden soň lifecycle.complete_departed belleýär (bir gezek: gaýtadan işlenmez ýaly)
+    completed_at = models.DateTimeField(_("Tamamlandy"), null=True, blank=True, editable=False)
 
     class Meta:
         verbose_name = _("Ugur")
         verbose_name_plural = _("Ugurlar")
         ordering = ['departure_date', 'departure_time']
+        indexes = [
+            models.Index(
+                fields=['from_place', 'to_place', 'departure_date', 'departure_time'],
+                name='route_pair_departure_idx',
+            ),
+            # entek tamamlanmadyk ugurlar: lifecycle gidenleri şu indeks boýunça tapýar
+            models.Index(
+                fields=['departure_date', 'departure_time'], condition=models.Q(completed_at__isnull=True),
+                name='route_pending_completion_idx',
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['schedule', 'departure_date'],
+                condition=models.Q(schedule__isnull=False),
+                name='route_schedule_date_uniq',
+            ),
+        ]
 
     def __str__(self):
         time = self.departure_time.strftime("%H:%M") if self.departure_time else "?"
@@ -237,11 +339,45 @@ class UgurRoute(models.Model):
     def get_date_display(self):
         return self.departure_date.strftime("%d.%m.%Y")
 
+    def save(self, *args, **kwargs):
+        # seat_tree (app/seats.py) и completed_at (app/lifecycle.py) пишутся только через update():
+        # устаревшая копия в памяти их не затирает
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in ('seat_tree', 'completed_at')
+            ]
+        super().save(*args, **kwargs)
+
+
+class RouteStop(models.Model):
+    """
+    Ugruň aralyk duralgasy. Doly tertip: from_place (0), duralgalar (1..k), to_place (k+1);
+    Booking.from_stop / to_stop şu tertipdäki belgilerdir.
+    """
+    route = models.ForeignKey(UgurRoute, on_delete=models.CASCADE, related_name='stops')
+    place = models.ForeignKey(Place, on_delete=models.CASCADE, related_name='route_stops')
+    position = models.PositiveSmallIntegerField(_("Tertip belgisi"))
+
+    class Meta:
+        verbose_name = _("Duralga")
+        verbose_name_plural = _("Duralgalar")
+        ordering = ['route', 'position']
+        constraints = [
+            models.UniqueConstraint(fields=['route', 'position'], name='route_stop_position_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.route_id}: {self.position}. {self.place}"
+
 
 # ===================================================================
 # 7. Bronlamak
 # ===================================================================
-class Booking(models.Model):
+class Booking(TrackedFieldsMixin, models.Model):
+    # прежние значения для сигналов (app/seats.py, app/driver_stats.py)
+    tracked_fields = ('route_id', 'status', 'seats_booked', 'from_stop', 'to_stop')
+
     class Status(models.TextChoices):
         PENDING = 'pending', _("Garaşylýar")
         CONFIRMED = 'confirmed', _("Tassyklanan")
@@ -251,14 +387,22 @@ class Booking(models.Model):
     route = models.ForeignKey(UgurRoute, on_delete=models.CASCADE, related_name='bookings')
     passenger = models.ForeignKey(User, on_delete=models.CASCADE, related_name='bookings')
     seats_booked = models.PositiveSmallIntegerField(_("Orun"), default=1)
+    # duralgalaryň belgileri (RouteStop); boş bolsa — ugruň başy / soňy
+    from_stop = models.PositiveSmallIntegerField(_("Münýän duralga"), null=True, blank=True)
+    to_stop = models.PositiveSmallIntegerField(_("Düşýän duralga"), null=True, blank=True)
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
     # comment = models.TextField(_("Teswir"), blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         unique_together = ['route', 'passenger']
         verbose_name = _("Bron")
         verbose_name_plural = _("Bronlar")
+        indexes = [
+            models.Index(fields=['route', 'status'], name='booking_route_status_idx'),
+            models.Index(fields=['passenger', 'created_at'], name='booking_passenger_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.passenger} → {self.route} ({self.seats_booked} Orun)"
@@ -278,6 +422,9 @@ class Review(models.Model):
         verbose_name = _("Bellik")
         verbose_name_plural = _("Bellikler")
         unique_together = ['to_user', 'from_user', 'created']  # один отзыв за поездку
+        indexes = [
+            models.Index(fields=['to_user', 'created'], name='review_to_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.from_user} → {self.to_user}: {self.rating}★"
@@ -286,7 +433,10 @@ class Review(models.Model):
 # ===================================================================
 # 9. Kargolar
 # ===================================================================
-class Load(models.Model):
+class Load(TrackedFieldsMixin, models.Model):
+    # прежние значения для сигналов (app/price_stats.py, app/driver_stats.py)
+    tracked_fields = ('ugur_id', 'status', 'delivered_at', 'from_place_id', 'to_place_id', 'created', 'price')
+
     class Status(models.TextChoices):
         SEARCHING = 'searching', _("Sürüji gözlenýär")
         ASSIGNED = 'assigned', _("Sürüji tapylgy") 
@@ -317,6 +467,20 @@ class Load(models.Model):
         verbose_name=_("Baglanan ugur")
     )
 
+    # Nireden / nirä — route ýa-da ugur berkidilende doldurylýar (sync_places)
+    from_place = models.ForeignKey(
+        Place, on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name='loads_from',
+        verbose_name=_("Nireden")
+    )
+    to_place = models.ForeignKey(
+        Place, on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name='loads_to',
+        verbose_name=_("Nirä")
+    )
+
     # Näme alyp barýas
     description = models.TextField(_("Näme alyp gitmeli"))
     weight_kg = models.PositiveSmallIntegerField(_("Agyrlygy (kg)"), null=True, blank=True)
@@ -332,12 +496,21 @@ class Load(models.Model):
     # Statusy we wagty
     status = models.CharField(_("Ýagdaýy"), max_length=20, choices=Status.choices, default=Status.SEARCHING)
     created = models.DateTimeField(_("Döredildi"), auto_now_add=True)
-    updated = models.DateTimeField(_("Täzelendi"), auto_now=True)
+    updated = models.DateTimeField(_("Täzelendi"), auto_now=True, db_index=True)
+    delivered_at = models.DateTimeField(_("Gowşuryldy"), null=True, blank=True)
 
     class Meta:
         verbose_name = _("Ýük (posylka)")
         verbose_name_plural = _("Ýükler (posylkalar)")
         ordering = ['-created']
+        indexes = [
+            models.Index(fields=['status', '-created'], name='load_status_created_idx'),
+            models.Index(fields=['from_place', 'to_place', '-created'], name='load_pair_created_idx'),
+            # sürüji gözleýän ýükler — iň köp okalýan sanaw
+            models.Index(
+                fields=['-created'], condition=models.Q(status='searching'), name='load_searching_idx',
+            ),
+        ]
 
     def __str__(self):
         if self.ugur:
@@ -348,41 +521,466 @@ class Load(models.Model):
         self.updated = timezone.now()
         if self.ugur and self.status == Load.Status.SEARCHING:
             self.status = Load.Status.ASSIGNED
+        if self.status == Load.Status.DELIVERED:
+            if self.delivered_at is None:
+                self.delivered_at = self.updated
+        else:
+            self.delivered_at = None
+        places = self.attached_places()
+        if places is not None:
+            self.from_place_id, self.to_place_id = places
         super().save(*args, **kwargs)
 
-    @property
-    def from_place(self):
-        if self.route:
-            return self.route.from_place
-        if self.ugur and self.ugur.routes.exists():
-            return self.ugur.routes.first().from_place
+    def attached_places(self):
+        """(from_place_id, to_place_id) berkidilen route-dan ýa-da ugur-yň ilkinji ugrundan."""
+        if self.route_id:
+            return UgurRoute.objects.filter(pk=self.route_id).values_list('from_place_id', 'to_place_id').first()
+        if self.ugur_id:
+            return Load.first_route_places(self.ugur_id) or (None, None)
         return None
 
-    @property
-    def to_place(self):
-        if self.route:
-            return self.route.to_place
-        if self.ugur and self.ugur.routes.exists():
-            return self.ugur.routes.first().to_place
-        return None
+    @staticmethod
+    def first_route_places(ugur_id):
+        return UgurRoute.objects.filter(ugur_id=ugur_id).values_list('from_place_id', 'to_place_id').first()
+
+    @classmethod
+    def sync_places(cls, ugur_id, route_id=None):
+        """Ugurlar üýtgände berkidilen ýükleriň from/to-syny iki UPDATE bilen täzeleýär. Gaýtarýar: üýtgänleriň sany."""
+        changed = 0
+        if route_id is not None:
+            places = UgurRoute.objects.filter(pk=route_id).values_list('from_place_id', 'to_place_id').first()
+            if places is not None:
+                changed += cls.objects.filter(route_id=route_id).exclude(
+                    from_place_id=places[0], to_place_id=places[1],
+                ).update(from_place_id=places[0], to_place_id=places[1], updated=timezone.now())
+        from_id, to_id = cls.first_route_places(ugur_id) or (None, None)
+        changed += cls.objects.filter(ugur_id=ugur_id, route__isnull=True).exclude(
+            from_place_id=from_id, to_place_id=to_id,
+        ).update(from_place_id=from_id, to_place_id=to_id, updated=timezone.now())
+        return changed
 
 
 # ===================================================================
 # 10. Sürüjilere bildiriş
 # ===================================================================
-class DriverNotification(models.Model):
+class DriverNotification(TrackedFieldsMixin, models.Model):
+    # прежние значения для счётчика непрочитанных (app/counters.py)
+    tracked_fields = ('driver_id', 'is_seen')
+
     driver = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
     from_place = models.ForeignKey(Place, on_delete=models.CASCADE, related_name='notifications_from')
     to_place = models.ForeignKey(Place, on_delete=models.CASCADE, related_name='notifications_to')
     price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     message = models.CharField(max_length=500, blank=True)
     created = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     is_seen = models.BooleanField(default=False)
 
     class Meta:
         verbose_name = _("Sürüjä bildiriş")
         verbose_name_plural = _("Sürüjilere bildiriş")
         ordering = ['-created']
+        indexes = [
+            models.Index(fields=['driver', '-created'], name='notif_driver_created_idx'),
+            models.Index(
+                fields=['driver', '-created'], condition=models.Q(is_seen=False), name='notif_unseen_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.from_place}→{self.to_place} üçin {self.driver}"
+
+# ===================================================================
+# 11. Ugraýyş tablosy (okamak üçin denormalizasiýa)
+# ===================================================================
+class DepartureBoardRow(models.Model):
+    """Bir ugur üçin taýýar setir: sanaw hiç hili join-siz okalýar."""
+    route = models.OneToOneField(
+        UgurRoute, on_delete=models.CASCADE, primary_key=True, related_name='board_row'
+    )
+    ugur = models.ForeignKey(Ugur, on_delete=models.CASCADE, related_name='+')
+    driver = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    from_place = models.ForeignKey(Place, on_delete=models.CASCADE, related_name='+')
+    to_place = models.ForeignKey(Place, on_delete=models.CASCADE, related_name='+')
+
+    departure_date = models.DateField(_("Ugraýan sene"))
+    departure_time = models.TimeField(_("Ugraýan wagty"), null=True, blank=True)
+    seats_left = models.SmallIntegerField(_("Galan orun"), default=0)
+    price_per_seat = models.DecimalField(
+        _("Ýer üçin baha (TMT)"), max_digits=8, decimal_places=2, null=True, blank=True
+    )
+    driver_name = models.CharField(_("Sürüji"), max_length=300, blank=True)
+    car = models.CharField(_("Ulag"), max_length=300, blank=True)
+
+    class Meta:
+        verbose_name = _("Ugraýyş tablosy")
+        verbose_name_plural = _("Ugraýyş tablosy")
+        ordering = ['departure_date', 'departure_time']
+        indexes = [
+            models.Index(
+                fields=['from_place', 'to_place', 'departure_date', 'departure_time'],
+                name='board_pair_date_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.from_place_id} → {self.to_place_id} | {self.departure_date}"
+
+
+# ===================================================================
+# 12. Arhiw (geçen syýahatlar)
+# ===================================================================
+# Köne syýahatlar esasy tablisalardan şu ýere geçirilýär (archive.py).
+# id-ler asyl ýazgylaryňky bilen deň saklanýar.
+class ArchivedUgur(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    driver = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    type = models.CharField(_("Görnüşi"), max_length=20, choices=Ugur.Type.choices)
+    title = models.CharField(_("Maglumat"), max_length=200, blank=True)
+    created_at = models.DateTimeField(_("Döredildi"))
+    updated_at = models.DateTimeField(_("Täzelendi"))
+    is_completed = models.BooleanField(_("Tamamlandy"), default=False)
+    archived_at = models.DateTimeField(_("Arhiwe geçirildi"), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Arhiw syýahat")
+        verbose_name_plural = _("Arhiw syýahatlar")
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['owner', 'created_at'], name='arch_ugur_owner_idx'),
+            models.Index(fields=['driver', 'created_at'], name='arch_ugur_driver_idx'),
+        ]
+
+    def __str__(self):
+        return self.title or f"Ugur #{self.id}"
+
+
+class ArchivedUgurRoute(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    ugur = models.ForeignKey(ArchivedUgur, on_delete=models.CASCADE, related_name='routes')
+    from_place = models.ForeignKey(Place, on_delete=models.CASCADE, related_name='+')
+    to_place = models.ForeignKey(Place, on_delete=models.CASCADE, related_name='+')
+    departure_date = models.DateField(_("Ugraýan sene"))
+    departure_time = models.TimeField(_("Ugraýan wagty"), null=True, blank=True)
+    available_seats = models.PositiveSmallIntegerField(_("Boş orun"), default=4)
+    price_per_seat = models.DecimalField(
+        _("Ýer üçin baha (TMT)"), max_digits=8, decimal_places=2, null=True, blank=True
+    )
+
+    class Meta:
+        verbose_name = _("Arhiw ugur")
+        verbose_name_plural = _("Arhiw ugurlar")
+        ordering = ['departure_date', 'departure_time']
+
+
+class ArchivedRouteStop(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    route = models.ForeignKey(ArchivedUgurRoute, on_delete=models.CASCADE, related_name='stops')
+    place = models.ForeignKey(Place, on_delete=models.CASCADE, related_name='+')
+    position = models.PositiveSmallIntegerField(_("Tertip belgisi"))
+
+    class Meta:
+        verbose_name = _("Arhiw duralga")
+        verbose_name_plural = _("Arhiw duralgalar")
+        ordering = ['route', 'position']
+
+
+class ArchivedBooking(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    route = models.ForeignKey(ArchivedUgurRoute, on_delete=models.CASCADE, related_name='bookings')
+    passenger = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    seats_booked = models.PositiveSmallIntegerField(_("Orun"), default=1)
+    from_stop = models.PositiveSmallIntegerField(_("Münýän duralga"), null=True, blank=True)
+    to_stop = models.PositiveSmallIntegerField(_("Düşýän duralga"), null=True, blank=True)
+    status = models.CharField(max_length=20, choices=Booking.Status.choices)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = _("Arhiw bron")
+        verbose_name_plural = _("Arhiw bronlar")
+        indexes = [
+            models.Index(fields=['passenger', 'created_at'], name='arch_booking_passenger_idx'),
+        ]
+
+
+class ArchivedLoad(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    ugur = models.ForeignKey(ArchivedUgur, on_delete=models.SET_NULL, null=True, blank=True, related_name='loads')
+    route = models.ForeignKey(ArchivedUgurRoute, on_delete=models.SET_NULL, null=True, blank=True, related_name='loads')
+    from_place = models.ForeignKey(Place, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    to_place = models.ForeignKey(Place, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    description = models.TextField(_("Näme alyp gitmeli"))
+    weight_kg = models.PositiveSmallIntegerField(_("Agyrlygy (kg)"), null=True, blank=True)
+    size = models.CharField(_("Ölçegi"), max_length=100, blank=True)
+    receiver_name = models.CharField(_("Kabul edýäniň ady"), max_length=200)
+    receiver_phone = models.CharField(_("Kabul edýäniň telefon belgisi"), max_length=17)
+    price = models.DecimalField(_("Baha (TMT)"), max_digits=10, decimal_places=2, null=True, blank=True)
+    price_negotiable = models.BooleanField(_("Baha gepleşiler"), default=True)
+    status = models.CharField(_("Ýagdaýy"), max_length=20, choices=Load.Status.choices)
+    created = models.DateTimeField(_("Döredildi"))
+    updated = models.DateTimeField(_("Täzelendi"))
+    delivered_at = models.DateTimeField(_("Gowşuryldy"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Arhiw ýük")
+        verbose_name_plural = _("Arhiw ýükler")
+        ordering = ['-created']
+        indexes = [
+            models.Index(fields=['sender', 'created'], name='arch_load_sender_idx'),
+        ]
+
+
+# ===================================================================
+# 13. Yzygiderli syýahat (tertip)
+# ===================================================================
+class UgurSchedule(models.Model):
+    """
+    Hemişelik ugur (mysal: her gün 08:00-da Aşgabat → Mary).
+    Günler saklanmaýar: gözlegde sene aralygy üçin açylýar (occurrences),
+    UgurRoute bolsa diňe ilkinji bron gelende döredilýär (materialize).
+    """
+    class Freq(models.TextChoices):
+        DAILY = 'daily', _("Her gün")
+        WEEKLY = 'weekly', _("Her hepde")
+
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='schedules', verbose_name=_("Sürüji"))
+    from_place = models.ForeignKey(Place, on_delete=models.CASCADE, related_name='+')
+    to_place = models.ForeignKey(Place, on_delete=models.CASCADE, related_name='+')
+    departure_time = models.TimeField(_("Ugraýan wagty"))
+    seats = models.PositiveSmallIntegerField(_("Orun sany"), default=4)
+    price_per_seat = models.DecimalField(
+        _("Ýer üçin baha (TMT)"), max_digits=8, decimal_places=2, null=True, blank=True
+    )
+
+    freq = models.CharField(_("Gaýtalanyşy"), max_length=10, choices=Freq.choices, default=Freq.DAILY)
+    interval = models.PositiveSmallIntegerField(_("Aralyk"), default=1, validators=[MinValueValidator(1)])
+    # 0 = duşenbe ... 6 = ýekşenbe, mysal: "0,2,4"; boş bolsa start_date-iň güni
+    weekdays = models.CharField(_("Hepdäniň günleri"), max_length=20, blank=True)
+    start_date = models.DateField(_("Başlaýan sene"))
+    end_date = models.DateField(_("Gutarýan sene"), null=True, blank=True)
+    exdates = models.JSONField(_("Aýrylan seneler"), default=list, blank=True)
+
+    is_active = models.BooleanField(_("Işjeň"), default=True)
+    created_at = models.DateTimeField(_("Döredildi"), auto_now_add=True)
+    # /api/routes/ ETag-i açylan günlere baglydyr (UgurRouteViewSet)
+    updated_at = models.DateTimeField(_("Täzelendi"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Yzygiderli syýahat")
+        verbose_name_plural = _("Yzygiderli syýahatlar")
+        ordering = ['departure_time']
+        indexes = [
+            models.Index(fields=['from_place', 'to_place', 'is_active'], name='schedule_pair_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.from_place} → {self.to_place} | {self.get_freq_display()} {self.departure_time:%H:%M}"
+
+    def weekday_set(self):
+        if self.weekdays:
+            return {int(day) for day in self.weekdays.split(',')}
+        return {self.start_date.weekday()}
+
+    def occurs_on(self, day, _weekdays=None, _exdates=None):
+        if day < self.start_date or (self.end_date and day > self.end_date):
+            return False
+        exdates = _exdates if _exdates is not None else set(self.exdates)
+        if day.isoformat() in exdates:
+            return False
+        if self.freq == self.Freq.DAILY:
+            return (day - self.start_date).days % self.interval == 0
+        weekdays = _weekdays if _weekdays is not None else self.weekday_set()
+        if day.weekday() not in weekdays:
+            return False
+        first_week = self.start_date - timedelta(days=self.start_date.weekday())
+        return ((day - first_week).days // 7) % self.interval == 0
+
+    def occurrences(self, date_from, date_to):
+        """[date_from, date_to] aralygyndaky günler (generator)."""
+        weekdays, exdates = self.weekday_set(), set(self.exdates)
+        day = max(date_from, self.start_date)
+        last = min(date_to, self.end_date) if self.end_date else date_to
+        while day <= last:
+            if self.occurs_on(day, weekdays, exdates):
+                yield day
+            day += timedelta(days=1)
+
+    def materialize(self, day):
+        """Şol günüň UgurRoute-y: bar bolsa gaýtarýar, ýok bolsa Ugur bilen bilelikde döredýär."""
+        if not self.occurs_on(day):
+            raise ValidationError(_("Bu gün tertipde ýok"))
+        route = UgurRoute.objects.filter(schedule=self, departure_date=day).first()
+        if route:
+            return route
+        try:
+            with transaction.atomic():
+                ugur = Ugur.objects.create(
+                    owner=self.owner, driver=self.owner, type=Ugur.Type.DRIVER,
+                    title=f"{self.from_place} → {self.to_place}",
+                )
+                return UgurRoute.objects.create(
+                    ugur=ugur, schedule=self,
+                    from_place_id=self.from_place_id, to_place_id=self.to_place_id,
+                    departure_date=day, departure_time=self.departure_time,
+                    available_seats=self.seats, price_per_seat=self.price_per_seat,
+                )
+        except IntegrityError:
+            # параллельный запрос успел создать маршрут на этот день
+            return UgurRoute.objects.get(schedule=self, departure_date=day)
+
+
+# ===================================================================
+# 14. Sürüjiniň ýerleşýän ýeri (GPS)
+# ===================================================================
+class LastKnownPosition(models.Model):
+    """Her ulanyjy üçin diňe bir setir: soňky belli ýeri."""
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name='last_position'
+    )
+    latitude = models.FloatField(_("Latitude"))
+    longitude = models.FloatField(_("Longitude"))
+    speed = models.FloatField(_("Tizlik (km/sag)"), null=True, blank=True)
+    heading = models.FloatField(_("Ugry (gradus)"), null=True, blank=True)
+    recorded_at = models.DateTimeField(_("Ölçelen wagty"))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("Soňky ýeri")
+        verbose_name_plural = _("Soňky ýerleri")
+
+    def __str__(self):
+        return f"{self.user} — {self.latitude}, {self.longitude}"
+
+
+class LocationTrailPoint(models.Model):
+    """Ýoluň seýrekleşdirilen yzy: her ulanyjy üçin her N sekuntda iň köp bir nokat."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='trail_points')
+    latitude = models.FloatField(_("Latitude"))
+    longitude = models.FloatField(_("Longitude"))
+    recorded_at = models.DateTimeField(_("Ölçelen wagty"))
+
+    class Meta:
+        verbose_name = _("Ýoluň nokady")
+        verbose_name_plural = _("Ýoluň yzy")
+        ordering = ['user', 'recorded_at']
+        indexes = [
+            models.Index(fields=['user', 'recorded_at'], name='trail_user_recorded_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} — {self.recorded_at:%H:%M:%S}"
+
+
+# ===================================================================
+# 15. Ugurlar boýunça bahalaryň statistikasy (hepdelik)
+# ===================================================================
+class CorridorPriceStats(models.Model):
+    """(from_place, to_place, hepde) üçin bahalaryň jemi; price_stats.py arkaly täzelenýär."""
+    class Kind(models.TextChoices):
+        ROUTE = 'route', _("Ýolagçy ýeri")
+        LOAD = 'load', _("Ýük")
+
+    from_place = models.ForeignKey(Place, on_delete=models.CASCADE, related_name='+')
+    to_place = models.ForeignKey(Place, on_delete=models.CASCADE, related_name='+')
+    kind = models.CharField(_("Görnüşi"), max_length=10, choices=Kind.choices)
+    week = models.DateField(_("Hepde (duşenbe)"))
+
+    count = models.PositiveIntegerField(_("Sany"), default=0)
+    min_price = models.DecimalField(_("Iň arzan"), max_digits=10, decimal_places=2, null=True, blank=True)
+    max_price = models.DecimalField(_("Iň gymmat"), max_digits=10, decimal_places=2, null=True, blank=True)
+    total = models.DecimalField(_("Jemi"), max_digits=14, decimal_places=2, default=0)
+    # логарифмическая гистограмма {номер корзины: количество} — для приблизительных перцентилей
+    histogram = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("Bahalaryň statistikasy")
+        verbose_name_plural = _("Bahalaryň statistikasy")
+        constraints = [
+            models.UniqueConstraint(
+                fields=['from_place', 'to_place', 'kind', 'week'], name='price_stats_key_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.from_place_id} → {self.to_place_id} {self.kind} {self.week}"
+
+
+# ===================================================================
+# 16. Sürüjiniň günlik jemleri (dashboard)
+# ===================================================================
+class DriverDailyStats(models.Model):
+    """Sürüji we gün boýunça jemler; driver_stats.py arkaly täzelenýär."""
+    driver = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_stats')
+    day = models.DateField(_("Gün"))
+    trips = models.PositiveIntegerField(_("Syýahatlar"), default=0)
+    seats_sold = models.PositiveIntegerField(_("Satylan orunlar"), default=0)
+    revenue = models.DecimalField(_("Girdeji (TMT)"), max_digits=12, decimal_places=2, default=0)
+    loads_delivered = models.PositiveIntegerField(_("Gowşurylan ýükler"), default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("Sürüjiniň günlik jemi")
+        verbose_name_plural = _("Sürüjileriň günlik jemleri")
+        ordering = ['-day']
+        constraints = [
+            models.UniqueConstraint(fields=['driver', 'day'], name='driver_stats_day_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.driver} — {self.day}"
+
+
+# ===================================================================
+# 17. Pozulan ýazgylaryň yzy (/api/sync/ üçin)
+# ===================================================================
+class SyncTombstone(models.Model):
+    """Pozulan ýazgy: müşderiler öz keşinden hem aýyrar ýaly. user boş bolsa — hemmä görünýär."""
+    model = models.CharField(_("Model"), max_length=30)
+    object_id = models.BigIntegerField(_("ID"))
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    deleted_at = models.DateTimeField(_("Pozuldy"), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Pozulan ýazgy")
+        verbose_name_plural = _("Pozulan ýazgylar")
+        indexes = [
+            models.Index(fields=['model', 'deleted_at'], name='tombstone_model_deleted_idx'),
+            models.Index(fields=['user', 'deleted_at'], name='tombstone_user_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id}"
+
+
+# ===================================================================
+# 18. Ýolagçy islegi bilen sürüji hödürini jübütlemek
+# ===================================================================
+class Match(models.Model):
+    """Ýolagçynyň islegine (PASSENGER) laýyk sürüji hödüri (DRIVER); matching.py arkaly dolandyrylýar."""
+    offer = models.ForeignKey(UgurRoute, on_delete=models.CASCADE, related_name='offer_matches')
+    request = models.ForeignKey(UgurRoute, on_delete=models.CASCADE, related_name='request_matches')
+    # denormalizasiýa: sanaw iki tarap üçin hem join-siz süzülýär
+    driver = models.ForeignKey(User, on_delete=models.CASCADE, related_name='driver_matches')
+    passenger = models.ForeignKey(User, on_delete=models.CASCADE, related_name='passenger_matches')
+    score = models.FloatField(_("Laýyklyk"))
+    created_at = models.DateTimeField(_("Döredildi"), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Jübüt")
+        verbose_name_plural = _("Jübütler")
+        ordering = ['-score']
+        constraints = [
+            models.UniqueConstraint(fields=['offer', 'request'], name='match_offer_request_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['driver', '-score'], name='match_driver_score_idx'),
+            models.Index(fields=['passenger', '-score'], name='match_passenger_score_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.from_place}→{self.to_place} üçin {self.driver}"
\ No newline at end of file
+        return f"{self.offer_id} ↔ {self.request_id} ({self.score})"
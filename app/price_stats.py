@@ -0,0 +1,259 @@
+"""
+Ugurlar boýunça bahalaryň hepdelik statistikasy (CorridorPriceStats).
+
+Täze sürüji ugry (DRIVER) / Load döredilende setir artdyrylýar (count, min, max, jemi,
+histogramma). Baha, sene ýa-da ýer üýtgände ýa-da ýazgy pozulanda degişli
+hepdäniň setiri çeşme tablisalaryndan (arhiw bilen bilelikde) gaýtadan
+hasaplanýar. rebuild() ähli tablisany täzeden gurýar. Ýolagçy islegleriniň
+(PASSENGER) bahasy hödür däl — olar hasaba alynmaýar.
+
+Göterim (percentile) bahalary takmyny: histogramma logarifmik, her sebet
+BUCKET_RATIO esasynda (~5%).
+"""
+import math
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedLoad, ArchivedUgurRoute, CorridorPriceStats, Load, Ugur, UgurRoute, loaded_values
+
+BUCKET_RATIO = 1.05
+PERCENTILES = (25, 50, 75, 90)
+
+Kind = CorridorPriceStats.Kind
+
+
+def week_start(day):
+    return day - timedelta(days=day.weekday())
+
+
+def to_day(value):
+    # Load.created — datetime; неделя считается по местной дате, как и в week_bounds
+    return timezone.localdate(value) if isinstance(value, datetime) else value
+
+
+def week_bounds(week):
+    """Ýerli hepdäniň [başy, soňy) — `created__date`-den tapawutlylykda created indeksini ulanýar."""
+    start = timezone.make_aware(datetime.combine(week, time.min))
+    return start, timezone.make_aware(datetime.combine(week + timedelta(days=7), time.min))
+
+
+def bucket_index(price):
+    if price <= 0:
+        return 0
+    return math.floor(math.log(float(price)) / math.log(BUCKET_RATIO))
+
+
+def bucket_value(index):
+    # середина корзины в логарифмической шкале
+    return BUCKET_RATIO ** (index + 0.5)
+
+
+def percentile(histogram, q, low, high):
+    """Histogrammadan q-njy göterim; netije [low, high] aralygynda."""
+    total = sum(histogram.values())
+    if not total:
+        return None
+    rank = q / 100 * total
+    seen = 0
+    for index in sorted(histogram, key=int):
+        seen += histogram[index]
+        if seen >= rank:
+            value = Decimal(bucket_value(int(index))).quantize(Decimal('0.01'))
+            return min(max(value, low), high)
+    return high
+
+
+# ===================================================================
+# Açarlar: (kind, from_place_id, to_place_id, week), baha
+# ===================================================================
+def route_key(data):
+    # data — __dict__ или loaded_values: отложенные (only/defer) поля не вызывают запрос
+    day, price = data.get('departure_date'), data.get('price_per_seat')
+    if day is None or price is None or not data.get('from_place_id') or not data.get('to_place_id'):
+        return None
+    return (Kind.ROUTE, data['from_place_id'], data['to_place_id'], week_start(day)), price
+
+
+def load_key(data):
+    created, price = data.get('created'), data.get('price')
+    if created is None or price is None or not data.get('from_place_id') or not data.get('to_place_id'):
+        return None
+    return (Kind.LOAD, data['from_place_id'], data['to_place_id'], week_start(to_day(created))), price
+
+
+KEY_FUNCTIONS = {UgurRoute: route_key, Load: load_key}
+
+
+def _sources(kind, from_place_id, to_place_id, week):
+    """Bir hepdäniň bahalary: esasy we arhiw tablisalaryndan."""
+    if kind == Kind.ROUTE:
+        lookup = {
+            'from_place_id': from_place_id, 'to_place_id': to_place_id,
+            'departure_date__gte': week, 'departure_date__lt': week + timedelta(days=7),
+            'price_per_seat__isnull': False, 'ugur__type': Ugur.Type.DRIVER,
+        }
+        sources = [(UgurRoute, 'price_per_seat'), (ArchivedUgurRoute, 'price_per_seat')]
+    else:
+        start, end = week_bounds(week)
+        lookup = {
+            'from_place_id': from_place_id, 'to_place_id': to_place_id,
+            'created__gte': start, 'created__lt': end,
+            'price__isnull': False,
+        }
+        sources = [(Load, 'price'), (ArchivedLoad, 'price')]
+    for model, field in sources:
+        yield from model.objects.filter(**lookup).values_list(field, flat=True).iterator()
+
+
+def _fill(stats, prices):
+    stats.count, stats.total, stats.min_price, stats.max_price = 0, Decimal(0), None, None
+    stats.histogram = {}
+    for price in prices:
+        _add(stats, price)
+
+
+def _add(stats, price):
+    price = Decimal(str(price))
+    stats.count += 1
+    stats.total += price
+    stats.min_price = price if stats.min_price is None else min(stats.min_price, price)
+    stats.max_price = price if stats.max_price is None else max(stats.max_price, price)
+    index = str(bucket_index(price))
+    stats.histogram[index] = stats.histogram.get(index, 0) + 1
+
+
+def _get_for_update(key):
+    kind, from_place_id, to_place_id, week = key
+    stats, _ = CorridorPriceStats.objects.select_for_update().get_or_create(
+        kind=kind, from_place_id=from_place_id, to_place_id=to_place_id, week=week,
+    )
+    return stats
+
+
+@transaction.atomic
+def add(key, price):
+    """Täze ýazgy: setiri çeşmä degmän artdyrýar."""
+    stats = _get_for_update(key)
+    _add(stats, price)
+    stats.save()
+
+
+@transaction.atomic
+def recompute(key):
+    """Bir (ugur, hepde) setirini çeşmeden gaýtadan hasaplaýar."""
+    stats = _get_for_update(key)
+    _fill(stats, _sources(*key))
+    if stats.count:
+        stats.save()
+    else:
+        stats.delete()
+
+
+def counted(instance):
+    """Ýolagçy islegi (PASSENGER) statistika girmeýär; ugur eýýäm ýüklenen bolsa sorag ýok."""
+    return not isinstance(instance, UgurRoute) or instance.ugur.type == Ugur.Type.DRIVER
+
+
+def previous_key(instance):
+    loaded = loaded_values(instance)
+    return None if loaded is None else KEY_FUNCTIONS[type(instance)](loaded)
+
+
+def on_saved(instance, created):
+    if not counted(instance):
+        return
+    new = KEY_FUNCTIONS[type(instance)](instance.__dict__)
+    if created:
+        if new is not None:
+            add(*new)
+        return
+    old = previous_key(instance)
+    if old != new:
+        for key in {entry[0] for entry in (old, new) if entry is not None}:
+            recompute(key)
+
+
+def on_deleted(instance):
+    if not counted(instance):
+        return
+    old = previous_key(instance)
+    if old is not None:
+        recompute(old[0])
+
+
+def load_keys(queryset):
+    return {
+        (Kind.LOAD, from_place_id, to_place_id, week_start(to_day(created)))
+        for from_place_id, to_place_id, created in queryset.filter(
+            price__isnull=False, from_place__isnull=False, to_place__isnull=False,
+        ).values_list('from_place_id', 'to_place_id', 'created')
+    }
+
+
+# ===================================================================
+# Doly gaýtadan gurmak
+# ===================================================================
+def _collect(rows, kind):
+    for from_place_id, to_place_id, day, price in rows:
+        yield (kind, from_place_id, to_place_id, week_start(to_day(day))), price
+
+
+def rebuild(batch_size=1000):
+    """Ähli statistikany çeşme we arhiw tablisalaryndan gurýar. Gaýtarýar: setirleriň sany."""
+    stats = defaultdict(lambda: CorridorPriceStats(count=0, total=Decimal(0), histogram={}))
+    route_fields = ('from_place_id', 'to_place_id', 'departure_date', 'price_per_seat')
+    load_fields = ('from_place_id', 'to_place_id', 'created', 'price')
+    streams = [
+        _collect(model.objects.filter(price_per_seat__isnull=False, ugur__type=Ugur.Type.DRIVER)
+                 .values_list(*route_fields)
+                 .iterator(chunk_size=batch_size), Kind.ROUTE)
+        for model in (UgurRoute, ArchivedUgurRoute)
+    ] + [
+        _collect(model.objects.filter(
+            price__isnull=False, from_place__isnull=False, to_place__isnull=False,
+        ).values_list(*load_fields).iterator(chunk_size=batch_size), Kind.LOAD)
+        for model in (Load, ArchivedLoad)
+    ]
+    for stream in streams:
+        for key, price in stream:
+            _add(stats[key], price)
+
+    rows = []
+    for (kind, from_place_id, to_place_id, week), row in stats.items():
+        row.kind, row.from_place_id, row.to_place_id, row.week = kind, from_place_id, to_place_id, week
+        rows.append(row)
+    with transaction.atomic():
+        CorridorPriceStats.objects.all().delete()
+        CorridorPriceStats.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def summarize(rows):
+    """Birnäçe hepdäniň setirlerini birleşdirýär (jogap üçin)."""
+    if not rows:
+        return None
+    merged = CorridorPriceStats(count=0, total=Decimal(0), histogram={})
+    for row in rows:
+        merged.count += row.count
+        merged.total += row.total
+        merged.min_price = row.min_price if merged.min_price is None else min(merged.min_price, row.min_price)
+        merged.max_price = row.max_price if merged.max_price is None else max(merged.max_price, row.max_price)
+        for index, count in row.histogram.items():
+            merged.histogram[index] = merged.histogram.get(index, 0) + count
+    return merged
+
+
+def describe(stats):
+    data = {
+        'count': stats.count,
+        'min': stats.min_price,
+        'max': stats.max_price,
+        'mean': (stats.total / stats.count).quantize(Decimal('0.01')) if stats.count else None,
+    }
+    for q in PERCENTILES:
+        data[f'p{q}'] = percentile(stats.histogram, q, stats.min_price, stats.max_price)
+    return data
@@ -0,0 +1,162 @@
+"""
+Okamak soraglaryny replikalara ugratmak.
+
+settings.UGUR_REPLICAS — replika aliaslary (DATABASES-daky). Boş bolsa,
+hemme zat öňküsi ýaly 'default'-da işleýär.
+
+ * ReplicaMiddleware: GET / HEAD / OPTIONS soraglarynyň okamalary replika
+   gidýär, galanlary — esasy baza. Ýazan ulanyjy şondan soň
+   settings.UGUR_REPLICA_STICKY_SECONDS esasy bazadan okaýar (read-your-writes):
+   belgi keşde, ulanyjy tokenden tanalanda barlanýar (auth.py).
+ * ReplicaRouter: ýazmak, tranzaksiýanyň içindäki we şol sorag eýýäm bir
+   zat ýazandan soňky okamak — hemişe 'default'.
+ * read_only(queryset) / reading() — soragdan daşarda (komandalar we ş.m.)
+   aýratyn okamalary replika ibermek üçin.
+
+Elýeterli däl replika settings.UGUR_REPLICA_RETRY_SECONDS dowamynda
+ulanylmaýar — okamalar esasy baza gaýdýar.
+"""
+import contextvars
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = 'primary'
+REPLICA = 'replica'
+STICKY_KEY = 'db:sticky:{}'
+
+_target = contextvars.ContextVar('ugur_db_target', default=PRIMARY)
+# alias → (elýeterli, barlagyň möhleti)
+_health = {}
+
+
+def replica_aliases():
+    return getattr(settings, 'UGUR_REPLICAS', [])
+
+
+def _reachable(alias):
+    connection = connections[alias]
+    # sqlite3.connect создаёт пустой файл вместо отсутствующей реплики
+    if connection.vendor == 'sqlite' and not connection.is_in_memory_db():
+        if not os.path.exists(connection.settings_dict['NAME']):
+            return False
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    return True
+
+
+def is_available(alias):
+    now = time.monotonic()
+    healthy, expires = _health.get(alias, (None, 0))
+    if now < expires:
+        return healthy
+    try:
+        healthy = _reachable(alias)
+    except DatabaseError:
+        healthy = False
+    if not healthy:
+        logger.warning("Replika elýeterli däl: %s", alias)
+    _health[alias] = (healthy, now + getattr(settings, 'UGUR_REPLICA_RETRY_SECONDS', 30))
+    return healthy
+
+
+def pick():
+    """Elýeterli replika; ýok bolsa 'default'."""
+    aliases = [alias for alias in replica_aliases() if is_available(alias)]
+    return random.choice(aliases) if aliases else DEFAULT_DB_ALIAS
+
+
+# ===================================================================
+# Read-your-writes
+# ===================================================================
+def remember_write(user_id):
+    timeout = getattr(settings, 'UGUR_REPLICA_STICKY_SECONDS', 10)
+    cache.set(STICKY_KEY.format(user_id), 1, timeout)
+
+
+def use_primary():
+    _target.set(PRIMARY)
+
+
+def check_recent_write(user_id):
+    """Ulanyjy ýaňy ýazan bolsa, şu soragyň galan okamalary esasy bazadan."""
+    if _target.get() == REPLICA and cache.get(STICKY_KEY.format(user_id)):
+        use_primary()
+
+
+# ===================================================================
+# Aç-açan bellenen okamalar
+# ===================================================================
+def read_only(queryset):
+    """Queryseti replika ugradýar (ýazmak üçin ulanmaly däl)."""
+    return queryset.using(pick())
+
+
+@contextmanager
+def reading():
+    """Blokdaky okamalar replika gidýär (ýazmak bolsa — esasy baza)."""
+    token = _target.set(REPLICA)
+    try:
+        yield
+    finally:
+        _target.reset(token)
+
+
+class ReplicaRouter:
+    def _pool(self):
+        return {DEFAULT_DB_ALIAS, *replica_aliases()}
+
+    def db_for_read(self, model, **hints):
+        if _target.get() != REPLICA or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            # явно 'default': иначе Django возьмёт базу объекта-подсказки, т.е. реплику
+            return DEFAULT_DB_ALIAS
+        return pick()
+
+    def db_for_write(self, model, **hints):
+        # после записи этот запрос читает с основной базы — реплика могла не догнать
+        use_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # реплика — копия основной базы: связи между ними допустимы
+        pool = self._pool()
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return False if db in replica_aliases() else None
+
+
+class ReplicaMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # сессия (админка) читается до view — такие запросы целиком на основной базе
+        replica = (
+            request.method in SAFE_METHODS
+            and bool(replica_aliases())
+            and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        )
+        token = _target.set(REPLICA if replica else PRIMARY)
+        try:
+            response = self.get_response(request)
+        finally:
+            _target.reset(token)
+
+        if request.method not in SAFE_METHODS:
+            # DRF выставляет request.user и для исходного HttpRequest
+            user_id = getattr(getattr(request, 'user', None), 'pk', None)
+            if user_id is not None and replica_aliases():
+                remember_write(user_id)
+        return response
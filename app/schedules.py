@@ -0,0 +1,92 @@
+"""
+Yzygiderli syýahatlary (UgurSchedule) sene aralygy üçin açmak we bronlamak.
+
+Tertipden çykýan günler bazada saklanmaýar: gözlegde (tablo we /api/routes/)
+şu ýerde hasaplanýar. UgurRoute diňe ilkinji bron gelende döredilýär
+(UgurSchedule.materialize).
+"""
+from django.db import transaction
+from django.db.models import Q
+
+from . import seats
+from .board import car_display, driver_display
+from .models import DriverProfile, UgurRoute, UgurSchedule
+
+# сколько дней вперёд разворачиваем расписания, если date_to не задан
+EXPAND_WINDOW_DAYS = 31
+
+
+def active_schedules(from_place_id, to_place_id, date_from, date_to):
+    return (
+        UgurSchedule.objects
+        .filter(from_place_id=from_place_id, to_place_id=to_place_id, is_active=True, start_date__lte=date_to)
+        .filter(Q(end_date__isnull=True) | Q(end_date__gte=date_from))
+        .select_related('owner__driver_profile')
+    )
+
+
+def pending_days(schedules, date_from, date_to):
+    """(tertip, gün) jübütleri, eýýäm UgurRoute bolan (materialize edilen) günlerden başga."""
+    if not schedules:
+        return
+    materialized = set(
+        UgurRoute.objects
+        .filter(schedule__in=schedules, departure_date__range=(date_from, date_to))
+        .values_list('schedule_id', 'departure_date')
+    )
+    for schedule in schedules:
+        for day in schedule.occurrences(date_from, date_to):
+            if (schedule.pk, day) not in materialized:
+                yield schedule, day
+
+
+def expand(from_place_id, to_place_id, date_from, date_to):
+    """
+    Aralykdaky tertip günleri tablonyň setirleri görnüşinde.
+    Jemi iki sorag: tertipler we olaryň döredilen günleri.
+    """
+    schedules = list(active_schedules(from_place_id, to_place_id, date_from, date_to))
+    rows = []
+    for schedule, day in pending_days(schedules, date_from, date_to):
+        driver = schedule.owner
+        try:
+            profile = driver.driver_profile
+        except DriverProfile.DoesNotExist:
+            profile = None
+        rows.append({
+            'route': None,
+            'ugur': None,
+            'schedule': schedule.pk,
+            'from_place': schedule.from_place_id,
+            'to_place': schedule.to_place_id,
+            'departure_date': day,
+            'departure_time': schedule.departure_time,
+            'seats_left': schedule.seats,
+            'price_per_seat': schedule.price_per_seat,
+            'driver_name': driver_display(driver),
+            'car': car_display(profile),
+        })
+    return rows
+
+
+def expand_routes(from_place_id, to_place_id, date_from, date_to):
+    """expand() ýaly, ýöne /api/routes/ üçin: ýazylmadyk (id=None) UgurRoute obýektleri."""
+    schedules = list(
+        active_schedules(from_place_id, to_place_id, date_from, date_to)
+        .select_related(None).select_related('from_place', 'to_place')
+    )
+    return [
+        UgurRoute(
+            schedule=schedule, from_place=schedule.from_place, to_place=schedule.to_place,
+            departure_date=day, departure_time=schedule.departure_time,
+            available_seats=schedule.seats, price_per_seat=schedule.price_per_seat,
+        )
+        for schedule, day in pending_days(schedules, date_from, date_to)
+    ]
+
+
+@transaction.atomic
+def book_occurrence(schedule, day, passenger, seats_booked=1):
+    """Tertibiň bir gününi bronlaýar: ugur ýok bolsa döredilýär, orunlar gulplanyp barlanýar."""
+    route = schedule.materialize(day)
+    return seats.reserve(route, passenger, seats_booked=seats_booked)
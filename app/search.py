@@ -0,0 +1,144 @@
+"""
+Ýükler (description, receiver_name) we syýahatlar (title we ugurlaryň
+şäherleri) boýunça doly tekstli gözleg.
+
+ * SQLite — FTS5 tablisalary (app_load_fts, app_ugur_fts) esasy tablisa
+   JOIN edilýär, bm25 bilen tertiplenýär;
+ * PostgreSQL — tsvector GIN indeksi (`pk IN`), ts_rank bilen tertiplenýär;
+ * beýleki bazalar — öňküsi ýaly icontains.
+
+Indeksler 0013_search we 0019_ugur_place_search migrasiýalarynda döredilýär we
+triggerler (SQLite) ýa-da indeksiň özi (PostgreSQL) arkaly täzelenýär — signal
+gerek däl. Gözleg view-yň beýleki süzgüçleri bilen bir soragda işleýär,
+netijeleriň sany çäklendirilmeýär.
+
+Syýahat her söz üçin ýa title-da, ýa-da ugurlarynyň biriniň şäherinde
+(from_place / to_place) bolmaly — öňki SearchFilter ýaly. SQLite-da şäherler
+app_ugur_fts-iň `places` sütüninde (triggerler bilen), PostgreSQL-da
+app_place-iň GIN indeksi arkaly gözlenýär.
+"""
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+
+from .models import UgurRoute
+
+INDEXES = {
+    'load': {'table': 'app_load', 'fts': 'app_load_fts', 'fields': ('description', 'receiver_name')},
+    'ugur': {'table': 'app_ugur', 'fts': 'app_ugur_fts', 'fields': ('title',), 'route_places': True},
+}
+TERM = re.compile(r'\w+')
+
+# app_ugur_fts.places: названия городов всех маршрутов ugur-а (как в 0019_ugur_place_search)
+UGUR_PLACES_SQL = (
+    "(SELECT group_concat(name, ' ') FROM app_place WHERE id IN ("
+    "SELECT from_place_id FROM app_ugurroute WHERE ugur_id = {ugur} "
+    "UNION SELECT to_place_id FROM app_ugurroute WHERE ugur_id = {ugur}))"
+)
+
+
+def terms(text):
+    # только слова: служебный синтаксис MATCH / tsquery из ввода не проходит
+    return TERM.findall(text or '')[:10]
+
+
+# ===================================================================
+# Backend-ler
+# ===================================================================
+def _contains(fields, word):
+    return Q(*[Q(**{f'{field}__icontains': word}) for field in fields], _connector=Q.OR)
+
+
+def _route_places(condition):
+    return Q(pk__in=UgurRoute.objects.filter(condition).values('ugur_id'))
+
+
+def _sqlite(queryset, index, words):
+    fts, table = index['fts'], index['table']
+    # "слово"* — поиск по префиксу, слова через пробел — AND (в любом столбце, в т.ч. places)
+    query = ' '.join('"{}"*'.format(word) for word in words)
+    return queryset.extra(
+        select={'search_rank': f'bm25({fts})'},
+        tables=[fts],
+        where=[f'{fts} MATCH %s', f'{fts}.rowid = {table}.id'],
+        params=[query],
+    ).order_by('search_rank', '-pk')
+
+
+def _postgres(queryset, index, words):
+    def matches(table, fields, words):
+        columns = " || ' ' || ".join(f"coalesce({field}, '')" for field in fields)
+        sql = f"SELECT id FROM {table} WHERE to_tsvector('simple', {columns}) @@ to_tsquery('simple', %s)"
+        return RawSQL(sql, [' & '.join(f'{word}:*' for word in words)])
+
+    if index.get('route_places'):
+        condition = Q()
+        for word in words:
+            places = matches('app_place', ['name'], [word])
+            condition &= Q(pk__in=matches(index['table'], index['fields'], [word])) | _route_places(
+                Q(from_place__in=places) | Q(to_place__in=places)
+            )
+    else:
+        condition = Q(pk__in=matches(index['table'], index['fields'], words))
+
+    # ранг — по собственным столбцам строки, только для уже найденных
+    columns = " || ' ' || ".join(f'coalesce("{index["table"]}".{field}, \'\')' for field in index['fields'])
+    rank = RawSQL(
+        f"ts_rank(to_tsvector('simple', {columns}), to_tsquery('simple', %s))",
+        [' & '.join(f'{word}:*' for word in words)], output_field=FloatField(),
+    )
+    return queryset.filter(condition).annotate(search_rank=rank).order_by('-search_rank', '-pk')
+
+
+def _fallback(queryset, index, words):
+    condition = Q()
+    for word in words:
+        word_condition = _contains(index['fields'], word)
+        if index.get('route_places'):
+            word_condition |= _route_places(_contains(['from_place__name', 'to_place__name'], word))
+        condition &= word_condition
+    return queryset.filter(condition)
+
+
+BACKENDS = {'sqlite': _sqlite, 'postgresql': _postgres}
+
+
+def search(queryset, name, text):
+    """Querysete gözlegi goşýar we laýyklyk boýunça tertipleýär."""
+    words = terms(text)
+    if not words:
+        return queryset.none()
+    backend = BACKENDS.get(connection.vendor, _fallback)
+    return backend(queryset, INDEXES[name], words)
+
+
+def rebuild():
+    """FTS5 tablisalaryny esasy tablisalardan täzeden gurýar (diňe SQLite)."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("INSERT INTO app_load_fts(app_load_fts) VALUES ('rebuild')")
+        # app_ugur_fts хранит свой текст (places нет в app_ugur) — заполняем заново
+        cursor.execute("DELETE FROM app_ugur_fts")
+        cursor.execute(
+            "INSERT INTO app_ugur_fts(rowid, title, places) "
+            f"SELECT id, title, {UGUR_PLACES_SQL.format(ugur='app_ugur.id')} FROM app_ugur"
+        )
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    ?search=... — view.search_index ('load' ýa-da 'ugur') boýunça doly tekstli gözleg.
+    Netijeler laýyklyk boýunça tertiplenýär; ?ordering= berilse, OrderingFilter ony çalyşýar.
+    """
+    search_param = api_settings.SEARCH_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').strip()
+        if not text:
+            return queryset
+        return search(queryset, view.search_index, text)
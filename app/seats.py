@@ -0,0 +1,263 @@
+"""
+Köp duralgaly ugurlarda bölekler (segment) boýunça orunlar.
+
+Ugruň duralgalary: [from_place, *RouteStop, to_place]; i-nji bölek i we i+1
+duralgalaryň arasy. Bron [from_stop, to_stop) bölekleriniň hersinde
+seats_booked orun eýeleýär, galan bölekler boş galýar.
+
+Her bölekde eýelenen orunlar UgurRoute.seat_tree-de (JSON) segment agajy
+görnüşinde saklanýar: aralyga goşmak we aralykdaky iň köp eýelenen orun —
+O(log n), emma JSON-y okamak we ýazmak O(n). n MAX_STOPS bilen çäklendirilen
+(≤ 51 bölek, ~1.5 KB), şonuň üçin bron bir gulplanan setiri okap, bir UPDATE
+bilen ýazýar; böleklere aýratyn setirler goşmaça soraglardyr. Barlag we
+goşmak ugruň setiri gulplanyp (select_for_update) bir tranzaksiýada geçýär;
+bronlar gaýtadan okalmaýar. Agaç Booking signallary arkaly täzelenýär,
+rebuild() bolsa ony bronlardan gaýtadan gurýar.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Sum
+from rest_framework import serializers
+
+from .models import Booking, Place, RouteStop, UgurRoute, loaded_values
+
+# места, которые уже заняты (ожидающие и подтверждённые брони)
+HOLDING_STATUSES = (Booking.Status.PENDING, Booking.Status.CONFIRMED)
+# предел промежуточных остановок: держит seat_tree маленьким
+MAX_STOPS = 50
+
+
+class SeatTree:
+    """
+    Segment agajy: aralyga goşmak, aralykda iň ulusy.
+    top[node] — düwüniň aralygyndaky iň ulusy (öz lazy-si bilen), lazy[node] — aşak geçirilmedik goşmaça.
+    """
+
+    def __init__(self, size, data=None):
+        self.size = size
+        if data and data.get('size') == size:
+            self.top, self.lazy = data['top'], data['lazy']
+        else:
+            self.top, self.lazy = [0] * (4 * size), [0] * (4 * size)
+
+    def to_json(self):
+        return {'size': self.size, 'top': self.top, 'lazy': self.lazy}
+
+    def add(self, lo, hi, value, node=1, left=0, right=None):
+        """[lo, hi) böleklerine value goşýar."""
+        right = self.size if right is None else right
+        if hi <= left or right <= lo:
+            return
+        if lo <= left and right <= hi:
+            self.top[node] += value
+            self.lazy[node] += value
+            return
+        mid = (left + right) // 2
+        self.add(lo, hi, value, 2 * node, left, mid)
+        self.add(lo, hi, value, 2 * node + 1, mid, right)
+        self.top[node] = max(self.top[2 * node], self.top[2 * node + 1]) + self.lazy[node]
+
+    def max(self, lo, hi, node=1, left=0, right=None):
+        """[lo, hi) bölekleriniň iň köp eýelenen orny."""
+        right = self.size if right is None else right
+        if hi <= left or right <= lo:
+            return 0
+        if lo <= left and right <= hi:
+            return self.top[node]
+        mid = (left + right) // 2
+        return max(
+            self.max(lo, hi, 2 * node, left, mid),
+            self.max(lo, hi, 2 * node + 1, mid, right),
+        ) + self.lazy[node]
+
+
+def max_booked(route):
+    """Ugruň iň köp eýelenen bölegi — ähli ugur üçin boş orun şondan hasaplanýar."""
+    data = route.seat_tree
+    return data['top'][1] if data else 0
+
+
+def stop_places(route):
+    """Duralgalaryň doly sanawy (place id): [from_place, ..., to_place]."""
+    middle = RouteStop.objects.filter(route=route).order_by('position').values_list('place_id', flat=True)
+    return [route.from_place_id, *middle, route.to_place_id]
+
+
+def load_tree(route):
+    data = route.seat_tree or {}
+    size = data.get('size') or RouteStop.objects.filter(route=route).count() + 1
+    return SeatTree(size, data)
+
+
+def span(tree, from_stop, to_stop):
+    return (from_stop or 0), (tree.size if to_stop is None else to_stop)
+
+
+def _check(route, tree, lo, hi, seats_booked):
+    if not 0 <= lo < hi <= tree.size:
+        raise serializers.ValidationError("Duralgalaryň aralygy nädogry.")
+    if tree.max(lo, hi) + seats_booked > route.available_seats:
+        raise serializers.ValidationError({'seats_booked': "Boş orun ýeterlik däl."})
+
+
+def _save(route, tree):
+    route.seat_tree = tree.to_json()
+    UgurRoute.objects.filter(pk=route.pk).update(seat_tree=route.seat_tree)
+
+
+# ===================================================================
+# Bronlamak
+# ===================================================================
+@transaction.atomic
+def reserve(route, passenger, from_stop=None, to_stop=None, seats_booked=1):
+    """Duralgalaryň aralygyny barlap bronlaýar. Gaýtarýar: Booking."""
+    route = UgurRoute.objects.select_for_update().get(pk=route.pk)
+    tree = load_tree(route)
+    _check(route, tree, *span(tree, from_stop, to_stop), seats_booked)
+
+    booking = Booking(
+        route=route, passenger=passenger, seats_booked=seats_booked, from_stop=from_stop, to_stop=to_stop,
+    )
+    # сигнал post_save возьмёт уже заблокированный маршрут и дерево, без повторного чтения
+    booking._seat_route = (route, tree)
+    try:
+        with transaction.atomic():
+            booking.save()
+    except IntegrityError:
+        raise serializers.ValidationError("Bu ugur eýýäm bronlanan.")
+    return booking
+
+
+def resolve_stops(route, from_place_id=None, to_place_id=None):
+    """Şäher id-lerini duralga belgilerine öwürýär; berilmese — ugruň başy / soňy (None)."""
+    if from_place_id is None and to_place_id is None:
+        return None, None
+    places = stop_places(route)
+    try:
+        from_stop = None if from_place_id is None else places.index(from_place_id)
+        to_stop = None if to_place_id is None else places.index(to_place_id)
+    except ValueError:
+        raise serializers.ValidationError("Bu şäher ugruň duralgasy däl.")
+    return from_stop, to_stop
+
+
+@transaction.atomic
+def set_stops(route, place_ids):
+    """Aralyk duralgalary çalyşýar. Işjeň bronlar bar bolsa — rugsat berilmeýär."""
+    route = UgurRoute.objects.select_for_update().get(pk=route.pk)
+    if route.bookings.filter(status__in=HOLDING_STATUSES).exists():
+        raise serializers.ValidationError("Ugurda bronlar bar: duralgalary üýtgedip bolmaýar.")
+    if len(place_ids) > MAX_STOPS:
+        raise serializers.ValidationError(f"Duralgalar {MAX_STOPS}-den köp bolmaly däl.")
+    if len(set(place_ids)) != len(place_ids) or {route.from_place_id, route.to_place_id} & set(place_ids):
+        raise serializers.ValidationError("Duralgalar gaýtalanmaly däl.")
+    if Place.objects.filter(pk__in=place_ids).count() != len(place_ids):
+        raise serializers.ValidationError("Şäher tapylmady.")
+
+    RouteStop.objects.filter(route=route).delete()
+    RouteStop.objects.bulk_create([
+        RouteStop(route=route, place_id=place_id, position=position)
+        for position, place_id in enumerate(place_ids, start=1)
+    ])
+    _save(route, SeatTree(len(place_ids) + 1))
+    return route
+
+
+def describe(route):
+    """Duralgalar we her bölekdäki boş orunlar."""
+    tree = load_tree(route)
+    places = stop_places(route)
+    return {
+        'stops': places,
+        'segments': [
+            {
+                'from_place': places[i],
+                'to_place': places[i + 1],
+                'seats_left': max(route.available_seats - tree.max(i, i + 1), 0),
+            }
+            for i in range(tree.size)
+        ],
+    }
+
+
+# ===================================================================
+# Signallar üçin: bron üýtgände agajy täzelemek
+# ===================================================================
+def booking_key(data):
+    # data — __dict__ или loaded_values брони
+    if data.get('status') not in HOLDING_STATUSES:
+        return None
+    return data.get('route_id'), data.get('from_stop'), data.get('to_stop'), data.get('seats_booked')
+
+
+def guard(booking):
+    """
+    pre_save: reserve()-den geçmedik ýazgy (mysal üçin seats_booked üýtgedilende)
+    hem orun barlagyndan geçýär. Gulp çagyryjynyň tranzaksiýasynyň ahyryna çenli saklanýar.
+    """
+    if '_seat_route' in booking.__dict__:
+        return  # reserve() уже проверил под блокировкой
+    loaded = None if booking.pk is None else loaded_values(booking)
+    if loaded is None and booking.pk is not None:
+        # объект собран не из базы: прежнее состояние — строка в базе (её же возьмёт on_changed)
+        loaded = Booking.objects.filter(pk=booking.pk).values(*Booking.tracked_fields).first() or {}
+        booking._loaded_values = loaded
+    old = booking_key(loaded) if loaded else None
+    new = booking_key(booking.__dict__)
+    if new is None or old == new:
+        return
+
+    with transaction.atomic():
+        route = UgurRoute.objects.select_for_update().get(pk=new[0])
+        tree = load_tree(route)
+        if old is not None and old[0] == route.pk:
+            tree.add(*span(tree, old[1], old[2]), -old[3])
+        _check(route, tree, *span(tree, new[1], new[2]), new[3])
+        if old is not None and old[0] == route.pk:
+            tree.add(*span(tree, old[1], old[2]), old[3])
+    booking._seat_route = (route, tree)
+
+
+def on_changed(booking, created=False, deleted=False):
+    loaded = None if created else loaded_values(booking)
+    if loaded is None and not created:
+        # удаление объекта, собранного не из базы: прежнее состояние неизвестно — строим дерево заново
+        booking.__dict__.pop('_seat_route', None)
+        rebuild(UgurRoute(pk=booking.route_id))
+        return
+    old = None if loaded is None else booking_key(loaded)
+    new = None if deleted else booking_key(booking.__dict__)
+    if old == new:
+        return
+
+    _apply(old, new, booking.__dict__.pop('_seat_route', None))
+
+
+@transaction.atomic
+def _apply(old, new, cached):
+    for route_id in sorted({key[0] for key in (old, new) if key is not None}):
+        if cached is not None and cached[0].pk == route_id:
+            route, tree = cached
+        else:
+            route = UgurRoute.objects.select_for_update().get(pk=route_id)
+            tree = load_tree(route)
+        for key, sign in ((old, -1), (new, 1)):
+            if key is not None and key[0] == route_id:
+                lo, hi = span(tree, key[1], key[2])
+                tree.add(lo, hi, sign * key[3])
+        _save(route, tree)
+
+
+def rebuild(route):
+    """Agajy ugruň işjeň bronlaryndan gaýtadan gurýar."""
+    with transaction.atomic():
+        route = UgurRoute.objects.select_for_update().get(pk=route.pk)
+        tree = SeatTree(RouteStop.objects.filter(route=route).count() + 1)
+        rows = (
+            route.bookings.filter(status__in=HOLDING_STATUSES)
+            .values_list('from_stop', 'to_stop').annotate(seats=Sum('seats_booked')).order_by()
+        )
+        for from_stop, to_stop, seats in rows:
+            lo, hi = span(tree, from_stop, to_stop)
+            tree.add(lo, hi, seats)
+        _save(route, tree)
+    return tree
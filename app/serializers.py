@@ -7,14 +7,18 @@ from typing import Optional, Dict
 from .models import (
     User, DriverProfile, PassengerProfile,
     Place, Ugur, UgurRoute, Booking,
-    Review, Load, DriverNotification,CurrentPlace
+    Review, Load, DriverNotification,CurrentPlace,
+    DepartureBoardRow, ArchivedUgur, ArchivedUgurRoute, ArchivedBooking, ArchivedLoad,
+    UgurSchedule, CorridorPriceStats, DriverDailyStats, Match
 )
+from . import auth, seats
 
 User = get_user_model()
 
 # ========================== Köne sargytlaryň importy ==========================
 from django.db import transaction
-from datetime import datetime
+from datetime import datetime, timedelta
+from django.utils import timezone
 
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.auth import authenticate
@@ -46,9 +50,8 @@ class PhoneTokenObtainPairSerializer(TokenObtainPairSerializer):
         if role == 'passenger' and not user.is_passenger:
             raise serializers.ValidationError('Ulanyjy ýolagçy däl')
 
-        # 🔹 создаём JWT вручную
-        refresh = RefreshToken.for_user(user)
-        access = str(refresh.access_token)
+        # 🔹 создаём JWT вручную, с ролями и профилями в claims
+        refresh, access = auth.tokens_for(user)
 
         # 🔹 формируем ответ
         return {
@@ -59,10 +62,15 @@ class PhoneTokenObtainPairSerializer(TokenObtainPairSerializer):
                 'is_passenger': user.is_passenger,
             },
             'role': role,
-            'token': access,
+            'token': str(access),
             'refresh': str(refresh)
         }
 
+class RoleTokenRefreshSerializer(TokenRefreshSerializer):
+    # новый access получает актуальные роли из БД
+    token_class = auth.RoleRefreshToken
+
+
 class ChangeRoleSerializer(serializers.Serializer):
     role = serializers.ChoiceField(choices=['driver', 'passenger'])
 
@@ -117,7 +125,9 @@ class RegisterSerializer(serializers.ModelSerializer):
             })
         return attrs
 
+    @transaction.atomic
     def create(self, validated_data):
+        # ulanyjy we profil bir tranzaksiýada: ýarym hasaba alnan ulanyjy galmaýar
         driver_data = validated_data.pop('driver_profile', None)
         password = validated_data.pop('password')
         role = validated_data.pop('role')
@@ -128,11 +138,11 @@ class RegisterSerializer(serializers.ModelSerializer):
         user = User.objects.create_user(password=password, **validated_data)
 
         if user.is_driver and driver_data:
+            # create(user=user) кладёт профиль в кеш user.driver_profile — ответ без запроса
             DriverProfile.objects.create(user=user, **driver_data)
 
         if user.is_passenger:
             PassengerProfile.objects.create(user=user)
-            print('### Created passenger profile for user:', user.phone)
 
         return user
 
@@ -301,7 +311,8 @@ class UgurRouteSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = UgurRoute
-        fields = '__all__'
+        # seat_tree — внутреннее состояние мест (app/seats.py), свободные места отдаёт /stops/
+        exclude = ['seat_tree']
         read_only_fields = ['ugur']
 
 
@@ -316,12 +327,32 @@ class BookingSerializer(serializers.ModelSerializer):
     #     write_only=True
     # )
     route = UgurRouteSerializer(read_only=True)
+    route_id = serializers.PrimaryKeyRelatedField(
+        queryset=UgurRoute.objects.all(), source='route', write_only=True
+    )
     status_display = serializers.CharField(source='get_status_display', read_only=True)
 
     class Meta:
         model = Booking
         fields = '__all__'
-        read_only_fields = ['created_at', 'status']
+        read_only_fields = ['created_at', 'status', 'from_stop', 'to_stop']
+
+    def update(self, instance, validated_data):
+        # бронь не переносится на другой маршрут
+        validated_data.pop('route', None)
+        return super().update(instance, validated_data)
+
+
+class RouteStopsSerializer(serializers.Serializer):
+    """Ugruň aralyk duralgalary (şäherleriň id-leri, tertip bilen)."""
+    stops = serializers.ListField(child=serializers.IntegerField(min_value=1), max_length=seats.MAX_STOPS)
+
+
+class RouteBookRequestSerializer(serializers.Serializer):
+    """Ugruň bir bölegini bronlamak; from_place / to_place berilmese — ugruň başy / soňy."""
+    from_place = serializers.IntegerField(required=False)
+    to_place = serializers.IntegerField(required=False)
+    seats_booked = serializers.IntegerField(min_value=1, default=1)
 
 
 # ===================================================================
@@ -342,38 +373,160 @@ class UgurListSerializer(serializers.ModelSerializer):
             'main_route', 'route_count'
         ]
 
+class RouteBookingSerializer(serializers.ModelSerializer):
+    """Ugur-yň içindäki bron: route eýýäm ýokarda bar, şonuň üçin gaýtadan açylmaýar."""
+    passenger = UserSerializer(read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+
+    class Meta:
+        model = Booking
+        fields = [
+            'id', 'route', 'passenger', 'seats_booked', 'from_stop', 'to_stop', 'status', 'status_display',
+            'created_at',
+        ]
+
+
+class UgurDetailRouteSerializer(UgurRouteSerializer):
+    """Ugur-yň içindäki ugur: ugur-y gaýtadan açmaýar, bronlary prefetch-den alýar."""
+    ugur = None
+    bookings = RouteBookingSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = UgurRoute
+        exclude = ['ugur', 'seat_tree']
+
+
 class UgurDetailSerializer(serializers.ModelSerializer):
     """Syýahat barada doly maglumat"""
     owner = UserSerializer(read_only=True)
     driver = UserSerializer(read_only=True)
     driver_profile = DriverProfileSerializer(source='driver.driver_profile', read_only=True)
-    routes = UgurRouteSerializer(many=True, read_only=True)
-    bookings = BookingSerializer(many=True, read_only=True)
+    routes = UgurDetailRouteSerializer(many=True, read_only=True)
+    bookings = serializers.SerializerMethodField()
     type_display = serializers.CharField(source='get_type_display', read_only=True)
 
     class Meta:
         model = Ugur
         fields = '__all__'
 
+    def get_bookings(self, obj) -> list:
+        # все брони поездки — из уже загруженных маршрутов, без отдельного запроса
+        bookings = [booking for route in obj.routes.all() for booking in route.bookings.all()]
+        return RouteBookingSerializer(bookings, many=True).data
+
+class PlaceIdField(serializers.IntegerField):
+    """Şäher id-si: barlagy resolve_route_places edýär, PrimaryKeyRelatedField ýaly her gezek sorag ibermeýär."""
+
+    def to_representation(self, value):
+        return value.pk if isinstance(value, Place) else super().to_representation(value)
+
+
+class UgurRouteWriteSerializer(serializers.ModelSerializer):
+    """Ugur döredilende: şäherler id bilen gelýär, hemmesi bir sorag bilen barlanýar."""
+    from_place = PlaceIdField()
+    to_place = PlaceIdField()
+
+    class Meta:
+        model = UgurRoute
+        fields = [
+            'from_place', 'to_place', 'departure_date', 'departure_time',
+            'available_seats', 'price_per_seat',
+        ]
+
+    def validate(self, attrs):
+        if attrs['from_place'] == attrs['to_place']:
+            raise serializers.ValidationError("from_place we to_place deň bolup bilmez.")
+        return attrs
+
+
+def resolve_route_places(trips):
+    """Ähli syýahatlaryň ugurlaryndaky şäher id-lerini bir sorag bilen Place obýektlerine çalyşýar."""
+    ids = {route[key] for trip in trips for route in trip['routes'] for key in ('from_place', 'to_place')}
+    places = Place.objects.in_bulk(ids)
+    missing = sorted(ids - places.keys())
+    if missing:
+        raise serializers.ValidationError({'routes': f"Şäher tapylmady: {missing}"})
+    for trip in trips:
+        for route in trip['routes']:
+            route['from_place'] = places[route['from_place']]
+            route['to_place'] = places[route['to_place']]
+
+
+def first_route(routes):
+    return min(routes, key=lambda route: (route['departure_date'], route.get('departure_time') or datetime.min.time()))
+
+
+@transaction.atomic
+def create_trips(trips):
+    """
+    Syýahatlary ugurlary bilen bilelikde döredýär: bir INSERT ugurlar üçin,
+    bir INSERT ugurlaryň ählisi üçin. Ugur.title şu ýerde bir gezek hasaplanýar.
+    """
+    from .signals import after_bulk_routes
+
+    ugurs = []
+    for trip in trips:
+        owner = trip['owner']
+        title = trip.get('title')
+        if not title:
+            route = first_route(trip['routes'])
+            title = f"{route['from_place']} → {route['to_place']}"
+        ugurs.append(Ugur(
+            owner=owner,
+            driver=owner if trip.get('type', Ugur.Type.DRIVER) == Ugur.Type.DRIVER else None,
+            type=trip.get('type', Ugur.Type.DRIVER),
+            title=title,
+        ))
+    # post_save ugur-а здесь не нужен: board_on_ugur_save пересобирает строки табло его маршрутов
+    # (их ещё нет — это делает after_bulk_routes), matching_on_ugur_save лишь снимает пары закрытых
+    # поездок (новые активны), updated_at ставит сам bulk_create (auto_now)
+    Ugur.objects.bulk_create(ugurs)
+    for ugur in ugurs:
+        ugur.remember_values()
+
+    routes = [
+        UgurRoute(ugur=ugur, **route_data)
+        for ugur, trip in zip(ugurs, trips)
+        for route_data in trip['routes']
+    ]
+    UgurRoute.objects.bulk_create(routes)
+    for route in routes:
+        # как после save(): следующее сохранение сравнивает с этими значениями
+        route.remember_values()
+    # bulk_create не шлёт сигналы — производные данные обновляем явно
+    after_bulk_routes(routes)
+    return ugurs
+
+
+class UgurBulkCreateSerializer(serializers.ListSerializer):
+    def validate(self, attrs):
+        resolve_route_places(attrs)
+        return attrs
+
+    def create(self, validated_data):
+        return create_trips(validated_data)
+
+
 class UgurCreateSerializer(serializers.ModelSerializer):
     """Syýahat döretmek üçin (sürüjilere)"""
-    routes = UgurRouteSerializer(many=True)
+    routes = UgurRouteWriteSerializer(many=True, allow_empty=False)
 
     class Meta:
         model = Ugur
-        fields = ['type', 'title', 'routes']
+        fields = ['id', 'type', 'title', 'routes']
+        read_only_fields = ['id']
+        list_serializer_class = UgurBulkCreateSerializer
 
-    def create(self, validated_data):
-        routes_data = validated_data.pop('routes')
-        ugur = Ugur.objects.create(owner=self.context['request'].user, **validated_data)
-        if ugur.type == Ugur.Type.DRIVER:
-            ugur.driver = self.context['request'].user
-            ugur.save()
+    def validate(self, attrs):
+        # в bulk-режиме места разрешает UgurBulkCreateSerializer сразу для всех поездок
+        if not isinstance(self.parent, serializers.ListSerializer):
+            resolve_route_places([attrs])
+        return attrs
 
-        for route_data in routes_data:
-            UgurRoute.objects.create(ugur=ugur, **route_data)
+    def create(self, validated_data):
+        validated_data.setdefault('owner', self.context['request'].user)
+        return create_trips([validated_data])[0]
 
-        return ugur
 
 
 # ===================================================================
@@ -392,8 +545,8 @@ class ReviewSerializer(serializers.ModelSerializer):
 # 9. Kargolar
 # ===================================================================
 class LoadSerializer(serializers.ModelSerializer):
-    from_place = serializers.SerializerMethodField()
-    to_place = serializers.SerializerMethodField()
+    from_place = PlaceSerializer(read_only=True)
+    to_place = PlaceSerializer(read_only=True)
     sender = UserSerializer(read_only=True)
     ugur = UgurListSerializer(read_only=True)
     route = UgurRouteSerializer(read_only=True)
@@ -404,14 +557,6 @@ class LoadSerializer(serializers.ModelSerializer):
         fields = '__all__'  
         read_only_fields = ['sender', 'status', 'created', 'updated']
 
-    def get_from_place(self, obj) -> Optional[dict]:
-        place = obj.from_place
-        return PlaceSerializer(place).data if place else None
-
-    def get_to_place(self, obj) -> Optional[dict]:
-        place = obj.to_place
-        return PlaceSerializer(place).data if place else None
-
 # ===================================================================
 # 10. Sürüji üçin bildiriş
 # ===================================================================
@@ -423,4 +568,313 @@ class DriverNotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = DriverNotification
         fields = '__all__'
-        read_only_fields = ['created', 'is_seen']
\ No newline at end of file
+        read_only_fields = ['created', 'is_seen']
+
+
+class NotificationIdsSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=1000)
+
+# ===================================================================
+# 11. Ugraýyş tablosy
+# ===================================================================
+class DepartureBoardQuerySerializer(serializers.Serializer):
+    from_place = serializers.IntegerField()
+    to_place = serializers.IntegerField()
+    date = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if attrs.get('date') and attrs.get('date_to') and attrs['date_to'] < attrs['date']:
+            raise serializers.ValidationError({'date_to': 'date_to date-den öň bolup bilmez.'})
+        return attrs
+
+
+class DepartureBoardRowSerializer(serializers.ModelSerializer):
+    route = serializers.IntegerField(source='route_id', read_only=True)
+    ugur = serializers.IntegerField(source='ugur_id', read_only=True)
+    schedule = serializers.SerializerMethodField()
+    from_place = serializers.IntegerField(source='from_place_id', read_only=True)
+    to_place = serializers.IntegerField(source='to_place_id', read_only=True)
+
+    class Meta:
+        model = DepartureBoardRow
+        fields = [
+            'route', 'ugur', 'schedule', 'from_place', 'to_place',
+            'departure_date', 'departure_time', 'seats_left', 'price_per_seat',
+            'driver_name', 'car',
+        ]
+
+    def get_schedule(self, obj) -> Optional[int]:
+        # tablodaky setirler hemişe anyk ugur; tertip günleri ScheduleOccurrenceSerializer-den gelýär
+        return None
+
+
+class ScheduleOccurrenceSerializer(serializers.Serializer):
+    """Tertipden açylan (entek UgurRoute bolmadyk) gün — tablonyň setiri ýaly görnüşde."""
+    route = serializers.IntegerField(allow_null=True)
+    ugur = serializers.IntegerField(allow_null=True)
+    schedule = serializers.IntegerField()
+    from_place = serializers.IntegerField()
+    to_place = serializers.IntegerField()
+    departure_date = serializers.DateField()
+    departure_time = serializers.TimeField()
+    seats_left = serializers.IntegerField()
+    price_per_seat = serializers.DecimalField(max_digits=8, decimal_places=2, allow_null=True)
+    driver_name = serializers.CharField()
+    car = serializers.CharField()
+
+
+# ===================================================================
+# 12. Arhiw (diňe okamak üçin)
+# ===================================================================
+class ArchivedBookingSerializer(serializers.ModelSerializer):
+    passenger = UserSerializer(read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+
+    class Meta:
+        model = ArchivedBooking
+        fields = ['id', 'passenger', 'seats_booked', 'from_stop', 'to_stop', 'status', 'status_display', 'created_at']
+
+
+class ArchivedUgurRouteSerializer(serializers.ModelSerializer):
+    from_place = PlaceSerializer(read_only=True)
+    to_place = PlaceSerializer(read_only=True)
+    # aralyk duralgalaryň şäherleri (tertip bilen)
+    stops = serializers.SlugRelatedField(slug_field='place_id', many=True, read_only=True)
+    bookings = ArchivedBookingSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = ArchivedUgurRoute
+        fields = [
+            'id', 'from_place', 'to_place', 'stops', 'departure_date', 'departure_time',
+            'available_seats', 'price_per_seat', 'bookings',
+        ]
+
+
+class ArchivedUgurSerializer(serializers.ModelSerializer):
+    owner = UserSerializer(read_only=True)
+    driver = UserSerializer(read_only=True)
+    routes = ArchivedUgurRouteSerializer(many=True, read_only=True)
+    type_display = serializers.CharField(source='get_type_display', read_only=True)
+
+    class Meta:
+        model = ArchivedUgur
+        fields = [
+            'id', 'owner', 'driver', 'type', 'type_display', 'title',
+            'created_at', 'is_completed', 'archived_at', 'routes',
+        ]
+
+
+class ArchivedLoadSerializer(serializers.ModelSerializer):
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+
+    class Meta:
+        model = ArchivedLoad
+        fields = '__all__'
+
+
+# ===================================================================
+# 13. Yzygiderli syýahat (tertip)
+# ===================================================================
+class WeekdaysField(serializers.ListField):
+    """Modelde "0,2,4" setiri, API-de [0, 2, 4] sanawy."""
+    child = serializers.IntegerField(min_value=0, max_value=6)
+
+    def to_representation(self, value):
+        return [int(day) for day in value.split(',')] if value else []
+
+
+class UgurScheduleSerializer(serializers.ModelSerializer):
+    weekdays = WeekdaysField(required=False, allow_empty=True)
+    exdates = serializers.ListField(child=serializers.DateField(), required=False, allow_empty=True)
+
+    class Meta:
+        model = UgurSchedule
+        fields = [
+            'id', 'from_place', 'to_place', 'departure_time', 'seats', 'price_per_seat',
+            'freq', 'interval', 'weekdays', 'start_date', 'end_date', 'exdates',
+            'is_active', 'created_at',
+        ]
+        read_only_fields = ['created_at']
+
+    def validate(self, attrs):
+        from_place = attrs.get('from_place', getattr(self.instance, 'from_place', None))
+        to_place = attrs.get('to_place', getattr(self.instance, 'to_place', None))
+        if from_place == to_place:
+            raise serializers.ValidationError("from_place we to_place deň bolup bilmez.")
+        start = attrs.get('start_date', getattr(self.instance, 'start_date', None))
+        end = attrs.get('end_date', getattr(self.instance, 'end_date', None))
+        if start and end and end < start:
+            raise serializers.ValidationError({'end_date': "end_date start_date-den öň bolup bilmez."})
+        # модель хранит дни недели строкой "0,2,4", исключения — ISO-датами в JSON
+        if 'weekdays' in attrs:
+            attrs['weekdays'] = ','.join(str(day) for day in sorted(set(attrs['weekdays'])))
+        if 'exdates' in attrs:
+            attrs['exdates'] = sorted({day.isoformat() for day in attrs['exdates']})
+        return attrs
+
+
+class ScheduleBookingSerializer(serializers.Serializer):
+    date = serializers.DateField()
+    seats_booked = serializers.IntegerField(min_value=1, default=1)
+
+    def validate_date(self, value):
+        schedule = self.context['schedule']
+        now = timezone.localtime()
+        if not schedule.is_active:
+            raise serializers.ValidationError("Tertip işjeň däl.")
+        if value < now.date() or (value == now.date() and schedule.departure_time <= now.time()):
+            raise serializers.ValidationError("Geçen güni bronlap bolmaýar.")
+        if value < schedule.start_date or (schedule.end_date and value > schedule.end_date):
+            raise serializers.ValidationError("Sene tertibiň başlaýan we gutarýan senesiniň arasynda bolmaly.")
+        if not schedule.occurs_on(value):
+            raise serializers.ValidationError("Bu gün tertipde ýok.")
+        return value
+
+
+# ===================================================================
+# 14. GPS nokatlary
+# ===================================================================
+class LocationPointSerializer(serializers.Serializer):
+    latitude = serializers.FloatField(min_value=-90, max_value=90)
+    longitude = serializers.FloatField(min_value=-180, max_value=180)
+    speed = serializers.FloatField(min_value=0, required=False, allow_null=True)
+    heading = serializers.FloatField(min_value=0, max_value=360, required=False, allow_null=True)
+    recorded_at = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        now = timezone.now()
+        attrs.setdefault('recorded_at', now)
+        # часы телефона могут спешить — точку «из будущего» не принимаем
+        if attrs['recorded_at'] > now + timedelta(minutes=1):
+            raise serializers.ValidationError({'recorded_at': "Geljekdäki wagt bolup bilmez."})
+        return attrs
+
+
+class LocationBatchSerializer(serializers.Serializer):
+    MAX_POINTS = 500
+
+    points = LocationPointSerializer(many=True, allow_empty=False, max_length=MAX_POINTS)
+
+
+class LastKnownPositionSerializer(serializers.Serializer):
+    latitude = serializers.FloatField()
+    longitude = serializers.FloatField()
+    speed = serializers.FloatField(allow_null=True)
+    heading = serializers.FloatField(allow_null=True)
+    recorded_at = serializers.DateTimeField()
+
+
+# ===================================================================
+# 15. Bahalaryň statistikasy
+# ===================================================================
+class PriceStatsQuerySerializer(serializers.Serializer):
+    from_place = serializers.IntegerField()
+    to_place = serializers.IntegerField()
+    kind = serializers.ChoiceField(choices=CorridorPriceStats.Kind.choices, required=False)
+    weeks = serializers.IntegerField(min_value=1, max_value=104, default=12)
+
+
+# ===================================================================
+# 16. Sürüjiniň günlik jemleri
+# ===================================================================
+class DriverStatsQuerySerializer(serializers.Serializer):
+    MAX_DAYS = 366
+
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        attrs.setdefault('date_to', timezone.localdate())
+        attrs.setdefault('date_from', attrs['date_to'] - timedelta(days=29))
+        if attrs['date_to'] < attrs['date_from']:
+            raise serializers.ValidationError({'date_to': 'date_to date_from-dan öň bolup bilmez.'})
+        if (attrs['date_to'] - attrs['date_from']).days >= self.MAX_DAYS:
+            raise serializers.ValidationError(f"Aralyk {self.MAX_DAYS} günden uzyn bolup bilmez.")
+        return attrs
+
+
+class DriverDailyStatsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DriverDailyStats
+        fields = ['day', 'trips', 'seats_sold', 'revenue', 'loads_delivered']
+
+
+# ===================================================================
+# 17. Paket soraglar (/api/batch/)
+# ===================================================================
+class BatchItemSerializer(serializers.Serializer):
+    id = serializers.CharField(required=False, max_length=50)
+    method = serializers.ChoiceField(choices=['GET', 'HEAD', 'OPTIONS', 'POST', 'PUT', 'PATCH', 'DELETE'])
+    path = serializers.CharField(max_length=2000)
+    body = serializers.JSONField(required=False, allow_null=True)
+    headers = serializers.DictField(child=serializers.CharField(max_length=500), required=False)
+
+    def validate_path(self, value):
+        if not value.startswith('/api/'):
+            raise serializers.ValidationError("Ýol /api/ bilen başlamaly.")
+        return value
+
+
+class BatchSerializer(serializers.Serializer):
+    MAX_REQUESTS = 20
+
+    requests = BatchItemSerializer(many=True, allow_empty=False, max_length=MAX_REQUESTS)
+
+
+# ===================================================================
+# 18. Delta sinhronlama (/api/sync/)
+# ===================================================================
+class SyncUgurSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Ugur
+        fields = ['id', 'owner', 'driver', 'type', 'title', 'created_at', 'updated_at', 'is_active', 'is_completed']
+
+
+class SyncUgurRouteSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UgurRoute
+        exclude = ['seat_tree']
+
+
+class SyncBookingSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Booking
+        fields = '__all__'
+
+
+class SyncLoadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Load
+        fields = '__all__'
+
+
+class SyncNotificationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DriverNotification
+        fields = '__all__'
+
+
+class SyncQuerySerializer(serializers.Serializer):
+    since = serializers.CharField(required=False, allow_blank=True, max_length=1000)
+
+
+# ===================================================================
+# 19. Ýolagçy islegi ↔ sürüji hödüri
+# ===================================================================
+class MatchRouteSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UgurRoute
+        fields = [
+            'id', 'ugur', 'from_place', 'to_place', 'departure_date', 'departure_time',
+            'available_seats', 'price_per_seat',
+        ]
+
+
+class MatchSerializer(serializers.ModelSerializer):
+    offer = MatchRouteSerializer(read_only=True)
+    request = MatchRouteSerializer(read_only=True)
+
+    class Meta:
+        model = Match
+        fields = ['id', 'offer', 'request', 'driver', 'passenger', 'score', 'created_at']
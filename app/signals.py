@@ -0,0 +1,256 @@
+from django.db.models import Q, QuerySet
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import auth, board, counters, driver_stats, events, matching, price_stats, seats, sync
+from .models import (
+    Ugur, UgurRoute, Booking, DriverProfile, PassengerProfile, User, DriverNotification, Load, loaded_values,
+)
+
+
+def is_cascade(sender, origin):
+    """post_delete каскадом от родителя: родитель уже удаляется, пересчитывать нечего."""
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is not sender
+
+
+def after_bulk_routes(routes):
+    """bulk_create сигналов не шлёт: те же производные данные, что и post_save маршрута."""
+    board.refresh_routes([route.pk for route in routes])
+    for route in routes:
+        price_stats.on_saved(route, created=True)
+    # после табло: предложения водителей ищутся по нему
+    matching.match_routes(routes)
+
+
+# ===================================================================
+# Täzelenen wagty ene-atalara geçirmek (ETag / Last-Modified üçin)
+# ===================================================================
+@receiver(post_save, sender=UgurRoute)
+@receiver(post_delete, sender=UgurRoute)
+def touch_ugur_on_route_change(sender, instance, **kwargs):
+    # список ugur-ов сериализует маршруты, поэтому их изменение меняет и ugur
+    Ugur.objects.filter(pk=instance.ugur_id).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def touch_route_on_booking_change(sender, instance, **kwargs):
+    now = timezone.now()
+    UgurRoute.objects.filter(pk=instance.route_id).update(updated_at=now)
+    Ugur.objects.filter(routes=instance.route_id).update(updated_at=now)
+
+
+# ===================================================================
+# Bölekler boýunça orunlar (UgurRoute.seat_tree)
+# tablodan öň: tablo boş orunlary agaçdan okaýar
+# ===================================================================
+@receiver(pre_save, sender=Booking)
+def seats_guard(sender, instance, **kwargs):
+    seats.guard(instance)
+
+
+@receiver(post_save, sender=Booking)
+def seats_on_booking_save(sender, instance, created, **kwargs):
+    seats.on_changed(instance, created=created)
+
+
+@receiver(post_delete, sender=Booking)
+def seats_on_booking_delete(sender, instance, origin=None, **kwargs):
+    # каскад от маршрута — дерево удаляется вместе с ним
+    if origin is not None and is_cascade(sender, origin):
+        return
+    seats.on_changed(instance, deleted=True)
+
+
+# ===================================================================
+# Ugraýyş tablosy
+# ===================================================================
+@receiver(post_save, sender=UgurRoute)
+def board_on_route_save(sender, instance, **kwargs):
+    board.refresh_routes([instance.pk])
+
+
+@receiver(post_save, sender=Ugur)
+def board_on_ugur_save(sender, instance, **kwargs):
+    board.refresh_ugur(instance.pk)
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def board_on_booking_change(sender, instance, origin=None, **kwargs):
+    if origin is not None and is_cascade(sender, origin):
+        return
+    board.refresh_routes([instance.route_id])
+
+
+@receiver(post_delete, sender=UgurRoute)
+def board_on_route_delete(sender, instance, **kwargs):
+    # строка табло удаляется каскадом, подписчикам сообщаем отдельно
+    events.route_deleted(instance)
+
+
+@receiver(post_save, sender=DriverProfile)
+def board_on_driver_profile_save(sender, instance, **kwargs):
+    board.refresh_driver(instance.user_id, profile=instance)
+
+
+@receiver(post_save, sender=User)
+def board_on_user_save(sender, instance, created, update_fields=None, **kwargs):
+    # last_login и прочие служебные поля табло не касаются
+    if created or not instance.is_driver:
+        return
+    if update_fields and not {'first_name', 'last_name', 'phone'} & set(update_fields):
+        return
+    board.refresh_driver(instance.pk)
+
+
+# ===================================================================
+# Okalmadyk bildirişleriň sanawy (keş)
+# ===================================================================
+@receiver(post_save, sender=DriverNotification)
+def unread_on_notification_save(sender, instance, created, **kwargs):
+    if created:
+        if not instance.is_seen:
+            counters.adjust_unread(instance.driver_id, 1)
+        return
+    previous = loaded_values(instance)
+    if previous is None or previous.get('driver_id') != instance.driver_id:
+        # прежнее состояние неизвестно или уведомление сменило водителя — пересчитываем
+        counters.reset_unread(instance.driver_id)
+        if previous is not None:
+            counters.reset_unread(previous.get('driver_id'))
+    elif previous.get('is_seen') != instance.is_seen:
+        counters.adjust_unread(instance.driver_id, -1 if instance.is_seen else 1)
+
+
+@receiver(post_delete, sender=DriverNotification)
+def unread_on_notification_delete(sender, instance, **kwargs):
+    # в счётчике учтено записанное в базу значение, а не изменённое в памяти
+    previous = loaded_values(instance) or {}
+    if not previous.get('is_seen', instance.is_seen):
+        counters.adjust_unread(previous.get('driver_id', instance.driver_id), -1)
+
+
+# ===================================================================
+# Ýükleriň from/to-sy (Load.from_place / Load.to_place)
+# ===================================================================
+# места грузов зависят от мест маршрута и его порядка в ugur-е
+ROUTE_PLACE_FIELDS = ('ugur_id', 'from_place_id', 'to_place_id', 'departure_date', 'departure_time')
+
+
+@receiver(post_save, sender=UgurRoute)
+def load_places_on_route_save(sender, instance, created, **kwargs):
+    if not created and not instance.has_changed(*ROUTE_PLACE_FIELDS):
+        return
+    attached = Load.objects.filter(Q(ugur_id=instance.ugur_id) | Q(route_id=instance.pk))
+    before = price_stats.load_keys(attached)
+    changed = Load.sync_places(instance.ugur_id, route_id=instance.pk)
+    # sync_places пишет через update(): статистику цен грузов пересчитываем здесь
+    if before and changed:
+        after = price_stats.load_keys(attached)
+        if after != before:
+            for key in before | after:
+                price_stats.recompute(key)
+
+
+@receiver(post_delete, sender=UgurRoute)
+def load_places_on_route_delete(sender, instance, origin=None, **kwargs):
+    if origin is not None and is_cascade(sender, origin):
+        return
+    Load.sync_places(instance.ugur_id)
+
+
+# ===================================================================
+# Bahalaryň statistikasy (CorridorPriceStats)
+# ===================================================================
+@receiver(post_save, sender=UgurRoute)
+@receiver(post_save, sender=Load)
+def price_stats_on_save(sender, instance, created, **kwargs):
+    price_stats.on_saved(instance, created)
+
+
+@receiver(post_delete, sender=UgurRoute)
+@receiver(post_delete, sender=Load)
+def price_stats_on_delete(sender, instance, origin=None, **kwargs):
+    # каскад от Ugur (в т.ч. архивация) — история цен сохраняется
+    if origin is not None and is_cascade(sender, origin):
+        return
+    price_stats.on_deleted(instance)
+
+
+# ===================================================================
+# Sürüjiniň günlik jemleri (DriverDailyStats)
+# ===================================================================
+@receiver(post_save, sender=Booking)
+@receiver(post_save, sender=Load)
+@receiver(post_save, sender=UgurRoute)
+def driver_stats_on_save(sender, instance, created, **kwargs):
+    driver_stats.on_changed(instance, created=created)
+
+
+@receiver(pre_save, sender=Ugur)
+def driver_stats_before_ugur_save(sender, instance, **kwargs):
+    driver_stats.remember_driver(instance)
+
+
+@receiver(post_save, sender=Ugur)
+def driver_stats_on_ugur_save(sender, instance, created, **kwargs):
+    # водителя может переназначить админ: считанное уходит от прежнего к новому
+    driver_stats.on_ugur_changed(instance, created)
+
+
+@receiver(post_delete, sender=Booking)
+@receiver(post_delete, sender=Load)
+@receiver(post_delete, sender=UgurRoute)
+def driver_stats_on_delete(sender, instance, origin=None, **kwargs):
+    # каскад от Ugur (в т.ч. архивация) — история сохраняется
+    if origin is not None and is_cascade(sender, origin):
+        return
+    driver_stats.on_changed(instance, deleted=True)
+
+
+# ===================================================================
+# Pozulanlaryň yzy (/api/sync/)
+# ===================================================================
+@receiver(post_delete, sender=Ugur)
+@receiver(post_delete, sender=UgurRoute)
+@receiver(post_delete, sender=Booking)
+@receiver(post_delete, sender=Load)
+@receiver(post_delete, sender=DriverNotification)
+def sync_tombstone_on_delete(sender, instance, **kwargs):
+    # и каскадные удаления тоже: клиент должен убрать маршруты удалённого ugur-а
+    sync.record_deletion(instance)
+
+
+# ===================================================================
+# JWT rol talaplary: rol ýa-da profil üýtgände köne tokenler ýatyrylýar
+# ===================================================================
+@receiver(post_save, sender=User)
+def auth_on_user_save(sender, instance, created, **kwargs):
+    auth.on_user_saved(instance, created)
+
+
+@receiver(post_save, sender=DriverProfile)
+@receiver(post_save, sender=PassengerProfile)
+@receiver(post_delete, sender=DriverProfile)
+@receiver(post_delete, sender=PassengerProfile)
+def auth_on_profile_change(sender, instance, created=True, **kwargs):
+    # id профиля в claims меняется только при создании и удалении
+    if created:
+        auth.revoke_tokens(instance.user_id)
+
+
+# ===================================================================
+# Ýolagçy islegi ↔ sürüji hödüri (Match)
+# tablodan soň: isleg hödürleri tablodan okaýar
+# ===================================================================
+@receiver(post_save, sender=UgurRoute)
+def matching_on_route_save(sender, instance, created, **kwargs):
+    matching.on_route_saved(instance, created)
+
+
+@receiver(post_save, sender=Ugur)
+def matching_on_ugur_save(sender, instance, **kwargs):
+    matching.on_ugur_saved(instance)
@@ -0,0 +1,186 @@
+"""
+/api/sync/: müşderiniň ýerli keşi üçin diňe üýtgänler (delta).
+
+Her akym (ugurs, routes, bookings, loads, notifications) öz täzelenen wagty
+sütüni boýunça (updated_at, pk) kursory bilen okalýar; pozulanlar
+SyncTombstone tablisasyndan gelýär. Token — şu kursorlaryň base64 JSON-y.
+
+Pozulanlaryň yzy hem akymlar ýaly çäklendirilýär: umumy akymlaryňky
+(ugurs, routes) hemmä görünýär, galanlary bolsa diňe pozulan ýazgynyň
+gatnaşyjylaryna (ýolagçy, sürüji, iberiji) ýazylýar.
+
+Gijä galyp tassyklanan tranzaksiýalar ýitmez ýaly, soňky sahypadan soň
+kursor `başlanan wagt − OVERLAP` bilen goýulýar: käbir setirler gaýtadan
+gelip biler, müşderi olary id boýunça täzeden ýazýar.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Booking, DriverNotification, Load, SyncTombstone, Ugur, UgurRoute
+
+PAGE_SIZE = 500
+OVERLAP = timedelta(seconds=5)
+TOMBSTONES = 'deleted'
+
+
+def _stream(model, field, scope=None, participants=None):
+    return {'model': model, 'field': field, 'scope': scope, 'participants': participants}
+
+
+def _route_driver(route_id):
+    return UgurRoute.objects.filter(pk=route_id).values_list('ugur__driver_id', flat=True).first()
+
+
+def _ugur_driver(ugur_id):
+    return Ugur.objects.filter(pk=ugur_id).values_list('driver_id', flat=True).first()
+
+
+# имя потока → модель, колонка времени, видимость для пользователя и её участники (для надгробий)
+STREAMS = {
+    'ugurs': _stream(Ugur, 'updated_at'),
+    'routes': _stream(UgurRoute, 'updated_at'),
+    'bookings': _stream(
+        Booking, 'updated_at',
+        lambda user: Q(passenger_id=user.id) | Q(route__ugur__driver_id=user.id),
+        lambda booking: {booking.passenger_id, _route_driver(booking.route_id)},
+    ),
+    'loads': _stream(
+        Load, 'updated',
+        lambda user: Q(sender_id=user.id) | Q(ugur__driver_id=user.id),
+        lambda load: {load.sender_id, _ugur_driver(load.ugur_id)},
+    ),
+    'notifications': _stream(
+        DriverNotification, 'updated_at',
+        lambda user: Q(driver_id=user.id),
+        lambda notification: {notification.driver_id},
+    ),
+}
+STREAM_OF_MODEL = {stream['model']: name for name, stream in STREAMS.items()}
+
+
+def tombstone_days():
+    return getattr(settings, 'UGUR_SYNC_TOMBSTONE_DAYS', 30)
+
+
+class InvalidToken(ValueError):
+    pass
+
+
+# ===================================================================
+# Token
+# ===================================================================
+def _to_micros(moment):
+    return int(moment.timestamp() * 1_000_000)
+
+
+def _from_micros(value):
+    return datetime.fromtimestamp(value / 1_000_000, tz=dt_timezone.utc)
+
+
+def encode_token(cursors):
+    raw = json.dumps({name: [_to_micros(ts), pk] for name, (ts, pk) in cursors.items()}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_token(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        data = json.loads(raw)
+        if not isinstance(data, dict) or not set(data) <= {*STREAMS, TOMBSTONES}:
+            raise InvalidToken("Nädogry sync token.")
+        cursors = {}
+        for name, cursor in data.items():
+            if not isinstance(cursor, list) or len(cursor) != 2:
+                raise InvalidToken("Nädogry sync token.")
+            ts, pk = cursor
+            cursors[name] = (_from_micros(ts), int(pk))
+        return cursors
+    # OverflowError / OSError — огромная метка времени
+    except (binascii.Error, ValueError, TypeError, AttributeError, OverflowError, OSError):
+        raise InvalidToken("Nädogry sync token.")
+
+
+# ===================================================================
+# Delta
+# ===================================================================
+def _page(queryset, field, cursor):
+    if cursor is not None:
+        ts, pk = cursor
+        queryset = queryset.filter(Q(**{f'{field}__gt': ts}) | Q(**{field: ts, 'pk__gt': pk}))
+    rows = list(queryset.order_by(field, 'pk')[:PAGE_SIZE + 1])
+    return rows[:PAGE_SIZE], len(rows) > PAGE_SIZE
+
+
+def _next_cursor(rows, field, more, cursor, caught_up):
+    if more:
+        last = rows[-1]
+        return getattr(last, field), last.pk
+    # догнали: откатываемся на OVERLAP, но курсор не идёт назад
+    if cursor is not None and cursor >= caught_up:
+        return cursor
+    return caught_up
+
+
+def changes(user, token=None):
+    """
+    Gaýtarýar: {'token', 'has_more', 'reset', 'changes': {akym: [obj]}, 'deleted': {akym: [id]}}.
+    Token ýok bolsa ýa-da pozulanlaryň yzy eýýäm arassalanan bolsa — doly sinhronlama (reset).
+    """
+    cursors = decode_token(token) if token else {}
+    caught_up = (timezone.now() - OVERLAP, 0)
+
+    reset = not cursors
+    tombstone_cursor = cursors.get(TOMBSTONES)
+    if tombstone_cursor is not None and tombstone_cursor[0] < timezone.now() - timedelta(days=tombstone_days()):
+        # надгробия старше срока уже удалены — дельта неполна, клиент начинает заново
+        reset, cursors = True, {}
+
+    result = {'changes': {}, 'deleted': {}, 'reset': reset, 'has_more': False}
+    new_cursors = {}
+    for name, stream in STREAMS.items():
+        queryset = stream['model'].objects.all()
+        if stream['scope'] is not None:
+            queryset = queryset.filter(stream['scope'](user))
+        rows, more = _page(queryset, stream['field'], cursors.get(name))
+        result['changes'][name] = rows
+        result['has_more'] |= more
+        new_cursors[name] = _next_cursor(rows, stream['field'], more, cursors.get(name), caught_up)
+
+    if reset:
+        # при полной синхронизации удалять у клиента нечего
+        new_cursors[TOMBSTONES] = caught_up
+    else:
+        visible = SyncTombstone.objects.filter(Q(user__isnull=True) | Q(user_id=user.id))
+        tombstones, more = _page(visible, 'deleted_at', cursors.get(TOMBSTONES))
+        for tombstone in tombstones:
+            result['deleted'].setdefault(tombstone.model, []).append(tombstone.object_id)
+        result['has_more'] |= more
+        new_cursors[TOMBSTONES] = _next_cursor(
+            tombstones, 'deleted_at', more, cursors.get(TOMBSTONES), caught_up,
+        )
+
+    result['token'] = encode_token(new_cursors)
+    return result
+
+
+def tombstones(name, object_id, user_ids=()):
+    """Bir pozulan obýektiň yzlary: her gatnaşyja biri; gatnaşyjysyz akymda — umumy."""
+    if STREAMS[name]['participants'] is None:
+        return [SyncTombstone(model=name, object_id=object_id)]
+    return [SyncTombstone(model=name, object_id=object_id, user_id=user_id) for user_id in user_ids if user_id is not None]
+
+
+def record_deletion(instance):
+    name = STREAM_OF_MODEL[type(instance)]
+    participants = STREAMS[name]['participants']
+    SyncTombstone.objects.bulk_create(tombstones(name, instance.pk, participants(instance) if participants else ()))
+
+
+def purge_tombstones(cutoff):
+    return SyncTombstone.objects.filter(deleted_at__lt=cutoff).delete()[0]
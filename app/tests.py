@@ -1,3 +1,1014 @@
-from django.test import TestCase
+import base64
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import unittest
+from collections import Counter
+from datetime import date, timedelta
+from importlib import import_module
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps as django_apps
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from . import (
+    archive, batch, board, checks, counters, docs, events, locations, matching, price_stats, replicas, sync, throttling,
+    views,
+)
+from .models import (
+    ArchivedBooking, Booking, CorridorPriceStats, DepartureBoardRow, DriverDailyStats, DriverNotification,
+    DriverProfile, LastKnownPosition, Load, LocationTrailPoint, Match, Place, SyncTombstone, Ugur, UgurRoute,
+    UgurSchedule, User,
+)
+
+
+# ===================================================================
+# EXPLAIN QUERY PLAN: esasy sanawlar doly tablisa skanyny etmeli däl
+# ===================================================================
+# "SCAN app_x" без "USING ... INDEX" — полный проход по таблице
+FULL_SCAN = re.compile(r'\bSCAN (\w+)(?! USING)\s*$')
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN diňe SQLite üçin")
+class QueryPlanTests(TestCase):
+    factory = APIRequestFactory()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(phone='+99361234567', password='x', is_driver=True)
+        cls.from_place = Place.objects.create(name='Aşgabat')
+        cls.to_place = Place.objects.create(name='Mary')
+        ugur = Ugur.objects.create(owner=cls.user, driver=cls.user, title='Aşgabat → Mary')
+        UgurRoute.objects.create(
+            ugur=ugur, from_place=cls.from_place, to_place=cls.to_place,
+            departure_date=date.today() + timedelta(days=1),
+        )
+
+    def main_queryset(self, viewset, params=None, action='list'):
+        view = viewset()
+        view.action = action
+        view.format_kwarg = None
+        view.args, view.kwargs = (), {}
+        view.request = Request(self.factory.get('/', params or {}))
+        view.request.user = self.user
+        return view.filter_queryset(view.get_queryset())
+
+    def assertNoFullScan(self, queryset):
+        plan = queryset.explain()
+        scans = [line for line in plan.splitlines() if FULL_SCAN.search(line)]
+        self.assertEqual(scans, [], f"Doly skan tapyldy:\n{plan}")
+
+    def test_ugur_list(self):
+        self.assertNoFullScan(self.main_queryset(views.UgurViewSet))
+
+    def test_route_search(self):
+        self.assertNoFullScan(self.main_queryset(views.UgurRouteViewSet, {
+            'from_place': self.from_place.pk,
+            'to_place': self.to_place.pk,
+            'departure_date': date.today().isoformat(),
+        }))
+
+    def test_bookings_of_user(self):
+        self.assertNoFullScan(self.main_queryset(views.BookingViewSet))
+
+    def test_loads_by_status(self):
+        self.assertNoFullScan(self.main_queryset(views.LoadViewSet, {'status': 'searching'}))
+
+    def test_driver_notifications(self):
+        self.assertNoFullScan(self.main_queryset(views.DriverNotificationViewSet))
+
+    def test_reviews_of_user(self):
+        self.assertNoFullScan(self.main_queryset(views.ReviewViewSet, {'to_user': self.user.pk}))
+
+    def test_departure_board(self):
+        view = views.DepartureBoardView()
+        view.request = Request(self.factory.get('/', {
+            'from_place': self.from_place.pk, 'to_place': self.to_place.pk,
+        }))
+        self.assertNoFullScan(view.get_queryset())
+
+
+# ===================================================================
+# Ugur jikme-jigi: soraglaryň sany ugur / bron sanyna bagly däl
+# ===================================================================
+class UgurDetailQueryTests(TestCase):
+    # ugur (с водителем, профилем и ETag-окном) + маршруты + брони
+    EXPECTED_QUERIES = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.driver = User.objects.create_user(phone='+99361234567', password='x', is_driver=True)
+        DriverProfile.objects.create(
+            user=cls.driver, marka='Toyota', model='Camry', car_number='AG1234BH', car_year=2015,
+        )
+        cls.from_place = Place.objects.create(name='Aşgabat')
+        cls.to_place = Place.objects.create(name='Mary')
+        cls.ugur = Ugur.objects.create(owner=cls.driver, driver=cls.driver, title='Aşgabat → Mary')
+
+    def add_route(self, bookings):
+        route = UgurRoute.objects.create(
+            ugur=self.ugur, from_place=self.from_place, to_place=self.to_place,
+            departure_date=date.today() + timedelta(days=1),
+        )
+        for _ in range(bookings):
+            passenger = User.objects.create_user(
+                phone=f'+9936{User.objects.count():07d}', password='x', is_passenger=True,
+            )
+            Booking.objects.create(route=route, passenger=passenger)
+
+    def get_detail(self):
+        with self.assertNumQueries(self.EXPECTED_QUERIES):
+            response = APIClient().get(f'/api/ugurs/{self.ugur.pk}/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_query_count_is_fixed(self):
+        self.add_route(bookings=1)
+        data = self.get_detail()
+        self.assertEqual(len(data['routes']), 1)
+
+        for _ in range(3):
+            self.add_route(bookings=2)
+        data = self.get_detail()
+        self.assertEqual(len(data['routes']), 4)
+        self.assertEqual(len(data['bookings']), 7)
+        self.assertEqual(data['driver_profile']['car_number'], 'AG1234BH')
+        self.assertNotIn('ugur', data['routes'][0])
+
+    def test_not_modified_is_one_query(self):
+        etag = APIClient().get(f'/api/ugurs/{self.ugur.pk}/')['ETag']
+        with self.assertNumQueries(1):
+            response = APIClient().get(f'/api/ugurs/{self.ugur.pk}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_related_change_changes_etag(self):
+        self.add_route(bookings=0)
+        etag = APIClient().get('/api/routes/')['ETag']
+        self.from_place.name = 'Aşgabat şäheri'
+        self.from_place.save()
+        self.assertNotEqual(APIClient().get('/api/routes/')['ETag'], etag)
+
+
+# ===================================================================
+# Giriş: hüjüm wagtynda PBKDF2 işi çäkli
+# ===================================================================
+@override_settings(
+    UGUR_THROTTLES={'login': {'ip': '3/min', 'phone': '2/min', 'global': '3/min'}},
+    UGUR_THROTTLE_STORES={'ip': 'cache', 'phone': 'cache', 'global': 'local'},
+)
+class LoginFloodTests(TestCase):
+    FLOOD = 500
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(phone='+99361234567', password='secret', is_driver=True)
+
+    def setUp(self):
+        cache.clear()
+        throttling.STORES['local'].clear()
+        self.client = APIClient()
+        # часы вёдер под контролем теста: результат не зависит от скорости машины
+        self.now = 1000.0
+        clock = mock.patch.object(throttling, 'time', mock.Mock(
+            monotonic=lambda: self.now, time=lambda: self.now,
+        ))
+        clock.start()
+        self.addCleanup(clock.stop)
+
+    def login(self, phone, ip):
+        return self.client.post(
+            '/api/auth/login/', {'phone': phone, 'password': 'wrong', 'role': 'driver'},
+            format='json', REMOTE_ADDR=ip,
+        )
+
+    def test_flood_is_rejected_before_hashing(self):
+        statuses = Counter()
+        with mock.patch.object(
+            PBKDF2PasswordHasher, 'encode', autospec=True, side_effect=PBKDF2PasswordHasher.encode,
+        ) as encode:
+            for i in range(self.FLOOD):
+                # много IP и телефонов: срабатывает глобальный лимит
+                response = self.login(f'+9936{i % 100:07d}', f'10.0.{i // 200}.{i % 200}')
+                statuses[response.status_code] += 1
+
+        self.assertEqual(encode.call_count, 3)
+        self.assertEqual(statuses[429], self.FLOOD - 3)
+
+    def test_phone_and_ip_limits(self):
+        statuses = [self.login(self.user.phone, f'10.1.0.{i}').status_code for i in range(3)]
+        self.assertEqual(statuses, [400, 400, 429])
+
+        self.assertEqual(self.login('+99365000001', '10.1.0.1').status_code, 400)
+        response = self.login('+99365000002', '10.1.0.1')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '20')
+
+        self.now += 20
+        self.assertEqual(self.login('+99365000002', '10.1.0.1').status_code, 400)
+
+    @override_settings(UGUR_THROTTLES={'login': {'ip': '2/min'}})
+    def test_forwarded_for_does_not_open_new_ip_bucket(self):
+        statuses = [
+            self.client.post(
+                '/api/auth/login/', {'phone': f'+99365{i:06d}', 'password': 'wrong', 'role': 'driver'},
+                format='json', REMOTE_ADDR='10.3.0.1', HTTP_X_FORWARDED_FOR=f'192.0.2.{i}',
+            ).status_code
+            for i in range(3)
+        ]
+        self.assertEqual(statuses, [400, 400, 429])
+
+    @override_settings(UGUR_THROTTLE_NUM_PROXIES=1)
+    def test_ip_is_taken_from_trusted_proxy_hop(self):
+        request = APIRequestFactory().post(
+            '/', REMOTE_ADDR='10.0.0.2', HTTP_X_FORWARDED_FOR='198.51.100.7, 203.0.113.5',
+        )
+        # левый адрес прислал клиент, правый дописал наш прокси
+        self.assertEqual(throttling.ip_key(None, request), '203.0.113.5')
+
+    @override_settings(UGUR_THROTTLES={'login': {'ip': '2/hour', 'global': '3/min'}})
+    def test_rejected_request_spends_no_tokens(self):
+        for i in range(3):
+            self.login(f'+99365{i:06d}', f'10.2.0.{i}')
+        # глобальный лимит исчерпан: токены этого IP не тратятся
+        statuses = [self.login('+99365100000', '10.2.1.1').status_code for _ in range(5)]
+        self.assertEqual(statuses, [429] * 5)
+
+        self.now += 20
+        self.assertEqual(self.login('+99365100000', '10.2.1.1').status_code, 400)
+
+
+# ===================================================================
+# Hasaba alyş: bir tranzaksiýa, soraglaryň sany belli, ýokary akym
+# ===================================================================
+@override_settings(
+    UGUR_THROTTLES={},
+    # скорость самой регистрации, а не PBKDF2
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class RegisterTests(TestCase):
+    # savepoint + username + user + профиль + release
+    PASSENGER_QUERIES = 5
+    # + проверка car_number и обновление табло водителя
+    DRIVER_QUERIES = 7
+    BENCHMARK = 200
+    MIN_PER_SECOND = 50
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def register(self, number, role='passenger'):
+        body = {
+            'phone': f'+9936{number:07d}', 'password': 'secret',
+            'first_name': 'Aman', 'last_name': 'Amanow', 'role': role,
+        }
+        if role == 'driver':
+            body['driver_profile'] = {
+                'marka': 'Toyota', 'model': 'Camry', 'car_number': f'AG{number % 10000:04d}BH', 'car_year': 2015,
+            }
+        return self.client.post('/api/auth/register/', body, format='json')
+
+    def test_query_count(self):
+        with self.assertNumQueries(self.PASSENGER_QUERIES):
+            response = self.register(1)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['role'], 'passenger')
+
+        with self.assertNumQueries(self.DRIVER_QUERIES):
+            response = self.register(2, role='driver')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['driver_profile']['car_number'], 'AG0002BH')
+
+    def test_duplicate_phone_gets_next_username(self):
+        for _ in range(3):
+            self.assertEqual(self.register(1).status_code, 201)
+        self.assertEqual(
+            sorted(User.objects.values_list('username', flat=True)),
+            ['+99360000001', '+99360000001_2', '+99360000001_3'],
+        )
+
+    def test_failed_profile_rolls_back_user(self):
+        with mock.patch.object(DriverProfile.objects, 'create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.register(5, role='driver')
+        self.assertFalse(User.objects.filter(phone='+99360000005').exists())
+
+    def test_throughput(self):
+        started = time.perf_counter()
+        for number in range(self.BENCHMARK):
+            response = self.register(number, role='driver' if number % 2 else 'passenger')
+            self.assertEqual(response.status_code, 201)
+        per_second = self.BENCHMARK / (time.perf_counter() - started)
+        self.assertGreater(per_second, self.MIN_PER_SECOND)
+
+
+# ===================================================================
+# Replikalar: okamak replika, ýazandan soň — esasy baza
+# ===================================================================
+@override_settings(UGUR_REPLICAS=['replica'])
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.router = replicas.ReplicaRouter()
+        patcher = mock.patch.object(replicas, 'is_available', return_value=True)
+        self.is_available = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reads_go_to_replica_until_a_write(self):
+        self.assertEqual(self.router.db_for_read(Place), 'default')
+        with replicas.reading():
+            self.assertEqual(self.router.db_for_read(Place), 'replica')
+            self.assertEqual(self.router.db_for_write(Place), 'default')
+            self.assertEqual(self.router.db_for_read(Place), 'default')
+
+    def test_recent_writer_reads_from_primary(self):
+        replicas.remember_write(1)
+        with replicas.reading():
+            replicas.check_recent_write(2)
+            self.assertEqual(self.router.db_for_read(Place), 'replica')
+            replicas.check_recent_write(1)
+            self.assertEqual(self.router.db_for_read(Place), 'default')
+
+    def test_unavailable_replica_falls_back_to_primary(self):
+        self.is_available.return_value = False
+        with replicas.reading():
+            self.assertEqual(self.router.db_for_read(Place), 'default')
+
+
+
+# ===================================================================
+# Orunlar: her bron döredilişi we üýtgedilişi orun barlagyndan geçýär
+# ===================================================================
+class SeatBookingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.driver = User.objects.create_user(phone='+99361234567', password='x', is_driver=True)
+        ugur = Ugur.objects.create(owner=cls.driver, driver=cls.driver)
+        cls.route = UgurRoute.objects.create(
+            ugur=ugur, from_place=Place.objects.create(name='Aşgabat'), to_place=Place.objects.create(name='Mary'),
+            departure_date=date.today() + timedelta(days=1), available_seats=2,
+        )
+        cls.passengers = [
+            User.objects.create_user(phone=f'+9936500000{i}', password='x', is_passenger=True) for i in range(2)
+        ]
+
+    def book(self, passenger, seats_booked):
+        client = APIClient()
+        client.force_authenticate(passenger)
+        return client.post('/api/bookings/', {'route_id': self.route.pk, 'seats_booked': seats_booked})
+
+    def test_bookings_endpoint_cannot_overbook(self):
+        self.assertEqual(self.book(self.passengers[0], 2).status_code, 201)
+        self.assertEqual(self.book(self.passengers[1], 1).status_code, 400)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_growing_a_booking_is_checked(self):
+        response = self.book(self.passengers[0], 1)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.book(self.passengers[1], 1).status_code, 201)
+
+        client = APIClient()
+        client.force_authenticate(self.passengers[0])
+        response = client.patch(f"/api/bookings/{response.json()['id']}/", {'seats_booked': 2})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(sum(Booking.objects.values_list('seats_booked', flat=True)), 2)
+
+    def test_instance_not_loaded_from_db_replaces_its_row(self):
+        booking_id = self.book(self.passengers[0], 1).json()['id']
+        stored = Booking.objects.filter(pk=booking_id).values('route_id', 'passenger_id', 'status', 'created_at').get()
+        # без from_db прежнее состояние берётся из строки: 1 → 2 места, а не 1 + 2
+        Booking(pk=booking_id, seats_booked=2, **stored).save()
+        self.assertEqual(self.book(self.passengers[1], 1).status_code, 400)
+        Booking(pk=booking_id, seats_booked=2, **stored).delete()
+        self.assertEqual(self.book(self.passengers[1], 2).status_code, 201)
+
+
+# ===================================================================
+# Ugraýyş tablosy: deploýdan öňki ugurlar migrasiýa bilen doldurylýar
+# ===================================================================
+class DepartureBoardBackfillTests(TestCase):
+    def test_backfill_matches_signal_rows(self):
+        driver = User.objects.create_user(
+            phone='+99361234567', password='x', is_driver=True, first_name='Aman', last_name='Amanow',
+        )
+        DriverProfile.objects.create(user=driver, marka='Toyota', model='Camry', car_number='AG1234BH', car_year=2015)
+        passenger = User.objects.create_user(phone='+99365000000', password='x', is_passenger=True)
+        ashgabat, mary = Place.objects.create(name='Aşgabat'), Place.objects.create(name='Mary')
+        ugur = Ugur.objects.create(owner=driver, driver=driver)
+        future, past = (
+            UgurRoute.objects.create(
+                ugur=ugur, from_place=ashgabat, to_place=mary, departure_date=date.today() + timedelta(days=days),
+                available_seats=3, price_per_seat=50,
+            )
+            for days in (1, -1)
+        )
+        Booking.objects.create(route=future, passenger=passenger, seats_booked=2)
+        fields = ['route_id', *board.BOARD_FIELDS]
+        expected = list(DepartureBoardRow.objects.filter(route=future).values(*fields))
+
+        DepartureBoardRow.objects.all().delete()
+        backfill = import_module('app.migrations.0022_backfill_departure_board')
+        backfill.backfill_departure_board(django_apps, None)
+        self.assertEqual(list(DepartureBoardRow.objects.values(*fields)), expected)
+        self.assertEqual(expected[0]['seats_left'], 1)
+
+
+# ===================================================================
+# Ugraýyş wakalary (SSE)
+# ===================================================================
+class BoardEventsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.driver = User.objects.create_user(phone='+99361234567', password='x', is_driver=True)
+        cls.places = [Place.objects.create(name=name) for name in ('Aşgabat', 'Mary', 'Daşoguz')]
+        cls.route = UgurRoute.objects.create(
+            ugur=Ugur.objects.create(owner=cls.driver, driver=cls.driver),
+            from_place=cls.places[0], to_place=cls.places[1], departure_date=date.today() + timedelta(days=1),
+        )
+
+    def published(self, change):
+        sent = []
+        with mock.patch.object(events, '_publish_on_commit', sent.extend):
+            change()
+        return [(channel, re.search(r'^event: (\w+)$', message, re.M).group(1)) for channel, message in sent]
+
+    def test_unchanged_row_sends_nothing(self):
+        self.assertEqual(self.published(self.route.save), [])
+
+    def test_corridor_change_cancels_on_old_channel(self):
+        self.route.to_place = self.places[2]
+        old = events.channel_name(self.places[0].pk, self.places[1].pk)
+        new = events.channel_name(self.places[0].pk, self.places[2].pk)
+        self.assertEqual(self.published(self.route.save), [(old, 'cancelled'), (new, 'created')])
+
+    def test_seat_change_is_an_update(self):
+        passenger = User.objects.create_user(phone='+99365000000', password='x', is_passenger=True)
+        channel = events.channel_name(self.places[0].pk, self.places[1].pk)
+        self.assertEqual(
+            self.published(lambda: Booking.objects.create(route=self.route, passenger=passenger)),
+            [(channel, 'updated')],
+        )
+
+
+@override_settings(UGUR_EVENTS_HEARTBEAT=1, UGUR_EVENTS_MAX_STREAM=5)
+class DepartureStreamTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(events, '_broker', events.LocalBroker())
+        self.broker = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_bad_corridor_is_rejected(self):
+        with self.assertRaises(ValueError):
+            views.DepartureStreamView().get_channels(APIRequestFactory().get('/', {'corridor': 'x'}))
+
+    async def test_stream_delivers_and_unsubscribes(self):
+        stream = views.DepartureStreamView().stream({'1:2'})
+        self.assertTrue((await stream.__anext__()).startswith('retry:'))
+        message = events.format_event('cancelled', {'route': 1})
+        self.broker.publish('1:2', message)
+        self.broker.publish('3:4', events.format_event('cancelled', {'route': 2}))
+        self.assertEqual(await stream.__anext__(), message)
+        self.assertEqual(await stream.__anext__(), ': ping\n\n')
+        await stream.aclose()
+        self.assertEqual(self.broker.subscriber_count(), 0)
+
+    def test_event_ids_carry_a_process_prefix(self):
+        first, second = (events.format_event('cancelled', {}) for _ in range(2))
+        first_id, second_id = (re.match(r'id: (\S+)', message).group(1) for message in (first, second))
+        self.assertNotEqual(first_id, second_id)
+        self.assertEqual(first_id.split('-')[0], events._process_id)
+
+
+class HalfBroker(events.BaseBroker):
+    # unsubscribe забыт
+    def publish(self, channel, message):
+        pass
+
+    def subscribe(self, channels):
+        pass
+
+
+class EventsBrokerCheckTests(SimpleTestCase):
+    def errors(self, path):
+        with override_settings(UGUR_EVENTS_BROKER=path):
+            return [error.id for error in checks.events_broker_check(None)]
+
+    def test_incomplete_broker_fails_at_startup(self):
+        with self.assertRaises(TypeError):
+            HalfBroker()
+        self.assertEqual(self.errors('app.tests.HalfBroker'), ['app.E002'])
+        self.assertEqual(self.errors('app.events.NoSuchBroker'), ['app.E002'])
+        self.assertEqual(self.errors('app.events.Subscription'), ['app.E002'])
+        self.assertEqual(self.errors('app.events.LocalBroker'), [])
+
+
+# ===================================================================
+# /api/sync/: token we pozulanlaryň yzy
+# ===================================================================
+class SyncTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.driver = User.objects.create_user(phone='+99361234567', password='x', is_driver=True)
+        cls.passenger = User.objects.create_user(phone='+99365000000', password='x', is_passenger=True)
+        cls.stranger = User.objects.create_user(phone='+99365000001', password='x', is_passenger=True)
+        cls.route = UgurRoute.objects.create(
+            ugur=Ugur.objects.create(owner=cls.driver, driver=cls.driver),
+            from_place=Place.objects.create(name='Aşgabat'), to_place=Place.objects.create(name='Mary'),
+            departure_date=date.today() + timedelta(days=1),
+        )
+
+    def test_malformed_tokens_are_rejected(self):
+        for data in ([], {'ugurs': 5}, {'ugurs': [1, 2, 3]}, {'other': [0, 0]}, {'ugurs': [10 ** 30, 0]}):
+            token = base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+            with self.assertRaises(sync.InvalidToken):
+                sync.decode_token(token)
+
+        client = APIClient()
+        client.force_authenticate(self.passenger)
+        self.assertEqual(client.get('/api/sync/', {'since': 'W10'}).status_code, 400)
+
+    def test_tombstones_are_scoped_to_participants(self):
+        tokens = {user: sync.changes(user)['token'] for user in (self.driver, self.passenger, self.stranger)}
+        booking = Booking.objects.create(route=self.route, passenger=self.passenger)
+        booking_id = booking.pk
+        booking.delete()
+        for user, visible in ((self.driver, True), (self.passenger, True), (self.stranger, False)):
+            deleted = sync.changes(user, tokens[user])['deleted']
+            self.assertEqual(deleted.get('bookings') == [booking_id], visible, user)
+
+
+# ===================================================================
+# Ulgam barlaglary: umumy keş
+# ===================================================================
+class SharedCacheCheckTests(SimpleTestCase):
+    def test_process_local_cache_is_refused_in_production(self):
+        with override_settings(UGUR_REQUIRE_SHARED_CACHE=True):
+            self.assertEqual([error.id for error in checks.shared_cache_check(None)], ['app.E001'])
+        with override_settings(UGUR_REQUIRE_SHARED_CACHE=False):
+            self.assertEqual(checks.shared_cache_check(None), [])
+
+    @override_settings(UGUR_REQUIRE_SHARED_CACHE=True, CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://127.0.0.1:6379/1',
+    }})
+    def test_shared_cache_passes(self):
+        self.assertEqual(checks.shared_cache_check(None), [])
+
+
+# ===================================================================
+# API resminamalary: shema faýldan, kitaphanalar gijikdirilen
+# ===================================================================
+class ApiDocsTests(SimpleTestCase):
+    def test_urls_import_does_not_load_schema_libraries(self):
+        # отдельный процесс: в этом уже могли загрузиться drf_yasg.views и т.п.
+        code = (
+            "import sys, django; django.setup(); import ugur.urls; "
+            "print(sorted(m for m in sys.modules if m.startswith(('drf_yasg.', 'drf_spectacular', 'jsonschema'))))"
+        )
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'ugur.settings'}
+        result = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), '[]')
+
+    def test_missing_schema_is_reported(self):
+        with override_settings(UGUR_OPENAPI_SCHEMA=Path('/nonexistent/openapi.json')):
+            self.assertEqual([warning.id for warning in checks.openapi_schema_check(None)], ['app.W001'])
+            docs.schema_bytes.cache_clear()
+            with mock.patch.object(docs, 'build_schema', return_value=b'{}'), self.assertLogs('app.docs', 'WARNING'):
+                self.assertEqual(docs.schema_bytes(), b'{}')
+        docs.schema_bytes.cache_clear()
+
+
+# ===================================================================
+# /api/batch/
+# ===================================================================
+# в TestCase все запросы идут в одной транзакции: параллельные потоки упрутся в блокировку SQLite
+@override_settings(UGUR_BATCH_WORKERS=1)
+class BatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(phone='+99361234567', password='x', is_driver=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post(self, *items):
+        return self.client.post('/api/batch/', {'requests': list(items)}, format='json').json()['responses']
+
+    def test_items_cannot_spoof_client_address(self):
+        parent = Request(APIRequestFactory().post(
+            '/api/batch/', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='10.0.0.1',
+        ))
+        parent.user, parent.auth = self.user, None
+        request = batch.build_request(parent, {
+            'method': 'GET', 'path': '/api/places/', 'headers': {
+                'X-Forwarded-For': '1.2.3.4', 'X-Real-IP': '1.2.3.4', 'Connection': 'close', 'Accept-Language': 'tk',
+            },
+        })
+        self.assertEqual(request.META['HTTP_X_FORWARDED_FOR'], '10.0.0.1')
+        self.assertEqual(request.META['REMOTE_ADDR'], '10.0.0.1')
+        self.assertNotIn('HTTP_X_REAL_IP', request.META)
+        self.assertNotIn('HTTP_CONNECTION', request.META)
+        self.assertEqual(request.META['HTTP_ACCEPT_LANGUAGE'], 'tk')
+
+    def test_crashing_item_does_not_fail_the_batch(self):
+        with mock.patch.object(views.PlaceViewSet, 'list', side_effect=RuntimeError), self.assertLogs('app.batch'):
+            responses = self.post(
+                {'id': 'boom', 'method': 'GET', 'path': '/api/places/'},
+                {'id': 'me', 'method': 'GET', 'path': '/api/driver-profiles/me/'},
+            )
+        self.assertEqual([(item['id'], item['status']) for item in responses], [('boom', 500), ('me', 404)])
+
+
+# ===================================================================
+# ?search=: doly tekstli gözleg
+# ===================================================================
+@unittest.skipUnless(connection.vendor == 'sqlite', "FTS5 barlaglary diňe SQLite üçin")
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(phone='+99361234567', password='x', is_driver=True)
+        cls.ashgabat, cls.mary = Place.objects.create(name='Aşgabat'), Place.objects.create(name='Mary')
+        cls.ugur = Ugur.objects.create(owner=cls.user, driver=cls.user, title='Ýolagçy alýaryn')
+        cls.route = UgurRoute.objects.create(
+            ugur=cls.ugur, from_place=cls.ashgabat, to_place=cls.mary, departure_date=date.today() + timedelta(days=1),
+        )
+        for status in (Load.Status.SEARCHING, Load.Status.DELIVERED):
+            Load.objects.create(
+                sender=cls.user, description='Sowadyjy', receiver_name='Aman', receiver_phone='+99361111111',
+                status=status,
+            )
+
+    def search(self, path, text, **params):
+        return APIClient().get(path, {'search': text, **params}).json()
+
+    def test_ugur_matches_title_and_route_places(self):
+        self.assertEqual([item['id'] for item in self.search('/api/ugurs/', 'mary')], [self.ugur.pk])
+        self.assertEqual([item['id'] for item in self.search('/api/ugurs/', 'yolagcy asgabat')], [self.ugur.pk])
+        self.assertEqual(self.search('/api/ugurs/', 'tejen'), [])
+
+        self.mary.name = 'Tejen'
+        self.mary.save()
+        self.assertEqual([item['id'] for item in self.search('/api/ugurs/', 'tejen')], [self.ugur.pk])
+        self.route.delete()
+        self.assertEqual(self.search('/api/ugurs/', 'tejen'), [])
+
+    def test_search_is_combined_with_filters(self):
+        found = self.search('/api/loads/', 'sowadyjy', status=Load.Status.DELIVERED)
+        self.assertEqual([item['status'] for item in found], [Load.Status.DELIVERED])
+
+
+# ===================================================================
+# Bahalaryň statistikasy (CorridorPriceStats)
+# ===================================================================
+class PriceStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(phone='+99361234567', password='x', is_driver=True)
+        cls.ashgabat, cls.mary = Place.objects.create(name='Aşgabat'), Place.objects.create(name='Mary')
+
+    def add_route(self, type, price):
+        ugur = Ugur.objects.create(owner=self.user, driver=self.user, title='x', type=type)
+        return UgurRoute.objects.create(
+            ugur=ugur, from_place=self.ashgabat, to_place=self.mary,
+            departure_date=date.today() + timedelta(days=1), price_per_seat=price,
+        )
+
+    def route_counts(self):
+        return list(CorridorPriceStats.objects.filter(kind=CorridorPriceStats.Kind.ROUTE).values_list('count', 'total'))
+
+    def test_passenger_requests_are_not_offers(self):
+        self.add_route(Ugur.Type.DRIVER, 50)
+        request = self.add_route(Ugur.Type.PASSENGER, 500)
+        self.assertEqual(self.route_counts(), [(1, 50)])
+
+        request.price_per_seat = 900
+        request.save()
+        UgurRoute.objects.get(pk=request.pk).delete()
+        self.assertEqual(self.route_counts(), [(1, 50)])
+        price_stats.rebuild()
+        self.assertEqual(self.route_counts(), [(1, 50)])
+
+    def test_price_change_recomputes_loaded_week(self):
+        route = UgurRoute.objects.get(pk=self.add_route(Ugur.Type.DRIVER, 50).pk)
+        route.price_per_seat = 70
+        route.save()
+        self.assertEqual(self.route_counts(), [(1, 70)])
+
+    def test_unrelated_route_save_skips_load_places(self):
+        route = UgurRoute.objects.get(pk=self.add_route(Ugur.Type.DRIVER, 50).pk)
+        route.available_seats = 2
+        with mock.patch.object(Load, 'sync_places') as sync:
+            route.save()
+        sync.assert_not_called()
+        route.to_place = Place.objects.create(name='Tejen')
+        with mock.patch.object(Load, 'sync_places', return_value=0) as sync:
+            route.save()
+        sync.assert_called_once_with(route.ugur_id, route_id=route.pk)
+
+
+# ===================================================================
+# Sürüjiniň günlik jemleri (DriverDailyStats)
+# ===================================================================
+class DriverStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.first = User.objects.create_user(phone='+99361234567', password='x', is_driver=True)
+        cls.second = User.objects.create_user(phone='+99361234568', password='x', is_driver=True)
+        passenger = User.objects.create_user(phone='+99365000000', password='x', is_passenger=True)
+        ashgabat, mary = Place.objects.create(name='Aşgabat'), Place.objects.create(name='Mary')
+        cls.day = date.today() + timedelta(days=1)
+        cls.ugur = Ugur.objects.create(owner=cls.first, driver=cls.first)
+        route = UgurRoute.objects.create(
+            ugur=cls.ugur, from_place=ashgabat, to_place=mary, departure_date=cls.day, price_per_seat=50,
+        )
+        Booking.objects.create(route=route, passenger=passenger, seats_booked=2, status=Booking.Status.CONFIRMED)
+
+    def sold(self):
+        return dict(DriverDailyStats.objects.filter(day=self.day).values_list('driver_id', 'seats_sold'))
+
+    def test_reassigned_driver_takes_the_stats(self):
+        self.assertEqual(self.sold(), {self.first.pk: 2})
+        ugur = Ugur.objects.get(pk=self.ugur.pk)
+        ugur.driver = self.second
+        ugur.save()
+        self.assertEqual(self.sold(), {self.second.pk: 2})
+
+    def test_instance_not_loaded_from_db_knows_previous_driver(self):
+        ugur = Ugur(**{field.attname: getattr(self.ugur, field.attname) for field in Ugur._meta.concrete_fields})
+        ugur.driver = self.second
+        ugur.save()
+        self.assertEqual(self.sold(), {self.second.pk: 2})
+
+
+# ===================================================================
+# Ýolagçy islegi ↔ sürüji hödüri (Match)
+# ===================================================================
+class MatchingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.driver = User.objects.create_user(phone='+99361234567', password='x', is_driver=True)
+        cls.passenger = User.objects.create_user(phone='+99365000000', password='x', is_passenger=True)
+        cls.ashgabat, cls.mary = Place.objects.create(name='Aşgabat'), Place.objects.create(name='Mary')
+        cls.day = date.today() + timedelta(days=1)
+
+    def add_route(self, owner, type, price):
+        ugur = Ugur.objects.create(owner=owner, driver=owner if type == Ugur.Type.DRIVER else None, type=type)
+        return UgurRoute.objects.create(
+            ugur=ugur, from_place=self.ashgabat, to_place=self.mary, departure_date=self.day,
+            available_seats=2, price_per_seat=price,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.offer = self.add_route(self.driver, Ugur.Type.DRIVER, 50)
+        self.assertEqual(counters.unread_count(self.driver.pk), 0)
+        # счётчик меняется после COMMIT, push не отправляем
+        with mock.patch.object(matching, 'send_push'), self.captureOnCommitCallbacks(execute=True):
+            self.request = self.add_route(self.passenger, Ugur.Type.PASSENGER, 80)
+
+    def test_new_pair_notifies_driver_once(self):
+        match = Match.objects.get()
+        self.assertEqual((match.offer_id, match.request_id), (self.offer.pk, self.request.pk))
+        self.assertEqual(counters.unread_count(self.driver.pk), 1)
+
+        self.request.save()
+        matching.match_route(self.request)
+        self.assertEqual(Match.objects.get().pk, match.pk)
+        self.assertEqual(DriverNotification.objects.count(), 1)
+        self.assertEqual(counters.unread_count(self.driver.pk), 1)
+
+    def test_changed_score_updates_pair_in_place(self):
+        match = Match.objects.get()
+        self.request.price_per_seat = 60
+        self.request.save()
+        updated = Match.objects.get()
+        self.assertEqual((updated.pk, updated.created_at), (match.pk, match.created_at))
+        self.assertLess(updated.score, match.score)
+
+        self.request.price_per_seat = 40
+        self.request.save()
+        self.assertFalse(Match.objects.exists())
+
+    def test_bulk_created_trips_reach_board_and_matches(self):
+        client = APIClient()
+        client.force_authenticate(self.driver)
+        route = {
+            'from_place': self.ashgabat.pk, 'to_place': self.mary.pk, 'departure_date': self.day.isoformat(),
+            'available_seats': 3, 'price_per_seat': 40,
+        }
+        with mock.patch.object(matching, 'send_push'), self.captureOnCommitCallbacks(execute=True):
+            response = client.post('/api/ugurs/bulk/', [{'routes': [route]}, {'routes': [route]}], format='json')
+        self.assertEqual(response.status_code, 201)
+
+        routes = UgurRoute.objects.filter(ugur_id__in=response.json()['ids'])
+        self.assertEqual(DepartureBoardRow.objects.filter(route__in=routes).count(), 2)
+        self.assertEqual(Match.objects.filter(offer__in=routes, request=self.request).count(), 2)
+        self.assertEqual(counters.unread_count(self.driver.pk), 3)
+
+
+# ===================================================================
+# Okalmadyk bildirişleriň sanawy (keş)
+# ===================================================================
+class UnreadCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.driver = User.objects.create_user(phone='+99361234567', password='x', is_driver=True)
+        cls.place = Place.objects.create(name='Aşgabat')
+
+    def setUp(self):
+        cache.clear()
+
+    def cached(self):
+        return cache.get(counters.unread_key(self.driver.pk))
+
+    def notify(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return DriverNotification.objects.create(driver=self.driver, from_place=self.place, to_place=self.place)
+
+    def test_counter_follows_is_seen_changes(self):
+        first, second = self.notify(), self.notify()
+        self.assertEqual(counters.unread_count(self.driver.pk), 2)
+        with self.assertNumQueries(1), self.captureOnCommitCallbacks(execute=True) as callbacks:
+            first.message = 'täze'
+            first.save()  # is_seen не менялся — счётчик не трогается
+        self.assertEqual((callbacks, self.cached()), ([], 2))
+
+        loaded = DriverNotification.objects.get(pk=second.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            loaded.is_seen = True
+            loaded.save()
+        self.assertEqual(self.cached(), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            loaded.delete()
+            first.delete()
+        self.assertEqual(self.cached(), 0)
+
+    def test_adjust_fills_missing_key_from_database(self):
+        # ключа нет: первый же incr заполняет его COUNT-ом, а не пропускается
+        self.notify()
+        self.assertEqual(self.cached(), 1)
+        self.notify()
+        self.assertEqual(self.cached(), 2)
+
+    def test_rolled_back_notification_is_not_counted(self):
+        self.notify()
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            DriverNotification.objects.create(driver=self.driver, from_place=self.place, to_place=self.place)
+            raise RuntimeError
+        self.assertEqual(counters.unread_count(self.driver.pk), 1)
+
+    def test_mark_all_seen_keeps_later_notifications(self):
+        self.notify()
+        self.assertEqual(counters.unread_count(self.driver.pk), 1)
+        client = APIClient()
+        client.force_authenticate(self.driver)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(client.post('/api/driver-notifications/mark-all-seen/').json()['updated'], 1)
+            # создано до COMMIT отметки: вычитается только отмеченное, а не всё
+            DriverNotification.objects.create(driver=self.driver, from_place=self.place, to_place=self.place)
+        self.assertEqual(self.cached(), 1)
+
+
+# ===================================================================
+# Geçen syýahatlary arhiwe geçirmek
+# ===================================================================
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.driver = User.objects.create_user(phone='+99361234567', password='x', is_driver=True)
+        cls.passenger = User.objects.create_user(phone='+99365000000', password='x', is_passenger=True)
+        ashgabat, mary = Place.objects.create(name='Aşgabat'), Place.objects.create(name='Mary')
+        cls.ugur = Ugur.objects.create(owner=cls.driver, driver=cls.driver)
+        cls.route = UgurRoute.objects.create(
+            ugur=cls.ugur, from_place=ashgabat, to_place=mary, departure_date=date.today() - timedelta(days=30),
+        )
+        cls.booking = Booking.objects.create(route=cls.route, passenger=cls.passenger)
+        cls.load = Load.objects.create(
+            sender=cls.passenger, ugur=cls.ugur, description='x', receiver_name='Aman', receiver_phone='+99361111111',
+        )
+
+    def test_archive_deletes_without_signals_and_leaves_tombstones(self):
+        with mock.patch.object(sync, 'record_deletion') as record:
+            totals = archive.archive_trips(keep_days=14)
+        record.assert_not_called()
+        self.assertEqual((totals['ugurs'], totals['routes'], totals['bookings'], totals['loads']), (1, 1, 1, 1))
+        self.assertFalse(UgurRoute.objects.exists())
+        self.assertEqual(ArchivedBooking.objects.get().passenger_id, self.passenger.pk)
+        self.assertEqual(
+            set(SyncTombstone.objects.values_list('model', 'object_id', 'user_id')),
+            {
+                ('ugurs', self.ugur.pk, None), ('routes', self.route.pk, None),
+                ('bookings', self.booking.pk, self.passenger.pk), ('bookings', self.booking.pk, self.driver.pk),
+                ('loads', self.load.pk, self.passenger.pk), ('loads', self.load.pk, self.driver.pk),
+            },
+        )
+
+
+# ===================================================================
+# Yzygiderli syýahatlar (tertip)
+# ===================================================================
+class ScheduleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.driver = User.objects.create_user(phone='+99361234567', password='x', is_driver=True)
+        cls.passenger = User.objects.create_user(phone='+99365000000', password='x', is_passenger=True)
+        cls.ashgabat, cls.mary = Place.objects.create(name='Aşgabat'), Place.objects.create(name='Mary')
+        cls.tomorrow = date.today() + timedelta(days=1)
+        cls.schedule = UgurSchedule.objects.create(
+            owner=cls.driver, from_place=cls.ashgabat, to_place=cls.mary, departure_time='08:00',
+            start_date=cls.tomorrow, end_date=cls.tomorrow + timedelta(days=2),
+        )
+
+    def routes(self, **params):
+        return APIClient().get('/api/routes/', {'from_place': self.ashgabat.pk, 'to_place': self.mary.pk, **params})
+
+    def book(self, day):
+        client = APIClient()
+        client.force_authenticate(self.passenger)
+        return client.post(f'/api/schedules/{self.schedule.pk}/book/', {'date': day.isoformat()})
+
+    def test_route_search_lists_schedule_days(self):
+        rows = self.routes().json()
+        self.assertEqual([(row['id'], row['schedule']) for row in rows], [(None, self.schedule.pk)] * 3)
+        self.assertEqual(len(self.routes(departure_date=self.tomorrow.isoformat()).json()), 1)
+
+        self.assertEqual(self.book(self.tomorrow).status_code, 201)
+        rows = self.routes().json()
+        self.assertEqual([row['id'] is None for row in rows], [False, True, True])
+
+    def test_schedule_change_changes_etag(self):
+        etag = self.routes()['ETag']
+        response = APIClient().get(
+            '/api/routes/', {'from_place': self.ashgabat.pk, 'to_place': self.mary.pk}, HTTP_IF_NONE_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, 304)
+        self.schedule.end_date = self.tomorrow
+        self.schedule.save()
+        self.assertNotEqual(self.routes()['ETag'], etag)
+
+    def test_booking_rejects_past_and_out_of_range_days(self):
+        self.schedule.start_date = date.today() - timedelta(days=3)
+        self.schedule.save()
+        self.assertEqual(self.book(date.today() - timedelta(days=1)).status_code, 400)
+        self.assertEqual(self.book(self.tomorrow + timedelta(days=3)).status_code, 400)
+        self.assertEqual(self.book(self.tomorrow).status_code, 201)
+
+
+# ===================================================================
+# GPS nokatlary: ýatda ýygnamak we upsert
+# ===================================================================
+@override_settings(UGUR_LOCATION_TRAIL_SECONDS=60)
+class LocationBufferTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.driver = User.objects.create_user(phone='+99361234567', password='x', is_driver=True)
+
+    def setUp(self):
+        # фоновый поток не запускаем: flush() вызывает тест
+        patcher = mock.patch.object(locations.PositionBuffer, '_ensure_flusher')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.buffer = locations.PositionBuffer()
+        self.start = timezone.now().replace(second=0, microsecond=0) - timedelta(minutes=10)
+
+    def points(self, seconds, latitude=37.9):
+        return [
+            {'latitude': latitude, 'longitude': 58.4, 'recorded_at': self.start + timedelta(seconds=second)}
+            for second in seconds
+        ]
+
+    def test_flush_upserts_latest_and_thins_trail(self):
+        self.buffer.add(self.driver.pk, self.points([0, 10, 70, 130]))
+        self.assertEqual(self.buffer.get(self.driver.pk)['recorded_at'], self.start + timedelta(seconds=130))
+        self.assertEqual(self.buffer.flush(), (1, 3))
+        first = LastKnownPosition.objects.get(user=self.driver)
+
+        self.buffer.add(self.driver.pk, self.points([140, 200], latitude=38.0))
+        self.assertEqual(self.buffer.flush(), (1, 1))
+        position = LastKnownPosition.objects.get(user=self.driver)
+        self.assertEqual(position.latitude, 38.0)
+        self.assertGreater(position.updated_at, first.updated_at)
+        self.assertEqual(LocationTrailPoint.objects.filter(user=self.driver).count(), 4)
+
+    def test_failed_flush_keeps_points(self):
+        self.buffer.add(self.driver.pk, self.points([0]))
+        with mock.patch.object(LastKnownPosition.objects, 'bulk_create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.buffer.flush()
+        self.assertEqual(self.buffer.flush(), (1, 1))
+        self.assertTrue(LastKnownPosition.objects.filter(user=self.driver).exists())
+
+    def test_close_writes_pending_points(self):
+        self.buffer.add(self.driver.pk, self.points([0]))
+        self.buffer.close()
+        self.assertIsNone(self.buffer.get(self.driver.pk))
+        self.assertEqual(LastKnownPosition.objects.get(user=self.driver).latitude, 37.9)
@@ -0,0 +1,180 @@
+"""
+Giriş / hasaba alyş üçin çäklendirmeler (token bucket).
+
+Her endpoint (view.throttle_scope) üçin settings.UGUR_THROTTLES-da üç çäk
+bolup biler: `ip`, `phone` we `global`. Barlag DRF-iň check_throttles()
+tapgyrynda, serializer-den we PBKDF2 heşden öň geçýär, şonuň üçin ret
+edilen sorag CPU-ny diýen ýaly harçlamaýar.
+
+Çelek (bucket) ýa prosesiň ýadynda (`local`), ýa-da umumy keşde (`cache`)
+saklanýar — settings.UGUR_THROTTLE_STORES.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'sec': 1, 'm': 60, 'min': 60, 'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """'10/min' → (sygymy, sekuntda dolýan token)."""
+    count, _, period = rate.partition('/')
+    count = int(count)
+    return count, count / PERIODS[period]
+
+
+def _tokens(state, now, capacity, refill):
+    tokens, stamp = state if state is not None else (capacity, now)
+    return min(capacity, tokens + (now - stamp) * refill)
+
+
+def _wait(tokens, refill):
+    return 0 if tokens >= 1 else (1 - tokens) / refill
+
+
+def _take(state, now, capacity, refill):
+    """Çelekden bir token alýar. Gaýtarýar: (täze ýagdaý, rugsat, garaşmaly sekunt)."""
+    tokens = _tokens(state, now, capacity, refill)
+    if tokens >= 1:
+        return (tokens - 1, now), True, 0
+    return (tokens, now), False, (1 - tokens) / refill
+
+
+class LocalBucketStore:
+    """Prosesiň içindäki çelekler. Köp IP bilen hüjümde ýat çäksiz ösmez ýaly LRU."""
+    max_keys = 50000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+
+    def peek(self, key, capacity, refill):
+        """Token harçlamazdan: näçe sekunt garaşmaly (0 — token bar)."""
+        now = time.monotonic()
+        with self._lock:
+            return _wait(_tokens(self._buckets.get(key), now, capacity, refill), refill)
+
+    def consume(self, key, capacity, refill):
+        now = time.monotonic()
+        with self._lock:
+            state, allowed, wait = _take(self._buckets.get(key), now, capacity, refill)
+            self._buckets[key] = state
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheBucketStore:
+    """
+    Umumy keşdäki çelekler (ähli prosesler üçin bir çäk).
+    get/set atom däl: bäsleşikde çäk birnäçe token geçilip bilner, bu kabul ederlik.
+    """
+    prefix = 'throttle:'
+
+    def peek(self, key, capacity, refill):
+        return _wait(_tokens(cache.get(self.prefix + key), time.time(), capacity, refill), refill)
+
+    def consume(self, key, capacity, refill):
+        now = time.time()
+        cache_key = self.prefix + key
+        state, allowed, wait = _take(cache.get(cache_key), now, capacity, refill)
+        if allowed:
+            # пустое ведро полностью наполняется за capacity / refill секунд
+            cache.set(cache_key, state, timeout=math.ceil(capacity / refill))
+        return allowed, wait
+
+
+STORES = {
+    'local': LocalBucketStore(),
+    'cache': CacheBucketStore(),
+}
+
+
+def get_store(kind):
+    stores = getattr(settings, 'UGUR_THROTTLE_STORES', {})
+    return STORES[stores.get(kind, 'local')]
+
+
+def ip_key(throttle, request):
+    """
+    Müşderiniň IP-si. X-Forwarded-For-y müşderi özi ýazyp bilýär, şonuň üçin
+    oňa diňe settings.UGUR_THROTTLE_NUM_PROXIES ynamly proksi bar bolsa we
+    sagdan şol sanda bölek alynýar; ýogsam REMOTE_ADDR.
+    """
+    proxies = getattr(settings, 'UGUR_THROTTLE_NUM_PROXIES', 0)
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    if proxies and forwarded:
+        addrs = [addr.strip() for addr in forwarded.split(',')]
+        # левее — то, что прислал клиент; доверяем только адресам, дописанным нашими прокси
+        return addrs[-min(proxies, len(addrs))]
+    return request.META.get('REMOTE_ADDR')
+
+
+def phone_key(throttle, request):
+    # только разбор тела запроса, без сериализатора
+    try:
+        phone = request.data.get('phone')
+    except AttributeError:
+        return None
+    if not isinstance(phone, str):
+        return None
+    return ''.join(phone.split()) or None
+
+
+def global_key(throttle, request):
+    return 'all'
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    view.throttle_scope boýunça settings-den alnan çäkler, `kinds` tertibinde.
+    Ilki ähli çelekler barlanýar, token diňe hemmesi rugsat berende alynýar:
+    ret edilen sorag hiç bir çelegi (IP-ni hem, global-y hem) boşatmaýar.
+    """
+    kinds = (('ip', ip_key), ('phone', phone_key), ('global', global_key))
+
+    def get_rates(self, view):
+        scope = getattr(view, 'throttle_scope', None)
+        return getattr(settings, 'UGUR_THROTTLES', {}).get(scope, {})
+
+    def allow_request(self, request, view):
+        self._wait = None
+        rates = self.get_rates(view)
+        buckets = []
+        for kind, get_key in self.kinds:
+            rate = rates.get(kind)
+            if rate is None:
+                continue
+            key = get_key(self, request)
+            if key is None:
+                continue
+            capacity, refill = parse_rate(rate)
+            buckets.append((get_store(kind), f'{view.throttle_scope}:{kind}:{key}', capacity, refill))
+
+        for store, key, capacity, refill in buckets:
+            wait = store.peek(key, capacity, refill)
+            if wait:
+                self._wait = wait
+                return False
+        for store, key, capacity, refill in buckets:
+            # между peek и consume ведро могли опустошить параллельные запросы
+            allowed, wait = store.consume(key, capacity, refill)
+            if not allowed:
+                self._wait = wait
+                return False
+        return True
+
+    def wait(self):
+        return self._wait
@@ -5,12 +5,6 @@ from rest_framework_simplejwt.views import TokenRefreshView
 from django.urls import path
 from .views import RegisterView
 
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView,
-    SpectacularRedocView,
-)
-
 from .views import (
     UserViewSet,
     DriverProfileViewSet,
@@ -22,12 +16,21 @@ from .views import (
     ReviewViewSet,
     LoadViewSet,
     DriverNotificationViewSet,
+    MatchViewSet,
     ImportOldUgurView,
     CurrentPlaceViewSet,
     LogoutView,
     PhoneTokenObtainPairView,
     RegisterView,
-    ChangeRoleView
+    ChangeRoleView,
+    DepartureBoardView,
+    DepartureStreamView,
+    ArchivedUgurViewSet,
+    ArchivedLoadViewSet,
+    UgurScheduleViewSet,
+    LocationViewSet,
+    BatchView,
+    SyncView,
 )
 
 # ===================================================================
@@ -40,11 +43,16 @@ router.register(r'passenger-profiles', PassengerProfileViewSet, basename='passen
 router.register(r'places', PlaceViewSet, basename='place')
 router.register(r'ugurs', UgurViewSet, basename='ugur')
 router.register(r'routes', UgurRouteViewSet, basename='ugurroute')
+router.register(r'schedules', UgurScheduleViewSet, basename='ugurschedule')
 router.register(r'bookings', BookingViewSet, basename='booking')
 router.register(r'reviews', ReviewViewSet, basename='review')
 router.register(r'current', CurrentPlaceViewSet, basename='current')
+router.register(r'locations', LocationViewSet, basename='location')
 router.register(r'loads', LoadViewSet, basename='load')
 router.register(r'driver-notifications', DriverNotificationViewSet, basename='drivernotification')
+router.register(r'matches', MatchViewSet, basename='match')
+router.register(r'archive/ugurs', ArchivedUgurViewSet, basename='archivedugur')
+router.register(r'archive/loads', ArchivedLoadViewSet, basename='archivedload')
 
 
 
@@ -53,9 +61,10 @@ urlpatterns = [
     # API
     path('', include(router.urls)),
     path('import-old-ugur/', ImportOldUgurView.as_view(), name='import-old-ugur'),
-    # path('schema/', SpectacularAPIView.as_view(), name='schema'),
-    # path('swagger/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
-    # path('redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
+    path('departures/', DepartureBoardView.as_view(), name='departure-board'),
+    path('departures/stream/', DepartureStreamView.as_view(), name='departure-stream'),
+    path('batch/', BatchView.as_view(), name='batch'),
+    path('sync/', SyncView.as_view(), name='sync'),
 
     #Auth
     path('auth/register/', RegisterView.as_view(), name='register'),
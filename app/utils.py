@@ -3,4 +3,9 @@ def send_push_to_driver(driver, title, body):
     Şu ýerde Firebase / OneSignal / SMS / Telegram näme ulanýan bolsaň — şony goýarsyň.
     Häzirlikçe diňe PRINT edip goýdum.
     """
-    print(f"PUSH to {driver.phone}: {title} — {body}")
+    send_push(driver, title, body)
+
+
+def send_push(user, title, body):
+    """Islendik ulanyja (sürüji ýa-da ýolagçy) push."""
+    print(f"PUSH to {user.phone}: {title} — {body}")
@@ -1,31 +1,47 @@
 # rides/views.py
+import asyncio
+import hashlib
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Max, Prefetch, Q
 from django.shortcuts import get_object_or_404
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.http import quote_etag
+from datetime import timedelta
 from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend, NumberFilter,ChoiceFilter
 import django_filters.rest_framework as filters
 from rest_framework import viewsets, filters as drf_filters
 from rest_framework.views import APIView
-from drf_spectacular.openapi import AutoSchema
-from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework_simplejwt.views import TokenObtainPairView
-from .serializers import PhoneTokenObtainPairSerializer
+from .serializers import ChangeRoleSerializer, PhoneTokenObtainPairSerializer
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenRefreshView
 from .serializers import RegisterSerializer
 from rest_framework import generics, permissions
 
-from drf_yasg.utils import swagger_auto_schema
-from drf_yasg import openapi
 
 from .models import (
     User, DriverProfile, PassengerProfile,
     Place, Ugur, UgurRoute, Booking,
-    Review, Load, DriverNotification,CurrentPlace
+    Review, Load, DriverNotification,CurrentPlace,
+    DepartureBoardRow, ArchivedUgur, ArchivedUgurRoute, ArchivedBooking, ArchivedLoad,
+    UgurSchedule, CorridorPriceStats, DriverDailyStats, Match
 )
+from . import auth, batch, counters, driver_stats, events, locations, price_stats, schedules, seats, sync
+from .docs import OpenApiParameter, extend_schema, swagger_auto_schema
+from .mixins import ConditionalGetMixin
+from .search import FullTextSearchFilter
+from .throttling import TokenBucketThrottle
 from .serializers import (
     UserSerializer,
     DriverProfileSerializer,
@@ -42,7 +58,30 @@ from .serializers import (
     DriverNotificationSerializer,
     OldFormatImportSerializer,
     DriverProfileUpdateSerializer,
-    RegisterResponseSerializer
+    RegisterResponseSerializer,
+    DepartureBoardQuerySerializer,
+    DepartureBoardRowSerializer,
+    ArchivedUgurSerializer,
+    ArchivedLoadSerializer,
+    NotificationIdsSerializer,
+    ScheduleOccurrenceSerializer,
+    UgurScheduleSerializer,
+    ScheduleBookingSerializer,
+    RouteStopsSerializer,
+    RouteBookRequestSerializer,
+    MatchSerializer,
+    LocationBatchSerializer,
+    LastKnownPositionSerializer,
+    PriceStatsQuerySerializer,
+    DriverStatsQuerySerializer,
+    DriverDailyStatsSerializer,
+    BatchSerializer,
+    SyncQuerySerializer,
+    SyncUgurSerializer,
+    SyncUgurRouteSerializer,
+    SyncBookingSerializer,
+    SyncLoadSerializer,
+    SyncNotificationSerializer,
     )
 
 User = get_user_model()
@@ -68,6 +107,8 @@ User = get_user_model()
 )
 class PhoneTokenObtainPairView(TokenObtainPairView):
     serializer_class = PhoneTokenObtainPairSerializer
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'login'
 
 @extend_schema(
     request={
@@ -97,6 +138,8 @@ class LogoutView(APIView):
             return Response({"error": "Invalid token"}, status=status.HTTP_400_BAD_REQUEST)
 
 class RegisterView(APIView):
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'register'
 
     @swagger_auto_schema(
         operation_description="Ulanyjy hasaba alyş",
@@ -104,16 +147,18 @@ class RegisterView(APIView):
     )
     def post(self, request):
         serializer = RegisterSerializer(data=request.data)
-        print('!!!',serializer.initial_data)
         if serializer.is_valid():
             user = serializer.save()
 
-            # создаём JWT токен
-            token = str(RefreshToken.for_user(user).access_token)
-
-            print('###',user)
+            # создаём JWT токен; refresh не нужен — без записи в OutstandingToken.
+            # профили только что созданы и лежат в кеше связей — claims без запросов
+            token = str(auth.access_token_for(user, auth.role_claims(
+                user,
+                driver_profile_id=user.driver_profile.pk if user.is_driver else None,
+                passenger_profile_id=user.passenger_profile.pk if user.is_passenger else None,
+            )))
 
-            # формируем response
+            # формируем response из объектов в памяти
             data = {
                 'phone': user.phone,
                 'first_name': user.first_name,
@@ -159,40 +204,310 @@ class PlaceViewSet(viewsets.ModelViewSet):
     ordering_fields = ['name']
     permission_classes = [IsAuthenticatedOrReadOnly]
 
+    @action(detail=False, methods=['get'], url_path='price-stats')
+    def price_stats(self, request):
+        """Ugur boýunça bahalar: diňe CorridorPriceStats-dan, bir indeksli sorag."""
+        params = PriceStatsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        since = price_stats.week_start(timezone.localdate()) - timedelta(weeks=data['weeks'] - 1)
+        rows = CorridorPriceStats.objects.filter(
+            from_place_id=data['from_place'], to_place_id=data['to_place'], week__gte=since,
+        ).order_by('kind', 'week')
+        if data.get('kind'):
+            rows = rows.filter(kind=data['kind'])
+
+        by_kind = {}
+        for row in rows:
+            by_kind.setdefault(row.kind, []).append(row)
+        return Response({
+            'from_place': data['from_place'],
+            'to_place': data['to_place'],
+            'since': since,
+            'summary': {
+                kind: price_stats.describe(price_stats.summarize(kind_rows))
+                for kind, kind_rows in by_kind.items()
+            },
+            'weeks': [
+                {'kind': row.kind, 'week': row.week, **price_stats.describe(row)}
+                for kind_rows in by_kind.values() for row in kind_rows
+            ],
+        })
+
 
 # ===================================================================
 # 3. Syýahat (Ugur)
 # ===================================================================
-class UgurViewSet(viewsets.ModelViewSet):
+BULK_MAX_TRIPS = 100
+
+
+class UgurViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Ugur.objects.filter(is_active=True).select_related('owner', 'driver').prefetch_related('routes')
-    filter_backends = [DjangoFilterBackend, drf_filters.SearchFilter, drf_filters.OrderingFilter]
+    # маршруты и брони трогают Ugur.updated_at (signals.py); пользователи — свои
+    conditional_fields = ('updated_at', 'owner__updated_at', 'driver__updated_at')
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, drf_filters.OrderingFilter]
     filterset_fields = ['type', 'driver', 'owner']
-    search_fields = ['title', 'routes__from_place__name', 'routes__to_place__name']
+    # title we ugurlaryň şäherleri (app/search.py)
+    search_index = 'ugur'
     ordering_fields = ['created_at', 'routes__departure_date']
     permission_classes = [IsAuthenticatedOrReadOnly]
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'retrieve':
+            # ugur + sürüji profili, ugurlar (şäherler bilen), bronlar (ýolagçylar bilen): jemi 3 sorag
+            routes = UgurRoute.objects.select_related('from_place', 'to_place').prefetch_related(
+                Prefetch('bookings', queryset=Booking.objects.select_related('passenger'))
+            )
+            queryset = (
+                queryset.select_related('driver__driver_profile')
+                .prefetch_related(None)
+                .prefetch_related(Prefetch('routes', queryset=routes))
+            )
+        return queryset
+
     def get_serializer_class(self):
         if self.action == 'list':
             return UgurListSerializer
-        if self.action == 'create':
+        if self.action in ('create', 'bulk'):
             return UgurCreateSerializer
         return UgurDetailSerializer
 
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
 
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        """Birnäçe syýahaty (mysal üçin bir hepdelik) bir tranzaksiýada döredýär."""
+        serializer = self.get_serializer(data=request.data, many=True, max_length=BULK_MAX_TRIPS)
+        serializer.is_valid(raise_exception=True)
+        ugurs = serializer.save(owner=request.user)
+        return Response({'created': len(ugurs), 'ids': [ugur.pk for ugur in ugurs]}, status=status.HTTP_201_CREATED)
+
 
 # ===================================================================
 # 4. Ugurlar
 # ===================================================================
-class UgurRouteViewSet(viewsets.ModelViewSet):
+class UgurRouteViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = UgurRoute.objects.select_related('from_place', 'to_place', 'ugur__owner')
     serializer_class = UgurRouteSerializer
+    conditional_fields = (
+        'updated_at', 'ugur__updated_at', 'ugur__owner__updated_at', 'ugur__driver__updated_at',
+        'from_place__updated_at', 'to_place__updated_at',
+    )
     filter_backends = [DjangoFilterBackend, drf_filters.OrderingFilter]
     filterset_fields = ['from_place', 'to_place', 'departure_date']
     ordering_fields = ['departure_date', 'departure_time']
     permission_classes = [IsAuthenticatedOrReadOnly]
 
+    def schedule_window(self):
+        """A → B gözleginde tertip günleriniň (from, to, date_from, date_to) aralygy; başga sanawda — None."""
+        params = self.request.query_params
+        from_place, to_place = params.get('from_place', ''), params.get('to_place', '')
+        if self.action != 'list' or not (from_place.isdigit() and to_place.isdigit()):
+            return None
+        today = timezone.localdate()
+        try:
+            day = parse_date(params.get('departure_date') or '')
+        except ValueError:
+            return None
+        if day is None:
+            return int(from_place), int(to_place), today, today + timedelta(days=schedules.EXPAND_WINDOW_DAYS)
+        # прошедшие дни расписания не бронируются — их не показываем
+        return (int(from_place), int(to_place), day, day) if day >= today else None
+
+    def get_conditional_state(self, state):
+        etag, last_modified = super().get_conditional_state(state)
+        window = self.schedule_window()
+        if window is None:
+            return etag, last_modified
+        state = (
+            schedules.active_schedules(*window).select_related(None).order_by()
+            .aggregate(count=Count('pk'), last=Max('updated_at'))
+        )
+        raw = f"{etag}|{state['count']}|{state['last']}|{window}"
+        # окно дат сдвигается каждый день без записи в базу: Last-Modified тут не годится, только ETag
+        return quote_etag(hashlib.md5(raw.encode()).hexdigest()), None
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        window = self.schedule_window()
+        if response.status_code != 200 or window is None:
+            return response
+        # yzygiderli syýahatlaryň günleri bazada ýok — tablodaky ýaly şu ýerde açylýar (id=None, schedule)
+        occurrences = schedules.expand_routes(*window)
+        if occurrences:
+            response.data = list(response.data) + self.get_serializer(occurrences, many=True).data
+            reverse = request.query_params.get('ordering', '').startswith('-')
+            response.data.sort(key=lambda row: (row['departure_date'], row['departure_time'] or ''), reverse=reverse)
+        return response
+
+    @action(detail=True, methods=['get', 'put'])
+    def stops(self, request, pk=None):
+        """Duralgalar we her bölekdäki boş orunlar; PUT — aralyk duralgalary çalyşmak (eýesi / sürüji)."""
+        route = self.get_object()
+        if request.method == 'PUT':
+            if request.user.id not in (route.ugur.owner_id, route.ugur.driver_id):
+                raise PermissionDenied("Duralgalary diňe syýahatyň eýesi üýtgedip biler.")
+            serializer = RouteStopsSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            route = seats.set_stops(route, serializer.validated_data['stops'])
+        return Response(seats.describe(route))
+
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
+    def book(self, request, pk=None):
+        """Ugruň bir bölegini bronlamak: orunlar diňe şol böleklerde eýelenýär."""
+        route = self.get_object()
+        serializer = RouteBookRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        from_stop, to_stop = seats.resolve_stops(route, data.get('from_place'), data.get('to_place'))
+        booking = seats.reserve(route, request.user, from_stop, to_stop, data['seats_booked'])
+        return Response(BookingSerializer(booking).data, status=status.HTTP_201_CREATED)
+
+
+# ===================================================================
+# 4.1 Ugraýyş tablosy (A → B)
+# ===================================================================
+class DepartureBoardView(generics.ListAPIView):
+    """
+    Iki şäheriň arasyndaky ugraýyşlar: diňe DepartureBoardRow tablisasy boýunça
+    (from_place, to_place, departure_date) indeksi bilen bir gezek okalýar.
+    """
+    serializer_class = DepartureBoardRowSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    def get_params(self):
+        if not hasattr(self, '_params'):
+            params = DepartureBoardQuerySerializer(data=self.request.query_params)
+            params.is_valid(raise_exception=True)
+            self._params = params.validated_data
+        return self._params
+
+    def get_queryset(self):
+        data = self.get_params()
+        queryset = DepartureBoardRow.objects.filter(
+            from_place_id=data['from_place'],
+            to_place_id=data['to_place'],
+            departure_date__gte=data.get('date') or timezone.localdate(),
+        )
+        if data.get('date_to'):
+            queryset = queryset.filter(departure_date__lte=data['date_to'])
+        return queryset.order_by('departure_date', 'departure_time')
+
+    def list(self, request, *args, **kwargs):
+        data = self.get_params()
+        rows = list(self.get_serializer(self.get_queryset(), many=True).data)
+
+        # yzygiderli syýahatlaryň günleri bazada ýok — şu ýerde açylýar
+        date_from = data.get('date') or timezone.localdate()
+        date_to = data.get('date_to') or date_from + timedelta(days=schedules.EXPAND_WINDOW_DAYS)
+        occurrences = schedules.expand(data['from_place'], data['to_place'], date_from, date_to)
+        if occurrences:
+            rows += ScheduleOccurrenceSerializer(occurrences, many=True).data
+            rows.sort(key=lambda row: (row['departure_date'], row['departure_time'] or ''))
+        return Response(rows)
+
+
+class DepartureStreamView(View):
+    """
+    Ugraýyşlaryň SSE akymy: ?corridor=1:2&corridor=3:4 (ýa-da from_place & to_place).
+    Diňe ASGI arkaly; her müşderi üçin diňe bir asyncio.Queue, akym (thread) ýok.
+    """
+    MAX_CORRIDORS = 20
+
+    def get_channels(self, request):
+        pairs = request.GET.getlist('corridor')
+        if request.GET.get('from_place') and request.GET.get('to_place'):
+            pairs.append(f"{request.GET['from_place']}:{request.GET['to_place']}")
+        channels = set()
+        for pair in pairs:
+            from_place, _, to_place = pair.partition(':')
+            if not (from_place.isdigit() and to_place.isdigit()):
+                raise ValueError(f"Nädogry ugur: {pair!r} (garaşylýan: from_place:to_place)")
+            channels.add(events.channel_name(int(from_place), int(to_place)))
+        if not channels:
+            raise ValueError("Iň bolmanda bir ugur (corridor) görkeziň.")
+        if len(channels) > self.MAX_CORRIDORS:
+            raise ValueError(f"Köp bolsa {self.MAX_CORRIDORS} ugur.")
+        return channels
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            channels = self.get_channels(request)
+        except ValueError as exc:
+            return JsonResponse({'detail': str(exc)}, status=400)
+
+        response = StreamingHttpResponse(self.stream(channels), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'   # nginx не должен буферизовать поток
+        return response
+
+    async def stream(self, channels):
+        broker = events.get_broker()
+        subscription = broker.subscribe(channels)
+        heartbeat = settings.UGUR_EVENTS_HEARTBEAT
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.UGUR_EVENTS_MAX_STREAM
+        try:
+            yield f'retry: {heartbeat * 1000}\n\n'
+            # поток ограничен по времени: EventSource сам переподключится,
+            # а «потерянные» подписки не висят вечно
+            while loop.time() < deadline:
+                if subscription.overflowed:
+                    yield 'event: resync\ndata: {}\n\n'
+                    return
+                try:
+                    yield await subscription.get(timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ': ping\n\n'
+        finally:
+            broker.unsubscribe(subscription)
+
+
+# ===================================================================
+# 4.2 Yzygiderli syýahatlar (tertip)
+# ===================================================================
+class UgurScheduleViewSet(viewsets.ModelViewSet):
+    serializer_class = UgurScheduleSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['from_place', 'to_place', 'owner', 'is_active']
+
+    def get_queryset(self):
+        queryset = UgurSchedule.objects.select_related('from_place', 'to_place')
+        if self.action in ('update', 'partial_update', 'destroy'):
+            # üýtgetmek diňe eýesine
+            return queryset.filter(owner=self.request.user)
+        return queryset
+
+    def perform_create(self, serializer):
+        serializer.save(owner=self.request.user)
+
+    @action(detail=True, methods=['get'])
+    def occurrences(self, request, pk=None):
+        schedule = self.get_object()
+        params = DepartureBoardQuerySerializer(data={
+            **request.query_params.dict(),
+            'from_place': schedule.from_place_id, 'to_place': schedule.to_place_id,
+        })
+        params.is_valid(raise_exception=True)
+        date_from = params.validated_data.get('date') or timezone.localdate()
+        date_to = params.validated_data.get('date_to') or date_from + timedelta(days=schedules.EXPAND_WINDOW_DAYS)
+        return Response([day.isoformat() for day in schedule.occurrences(date_from, date_to)])
+
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
+    def book(self, request, pk=None):
+        """Tertibiň bir gününi bronlamak: UgurRoute şu wagt (ilkinji bronda) döredilýär."""
+        schedule = self.get_object()
+        serializer = ScheduleBookingSerializer(data=request.data, context={'schedule': schedule})
+        serializer.is_valid(raise_exception=True)
+        booking = schedules.book_occurrence(
+            schedule, serializer.validated_data['date'], request.user, serializer.validated_data['seats_booked'],
+        )
+        return Response(BookingSerializer(booking).data, status=status.HTTP_201_CREATED)
+
 
 # ===================================================================
 # 5. Bronlamak
@@ -206,10 +521,19 @@ class BookingViewSet(viewsets.ModelViewSet):
         user = self.request.user
         if user.is_staff:
             return self.queryset
-        return self.queryset.filter(passenger=user) | self.queryset.filter(route__ugur__driver=user)
+        # подзапрос вместо JOIN: оба условия идут по индексам (MULTI-INDEX OR)
+        driven_routes = UgurRoute.objects.filter(ugur__driver_id=user.id).values('pk')
+        return self.queryset.filter(Q(passenger_id=user.id) | Q(route__in=driven_routes))
 
     def perform_create(self, serializer):
-        serializer.save(passenger=self.request.user)
+        # места проверяются под блокировкой маршрута, как и в /routes/{id}/book/
+        data = serializer.validated_data
+        serializer.instance = seats.reserve(data['route'], self.request.user, seats_booked=data.get('seats_booked', 1))
+
+    def perform_update(self, serializer):
+        # seats.guard держит блокировку маршрута до конца сохранения
+        with transaction.atomic():
+            serializer.save()
 
 
 # ===================================================================
@@ -234,10 +558,31 @@ class DriverProfileViewSet(viewsets.ReadOnlyModelViewSet):
 
     @action(detail=False, methods=['get'], url_path='me')
     def me(self, request):
-        profile = get_object_or_404(DriverProfile, user=request.user)
+        profile = get_object_or_404(self.get_queryset(), user_id=request.user.id)
         serializer = self.get_serializer(profile)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'], url_path='me/stats')
+    def stats(self, request):
+        """Sürüjiniň dashboard-y: diňe DriverDailyStats okalýar."""
+        params = DriverStatsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        days = list(DriverDailyStats.objects.filter(
+            driver_id=request.user.id, day__gte=data['date_from'], day__lte=data['date_to'],
+        ).order_by('day'))
+        totals = {
+            field: sum((getattr(row, field) for row in days), 0)
+            for field in driver_stats.STAT_FIELDS
+        }
+        return Response({
+            'date_from': data['date_from'],
+            'date_to': data['date_to'],
+            'totals': totals,
+            'days': DriverDailyStatsSerializer(days, many=True).data,
+        })
+
 
 class CurrentPlaceViewSet(viewsets.ModelViewSet):
     queryset = CurrentPlace.objects.select_related('user')
@@ -250,7 +595,29 @@ class CurrentPlaceViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         # User diňe öz ýerlerini görýär
-        return self.queryset.filter(user=self.request.user)
+        return self.queryset.filter(user_id=self.request.user.id)
+
+
+class LocationViewSet(viewsets.ViewSet):
+    """
+    GPS nokatlary: POST /api/locations/ {"points": [...]} — bir sorag bilen köp nokat.
+    Nokatlar ýatda ýygnalýar we locations.py arkaly wagtal-wagtal ýazylýar.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def create(self, request):
+        serializer = LocationBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        points = serializer.validated_data['points']
+        locations.ingest(request.user.pk, points)
+        return Response({'accepted': len(points)}, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=['get'])
+    def me(self, request):
+        position = locations.last_position(request.user.pk)
+        if position is None:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        return Response(LastKnownPositionSerializer(position).data)
 
 
 class PassengerProfileViewSet(viewsets.ReadOnlyModelViewSet):
@@ -259,7 +626,7 @@ class PassengerProfileViewSet(viewsets.ReadOnlyModelViewSet):
 
     @action(detail=False, methods=['get'], url_path='me')
     def me(self, request):
-        profile = get_object_or_404(PassengerProfile, user=request.user)
+        profile = get_object_or_404(self.get_queryset(), user_id=request.user.id)
         serializer = self.get_serializer(profile)
         return Response(serializer.data)
 
@@ -271,6 +638,8 @@ class ReviewViewSet(viewsets.ModelViewSet):
     queryset = Review.objects.select_related('from_user', 'to_user')
     serializer_class = ReviewSerializer
     permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['to_user']
 
     def perform_create(self, serializer):
         serializer.save(from_user=self.request.user)
@@ -285,46 +654,129 @@ class LoadFilter(filters.FilterSet):
     ugur = NumberFilter(field_name='ugur')
     route = NumberFilter(field_name='route')
 
-    from_place = NumberFilter(field_name='ugur__routes__from_place', lookup_expr='exact')
-    to_place = NumberFilter(field_name='ugur__routes__to_place', lookup_expr='exact')
+    from_place = NumberFilter(field_name='from_place', lookup_expr='exact')
+    to_place = NumberFilter(field_name='to_place', lookup_expr='exact')
 
     class Meta:
         model = Load
         fields = ['status', 'ugur', 'route']
 
-class LoadViewSet(viewsets.ModelViewSet):
-    queryset = Load.objects.select_related('sender', 'ugur', 'route').all()
+class LoadViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    queryset = Load.objects.select_related('sender', 'ugur', 'route', 'from_place', 'to_place').all()
     serializer_class = LoadSerializer
+    conditional_fields = (
+        'updated', 'ugur__updated_at', 'route__updated_at', 'sender__updated_at',
+        'from_place__updated_at', 'to_place__updated_at',
+    )
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter]
     filterset_class = LoadFilter 
-    search_fields = ['description', 'receiver_name']
+    search_index = 'load'  # description, receiver_name
     ordering_fields = ['created', 'price']
 
 
 # ===================================================================
 # 9. Sürüjiniň bildirişi
 # ===================================================================
-class DriverNotificationViewSet(viewsets.ModelViewSet):
+class DriverNotificationViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = DriverNotificationSerializer
     permission_classes = [IsAuthenticated]
+    conditional_fields = ('updated_at', 'driver__updated_at', 'from_place__updated_at', 'to_place__updated_at')
 
     def get_queryset(self):
-        return DriverNotification.objects.filter(driver=self.request.user)
+        return DriverNotification.objects.filter(driver_id=self.request.user.id)
+
+    def get_conditional_aggregates(self):
+        # bildirişler diňe is_seen boýunça üýtgeýär
+        return {'unseen': Count('pk', filter=Q(is_seen=False))}
 
 
     @extend_schema(
         parameters=[
-            OpenApiParameter("pk", int, OpenApiParameter.PATH),
+            OpenApiParameter("pk", int, "path"),
         ]
     )
     @action(detail=True, methods=['post'])
     def mark_as_seen(self, request, pk:int=None):
         notification = self.get_object()
-        notification.is_seen = True
-        notification.save()
+        self._mark_seen(self.get_queryset().filter(pk=notification.pk))
         return Response({"status": "seen"})
 
+    @action(detail=False, methods=['post'], url_path='mark-all-seen')
+    def mark_all_seen(self, request):
+        updated = self._mark_seen(self.get_queryset())
+        return Response({"status": "seen", "updated": updated})
+
+    @extend_schema(request=NotificationIdsSerializer)
+    @action(detail=False, methods=['post'], url_path='mark-seen')
+    def mark_seen(self, request):
+        serializer = NotificationIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        updated = self._mark_seen(self.get_queryset().filter(pk__in=serializer.validated_data['ids']))
+        return Response({"status": "seen", "updated": updated})
+
+    @action(detail=False, methods=['get'], url_path='unread-count')
+    def unread_count(self, request):
+        return Response({"unread": counters.unread_count(request.user.pk)})
+
+    def _mark_seen(self, queryset):
+        # один UPDATE только по непрочитанным — счётчик уменьшается ровно на их число;
+        # не set(0): уведомление, созданное сразу после UPDATE, осталось бы неучтённым
+        updated = queryset.filter(is_seen=False).update(is_seen=True, updated_at=timezone.now())
+        counters.adjust_unread(self.request.user.pk, -updated)
+        return updated
+
+
+# ===================================================================
+# 9.1 Arhiw (geçen syýahatlar, diňe okamak)
+# ===================================================================
+class ArchivedUgurViewSet(viewsets.ReadOnlyModelViewSet):
+    """Ulanyjynyň eýesi, sürüjisi ýa-da ýolagçysy bolan arhiw syýahatlary."""
+    serializer_class = ArchivedUgurSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [drf_filters.OrderingFilter]
+    ordering_fields = ['created_at', 'archived_at']
+
+    def get_queryset(self):
+        user = self.request.user
+        passenger_ugurs = ArchivedBooking.objects.filter(passenger_id=user.id).values('route__ugur_id')
+        return (
+            ArchivedUgur.objects
+            .filter(Q(owner_id=user.id) | Q(driver_id=user.id) | Q(pk__in=passenger_ugurs))
+            .select_related('owner', 'driver')
+            .prefetch_related(Prefetch(
+                'routes',
+                queryset=ArchivedUgurRoute.objects.select_related('from_place', 'to_place').prefetch_related(
+                    'stops', Prefetch('bookings', queryset=ArchivedBooking.objects.select_related('passenger')),
+                ),
+            ))
+        )
+
+
+class ArchivedLoadViewSet(viewsets.ReadOnlyModelViewSet):
+    serializer_class = ArchivedLoadSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return ArchivedLoad.objects.filter(sender_id=self.request.user.id)
+
+
+# ===================================================================
+# 9.2 Ýolagçy islegi ↔ sürüji hödüri
+# ===================================================================
+class MatchViewSet(viewsets.ReadOnlyModelViewSet):
+    """Ulanyjynyň jübütleri (sürüji ýa-da ýolagçy hökmünde), iň laýygy birinji."""
+    serializer_class = MatchSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        user_id = self.request.user.id
+        return (
+            Match.objects.filter(Q(driver_id=user_id) | Q(passenger_id=user_id))
+            .select_related('offer', 'request')
+            .order_by('-score', '-pk')
+        )
+
 
 # ===================================================================
 # 10. Köne sargytlary import etmek
@@ -354,30 +806,67 @@ class ChangeRoleView(APIView):
     def post(self, request):
         serializer = ChangeRoleSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
-            role = serializer.validated_data['role']
             user = request.user
 
-            # меняем роль
-            if role == 'driver':
-                user.is_driver = True
-                user.is_passenger = False
-                user.save()
-                # создаём профиль водителя, если ещё нет
-                from app.models import DriverProfile
-                DriverProfile.objects.get_or_create(user=user)
-            elif role == 'passenger':
-                user.is_driver = False
-                user.is_passenger = True
-                user.save()
-                # создаём профиль пассажира, если ещё нет
-                from app.models import PassengerProfile
-                PassengerProfile.objects.get_or_create(user=user)
+            # меняем роль и создаём профиль, если ещё нет; старые токены отзываются сигналом
+            user.set_role(serializer.validated_data['role'])
+            refresh, access = auth.tokens_for(user)
 
             return Response({
                 'id': user.id,
                 'phone': user.phone,
                 'is_driver': user.is_driver,
-                'is_passenger': user.is_passenger
+                'is_passenger': user.is_passenger,
+                'token': str(access),
+                'refresh': str(refresh),
             })
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+# ===================================================================
+# Paket soraglar
+# ===================================================================
+class BatchView(APIView):
+    """
+    Birnäçe soragy bir HTTP soragynda ýerine ýetirýär:
+    {"requests": [{"id": "me", "method": "GET", "path": "/api/driver-profiles/me/"}, ...]}
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response({'responses': batch.run(request, serializer.validated_data['requests'])})
+
+
+# ===================================================================
+# Delta sinhronlama
+# ===================================================================
+class SyncView(APIView):
+    """
+    GET /api/sync/?since=<token> — diňe token-dan soň döredilen, üýtgän we pozulan ýazgylar.
+    Ilkinji gezek `since`-siz çagyrylýar; has_more=true bolsa täze token bilen gaýtalanýar.
+    """
+    permission_classes = [IsAuthenticated]
+    stream_serializers = {
+        'ugurs': SyncUgurSerializer,
+        'routes': SyncUgurRouteSerializer,
+        'bookings': SyncBookingSerializer,
+        'loads': SyncLoadSerializer,
+        'notifications': SyncNotificationSerializer,
+    }
+
+    def get(self, request):
+        params = SyncQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        try:
+            delta = sync.changes(request.user, params.validated_data.get('since') or None)
+        except sync.InvalidToken as exc:
+            return Response({'since': [str(exc)]}, status=status.HTTP_400_BAD_REQUEST)
+
+        delta['changes'] = {
+            name: self.stream_serializers[name](rows, many=True).data
+            for name, rows in delta['changes'].items()
+        }
+        return Response(delta)
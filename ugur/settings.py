@@ -37,6 +37,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'app.replicas.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -92,12 +93,76 @@ SPECTACULAR_SETTINGS = {
 
 WSGI_APPLICATION = 'ugur.wsgi.application'
 
+# Tokenleri ýatyrmak, giriş çäkleri, okalmadyk bildirişler we replikalaryň belgisi keşde.
+# LocMemCache diňe ýerli (DEBUG) iş üçin: UGUR_REQUIRE_SHARED_CACHE bolsa app.E001
+# barlagy umumy keşsiz işe başlamaga rugsat bermeýär (app/checks.py). Mysal:
+#     'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+#     'LOCATION': 'redis://127.0.0.1:6379/1',
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+UGUR_REQUIRE_SHARED_CACHE = not DEBUG
+
+# Ugraýyşlaryň SSE akymy (/api/departures/stream/) diňe ASGI (ugur.asgi) arkaly işleýär.
+# LocalBroker — bir prosesiň içinde; birnäçe proses üçin umumy broker goýmaly.
+UGUR_EVENTS_BROKER = 'app.events.LocalBroker'
+UGUR_EVENTS_HEARTBEAT = 15         # sekunt
+UGUR_EVENTS_MAX_STREAM = 10 * 60   # sekunt; soň müşderi täzeden birikýär
+
+# GPS nokatlary ýatda ýygnalyp, her N sekuntda bir upsert bilen ýazylýar.
+UGUR_LOCATION_FLUSH_INTERVAL = 5   # sekunt
+UGUR_LOCATION_TRAIL_SECONDS = 60   # ýoluň yzy: her 60 sekuntda bir nokat (0 — ýazylmaýar)
+
+# Giriş / hasaba alyş: PBKDF2-den öň token bucket çäkleri (app/throttling.py).
+# "N/period": çelegiň sygymy N, N token period-yň dowamynda dolýar.
+UGUR_THROTTLES = {
+    'login': {'ip': '10/min', 'phone': '5/min', 'global': '20/s'},
+    'register': {'ip': '5/min', 'phone': '3/min', 'global': '10/s'},
+}
+# ip / phone — ähli prosesler üçin umumy keşde; global — her prosesiň öz CPU-sy üçin ýatda
+UGUR_THROTTLE_STORES = {'ip': 'cache', 'phone': 'cache', 'global': 'local'}
+# ip çägi: X-Forwarded-For-a diňe öňünde şonça ynamly proksi (nginx) bolsa ynanylýar, 0 — REMOTE_ADDR
+UGUR_THROTTLE_NUM_PROXIES = 0
+
+# /api/batch/: yzygiderli GET soraglary üçin akymlaryň sany (1 — hemmesi yzly-yzyna)
+UGUR_BATCH_WORKERS = 4
+
+# /api/sync/: pozulanlaryň yzy şonça gün saklanýar (archive_trips arassalaýar);
+# has köne token bilen gelen müşderi doly sinhronlama (reset) alýar.
+UGUR_SYNC_TOMBSTONE_DAYS = 30
+
+# OpenAPI shemasy gurluşda `manage.py build_api_schema` bilen şu faýla ýazylýar
+# we /swagger.json-dan berilýär (app/docs.py); Swagger UI / ReDoc şony okaýar.
+UGUR_OPENAPI_SCHEMA = BASE_DIR / 'openapi.json'
+
+# Ýolagçy islegi ↔ sürüji hödüri (app/matching.py): ugraýyş wagtynyň tapawudy we
+# her täze bildiriş üçin saklanýan iň laýyk jübütleriň sany
+UGUR_MATCH_WINDOW_HOURS = 3
+UGUR_MATCH_MAX_RESULTS = 20
+SWAGGER_SETTINGS = {'SPEC_URL': 'schema-json'}
+REDOC_SETTINGS = {'SPEC_URL': 'schema-json'}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    },
+    # ýerli synag üçin replika: `manage.py sync_sqlite_replica` bilen göçürilýär
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.replica.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    },
 }
+DATABASE_ROUTERS = ['app.replicas.ReplicaRouter']
+
+# Okamak soraglary üçin replikalar (app/replicas.py); boş — hemme zat 'default'-da.
+# Ýerli: UGUR_REPLICAS = ['replica']
+UGUR_REPLICAS = []
+UGUR_REPLICA_STICKY_SECONDS = 10   # ýazandan soň ulanyjy şonça sekunt esasy bazadan okaýar
+UGUR_REPLICA_RETRY_SECONDS = 30    # elýeterli däl replika şonça sekunt ulanylmaýar
 
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -133,7 +198,8 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # GET soraglary tokendäki rol talaplary bilen, ulanyjyny bazadan okamazdan (app/auth.py)
+        'app.auth.ClaimsJWTAuthentication',
     ),
 }
 
@@ -144,4 +210,5 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_REFRESH_SERIALIZER': 'app.serializers.RoleTokenRefreshSerializer',
 }
\ No newline at end of file
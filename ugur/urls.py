@@ -1,24 +1,14 @@
 from django.contrib import admin
 from django.urls import path, include
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
 
-schema_view = get_schema_view(
-   openapi.Info(
-      title="100 ugra API",
-      default_version='v1',
-      description="Документация API",
-   ),
-   public=True,
-   permission_classes=(permissions.AllowAny,),
-)
+from app import docs
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('app.urls')),
 
-    # Swagger
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    # Swagger: shema taýýar faýldan, drf_yasg diňe UI sahypasy açylanda ýüklenýär
+    path('swagger.json', docs.schema_json, name='schema-json'),
+    path('swagger/', docs.page('SwaggerUIRenderer'), name='schema-swagger-ui'),
+    path('redoc/', docs.page('ReDocRenderer'), name='schema-redoc'),
 ]